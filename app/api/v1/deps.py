@@ -0,0 +1,23 @@
+"""
+Dépendances partagées des endpoints
+
+Le token JWT ne porte que `sub` (id utilisateur) et `role`: l'entreprise de
+l'utilisateur est relue en base.
+"""
+from fastapi import Depends, HTTPException, status
+from app.core.database import get_db
+from app.core.security import get_current_user
+
+
+async def get_current_entreprise_id(
+    current_user=Depends(get_current_user),
+    db=Depends(get_db)
+) -> str:
+    """Entreprise de l'utilisateur authentifié (401 si l'utilisateur n'existe plus)"""
+    user = await db.user.find_unique(where={"id": current_user["sub"]})
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Utilisateur introuvable"
+        )
+    return user.entreprise_id
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Optional
 from app.api.v1.models.schemas import ArticleCreate, ArticleUpdate, ArticleResponse
 from app.services.article_service import ArticleService
 from app.core.security import get_current_user
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
@@ -32,12 +33,16 @@ async def get_article(
 @router.get("/magasin/{magasin_id}", response_model=List[ArticleResponse])
 async def get_articles_by_magasin(
     magasin_id: str,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"),
+    skip: int = Query(0, ge=0, le=10000, deprecated=True),
     limit: int = Query(100, ge=1, le=500),
     current_user: dict = Depends(get_current_user)
 ):
-    """Lister tous les articles d'un magasin"""
-    articles = await ArticleService.get_articles_by_magasin(magasin_id, skip, limit)
+    """Lister les articles d'un magasin (page suivante: en-tête X-Next-Cursor)"""
+    articles, suivant = await ArticleService.get_articles_by_magasin(magasin_id, skip, limit, cursor)
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
     return articles
 
 @router.get("/magasin/{magasin_id}/faibles", response_model=List[ArticleResponse])
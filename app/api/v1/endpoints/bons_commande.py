@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from app.schemas.bon_commande import BonCommandeCreate, BonCommandeResponse
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.api.v1.deps import get_current_entreprise_id
+from app.services.reorder_service import ReorderService
+from app.services.sequence_service import SequenceService
+from app.utils.pagination import NEXT_CURSOR_HEADER, keyset_page
 from datetime import datetime
 
 router = APIRouter(prefix="/bons-commande", tags=["Bons de Commande"])
@@ -12,62 +15,85 @@ router = APIRouter(prefix="/bons-commande", tags=["Bons de Commande"])
 async def create_bon_commande(
     bon: BonCommandeCreate,
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    entreprise_id: str = Depends(get_current_entreprise_id)
 ):
     """Créer un bon de commande"""
-    count = await db.boncommande.count()
-    reference = f"BC-{datetime.now().year}-{count + 1:04d}"
-    
     montant_total = sum(ligne.quantite_commandee * ligne.prix_unitaire for ligne in bon.lignes)
     
-    new_bon = await db.boncommande.create(
-        data={
-            "reference": reference,
-            "entreprise_id": current_user.entreprise_id,
-            "fournisseur_id": bon.fournisseur_id,
-            "statut": "BROUILLON",
-            "montant_total": montant_total,
-            "notes": bon.notes,
-            "lignes": {
-                "create": [
-                    {
-                        "article_id": ligne.article_id,
-                        "quantite_commandee": ligne.quantite_commandee,
-                        "prix_unitaire": ligne.prix_unitaire,
-                        "montant_total": ligne.quantite_commandee * ligne.prix_unitaire
-                    }
-                    for ligne in bon.lignes
-                ]
-            }
-        },
-        include={"lignes": True, "fournisseur": True}
-    )
+    # Référence réservée dans la transaction de création: pas de doublon ni de trou
+    async with db.tx() as tx:
+        reference = await SequenceService.next_reference(entreprise_id, "BON_COMMANDE", client=tx)
+        new_bon = await tx.boncommande.create(
+            data={
+                "reference": reference,
+                "entreprise_id": entreprise_id,
+                "fournisseur_id": bon.fournisseur_id,
+                "statut": "BROUILLON",
+                "montant_total": montant_total,
+                "notes": bon.notes,
+                "lignes": {
+                    "create": [
+                        {
+                            "article_id": ligne.article_id,
+                            "quantite_commandee": ligne.quantite_commandee,
+                            "prix_unitaire": ligne.prix_unitaire,
+                            "montant_total": ligne.quantite_commandee * ligne.prix_unitaire
+                        }
+                        for ligne in bon.lignes
+                    ]
+                }
+            },
+            include={"lignes": True, "fournisseur": True}
+        )
     return new_bon
 
 
 @router.get("/", response_model=List[BonCommandeResponse])
 async def list_bons_commande(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"),
+    limit: int = Query(50, ge=1, le=200),
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    entreprise_id: str = Depends(get_current_entreprise_id)
 ):
-    """Lister les bons de commande"""
-    bons = await db.boncommande.find_many(
-        where={"entreprise_id": current_user.entreprise_id},
+    """Lister les bons de commande, plus récents d'abord (page suivante: en-tête X-Next-Cursor)"""
+    bons, suivant = await keyset_page(
+        db.boncommande, {"entreprise_id": entreprise_id}, "created_at", "desc", limit, cursor,
         include={"lignes": True, "fournisseur": True}
     )
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
     return bons
 
 
+@router.get("/suggestions")
+async def suggestions_reapprovisionnement(
+    magasin_id: Optional[str] = None,
+    entreprise_id: str = Depends(get_current_entreprise_id)
+):
+    """Articles à commander regroupés par fournisseur (point de commande, délai, EOQ)"""
+    return await ReorderService.plan(entreprise_id, magasin_id)
+
+
+@router.post("/suggestions/brouillons", status_code=201)
+async def creer_brouillons_reapprovisionnement(
+    magasin_id: Optional[str] = None,
+    entreprise_id: str = Depends(get_current_entreprise_id)
+):
+    """Créer un bon de commande brouillon par fournisseur à partir des suggestions"""
+    return await ReorderService.create_draft_orders(entreprise_id, magasin_id)
+
+
 @router.patch("/{bon_id}/confirmer")
 async def confirmer_bon_commande(
     bon_id: str,
     date_livraison_prevue: datetime,
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    entreprise_id: str = Depends(get_current_entreprise_id)
 ):
     """Confirmer un bon de commande"""
     bon = await db.boncommande.find_unique(where={"id": bon_id})
-    if not bon or bon.entreprise_id != current_user.entreprise_id:
+    if not bon or bon.entreprise_id != entreprise_id:
         raise HTTPException(status_code=404, detail="Bon de commande non trouvé")
     
     updated = await db.boncommande.update(
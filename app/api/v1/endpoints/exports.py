@@ -1,79 +1,119 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.services.export_service import ExportService
+from app.utils.export_writers import COLONNES_STOCK, COLONNES_VALORISATION, FormatIndisponibleError
 from datetime import datetime
 import io
 
 router = APIRouter(prefix="/exports", tags=["Exports"])
 
 
+def _fichier(prefixe: str, extension: str) -> dict:
+    return {"Content-Disposition": f"attachment; filename={prefixe}_{datetime.now().strftime('%Y%m%d')}.{extension}"}
+
+
+async def _export(prefixe: str, production) -> StreamingResponse:
+    """Réponse d'export csv/parquet (Parquet sans pyarrow installé: 501)"""
+    try:
+        body, media_type, extension = await production
+    except FormatIndisponibleError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return StreamingResponse(body, media_type=media_type, headers=_fichier(prefixe, extension))
+
+
 @router.get("/mouvements/excel")
 async def export_mouvements_excel(
     magasin_id: str,
     date_debut: datetime = None,
     date_fin: datetime = None,
+    format: Literal["xlsx", "csv", "parquet"] = "xlsx",
+    gzip: bool = False,
     db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Exporter les mouvements en Excel"""
-    where = {"magasin_id": magasin_id}
-    if date_debut and date_fin:
-        where["date_mouvement"] = {"gte": date_debut, "lte": date_fin}
-    
-    mouvements = await db.mouvementstock.find_many(
-        where=where,
-        include={"article": True}
-    )
-    
+    """
+    Exporter les mouvements (pages keyset écrites au fil de l'eau, mémoire bornée)
+
+    En xlsx et parquet, chaque page est écrite dans un thread (la boucle reste
+    libre) et le fichier est envoyé une fois complet; pour les gros volumes,
+    préférer POST /rapports/generate (tâche en arrière-plan).
+
+    `format`: xlsx (défaut), csv (envoyé pendant la lecture, `gzip=true` pour
+    le compresser) ou parquet.
+    """
     export_service = ExportService()
-    excel_buffer = export_service.export_mouvements_excel(mouvements)
-    
-    return StreamingResponse(
-        io.BytesIO(excel_buffer),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=mouvements_{datetime.now().strftime('%Y%m%d')}.xlsx"}
+    return await _export(
+        "mouvements",
+        export_service.export_mouvements(db, magasin_id, date_debut, date_fin, format=format, gzip=gzip)
     )
 
 
 @router.get("/stock/pdf")
 async def export_stock_pdf(
     magasin_id: str,
+    format: Literal["pdf", "csv", "parquet"] = "pdf",
+    gzip: bool = False,
     db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Exporter l'état du stock en PDF"""
+    """Exporter l'état du stock en PDF, csv ou parquet"""
     articles = await db.article.find_many(
         where={"magasin_id": magasin_id, "is_active": True}
     )
-    
+
     export_service = ExportService()
-    pdf_buffer = export_service.export_stock_pdf(articles, magasin_id)
-    
+    if format != "pdf":
+        return await _export(
+            "stock",
+            export_service.export_rows(format, "Stock", COLONNES_STOCK, export_service.stock_values(articles), gzip)
+        )
+
+    pdf_buffer = await run_in_threadpool(export_service.export_stock_pdf, articles, magasin_id)
+
     return StreamingResponse(
         io.BytesIO(pdf_buffer),
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=stock_{datetime.now().strftime('%Y%m%d')}.pdf"}
+        headers=_fichier("stock", "pdf")
     )
 
 
 @router.get("/valorisation/excel")
 async def export_valorisation_excel(
     magasin_id: str,
+    format: Literal["xlsx", "csv", "parquet"] = "xlsx",
+    gzip: bool = False,
+    grouper_par: Optional[List[Literal["categorie", "tva_taux"]]] = Query(None),
     db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Exporter la valorisation du stock (comptabilité tunisienne)"""
+    """
+    Exporter la valorisation du stock (comptabilité tunisienne) en xlsx, csv ou parquet
+
+    `grouper_par` (xlsx): sous-totaux par catégorie et/ou taux de TVA, ex.
+    `?grouper_par=categorie&grouper_par=tva_taux`.
+    """
     articles = await db.article.find_many(
         where={"magasin_id": magasin_id, "is_active": True}
     )
-    
+
     export_service = ExportService()
-    excel_buffer = export_service.export_valorisation_excel(articles)
-    
+    if format != "xlsx":
+        return await _export(
+            "valorisation",
+            export_service.export_rows(
+                format, "Valorisation Stock", COLONNES_VALORISATION,
+                export_service.valorisation_values(articles), gzip
+            )
+        )
+
+    excel_buffer = await run_in_threadpool(export_service.export_valorisation_excel, articles, grouper_par)
+
     return StreamingResponse(
         io.BytesIO(excel_buffer),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=valorisation_{datetime.now().strftime('%Y%m%d')}.xlsx"}
+        headers=_fichier("valorisation", "xlsx")
     )
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Optional
 from app.api.v1.models.schemas import FournisseurCreate, FournisseurUpdate, FournisseurResponse
 from app.services.fournisseur_service import FournisseurService
 from app.core.security import get_current_user
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
@@ -32,12 +33,16 @@ async def get_fournisseur(
 @router.get("/entreprise/{entreprise_id}", response_model=List[FournisseurResponse])
 async def get_fournisseurs_by_entreprise(
     entreprise_id: str,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"),
+    skip: int = Query(0, ge=0, le=10000, deprecated=True),
     limit: int = Query(100, ge=1, le=500),
     current_user: dict = Depends(get_current_user)
 ):
-    """Lister tous les fournisseurs d'une entreprise"""
-    fournisseurs = await FournisseurService.get_fournisseurs_by_entreprise(entreprise_id, skip, limit)
+    """Lister les fournisseurs d'une entreprise (page suivante: en-tête X-Next-Cursor)"""
+    fournisseurs, suivant = await FournisseurService.get_fournisseurs_by_entreprise(entreprise_id, skip, limit, cursor)
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
     return fournisseurs
 
 @router.put("/{fournisseur_id}", response_model=FournisseurResponse)
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List
 from app.core.database import get_db
 from app.core.security import get_current_user
+from app.core.events import publish, STOCK_CHANGED
+from app.services.alert_engine import alert_engine
+from app.services.inventory_service import InventoryService
+from app.services.stock_service import StockService
+from app.services.stock_query_service import StockQueryService
 from datetime import datetime
 
 router = APIRouter(prefix="/inventaires", tags=["Inventaires"])
@@ -37,36 +42,36 @@ async def ajuster_stock(
     current_user=Depends(get_current_user)
 ):
     """Ajuster le stock après comptage physique"""
-    article = await db.article.find_unique(
-        where={"id": article_id}
-    )
-    
-    if not article:
-        raise HTTPException(status_code=404, detail="Article non trouvé")
-    
-    ecart = quantite_comptee - article.stock_actuel
+    # Nouveau stock et mouvement d'ajustement dans la même transaction:
+    # l'écart est calculé sur le stock verrouillé, pas sur une lecture antérieure
+    async with db.tx() as tx:
+        resultat = await StockService.set_stock(article_id, quantite_comptee, client=tx)
+        if not resultat:
+            raise HTTPException(status_code=404, detail="Article non trouvé")
+        
+        ecart = quantite_comptee - resultat["stock_avant"]
+        
+        await tx.mouvementstock.create(
+            data={
+                "type": "AJUSTEMENT",
+                "article_id": article_id,
+                "magasin_id": magasin_id,
+                "quantite": abs(ecart),
+                "motif": f"Inventaire physique: {motif}",
+                "created_by": current_user.id
+            }
+        )
     
-    # Créer mouvement d'ajustement
-    await db.mouvementstock.create(
-        data={
-            "type": "AJUSTEMENT",
-            "article_id": article_id,
-            "magasin_id": magasin_id,
-            "quantite": abs(ecart),
-            "motif": f"Inventaire physique: {motif}",
-            "created_by": current_user.id
-        }
-    )
-    
-    # Mettre à jour le stock
-    updated_article = await db.article.update(
-        where={"id": article_id},
-        data={"stock_actuel": quantite_comptee}
-    )
+    publish(STOCK_CHANGED, {
+        "magasin_id": magasin_id,
+        "article_ids": [article_id],
+        "stocks": {article_id: [resultat["stock_avant"], resultat["stock_apres"]]},
+        "source": "inventaire"
+    })
     
     return {
         "article_id": article_id,
-        "stock_avant": article.stock_actuel,
+        "stock_avant": resultat["stock_avant"],
         "stock_apres": quantite_comptee,
         "ecart": ecart,
         "type_ecart": "surplus" if ecart > 0 else "manquant"
@@ -80,18 +85,43 @@ async def rapport_inventaire(
     current_user=Depends(get_current_user)
 ):
     """Générer un rapport d'inventaire"""
-    articles = await db.article.find_many(
-        where={"magasin_id": magasin_id, "is_active": True}
-    )
-    
-    valeur_totale = sum(a.stock_actuel * a.prix_achat for a in articles)
-    articles_faibles = [a for a in articles if a.stock_actuel <= a.stock_min]
+    # Totaux et filtre stock faible calculés par la base
+    resume = await StockQueryService.resume(magasin_id, client=db)
+    articles_faibles = await StockQueryService.articles_faibles(magasin_id, client=db)
     
     return {
         "magasin_id": magasin_id,
         "date_rapport": datetime.now(),
-        "total_articles": len(articles),
-        "valeur_stock_total": round(valeur_totale, 2),
-        "articles_en_alerte": len(articles_faibles),
+        "total_articles": resume["total_articles"],
+        "valeur_stock_total": round(resume["valeur_achat"], 2),
+        "articles_en_alerte": resume["faibles"],
         "articles_faibles": articles_faibles
     }
+
+
+@router.get("/magasin/{magasin_id}/stock-dormant")
+async def stock_dormant(
+    magasin_id: str,
+    jours: int = Query(90, ge=1, le=3650),
+    current_user=Depends(get_current_user)
+):
+    """Articles en stock sans sortie depuis `jours` jours, avec répartition par ancienneté"""
+    return await InventoryService().get_slow_moving_items(magasin_id, jours)
+
+
+@router.get("/magasin/{magasin_id}/rotation")
+async def rotation_stock(
+    magasin_id: str,
+    jours: int = Query(365, ge=7, le=3650),
+    current_user=Depends(get_current_user)
+):
+    """Rotation et couverture (jours) du stock par article, rotation la plus lente d'abord"""
+    return await InventoryService().get_rotation_stock(magasin_id, jours)
+
+
+@router.get("/alertes/compteurs")
+async def compteurs_evaluation_alertes(
+    current_user=Depends(get_current_user)
+):
+    """Nombre d'articles évalués par les alertes, en incrémental et par scan complet"""
+    return await alert_engine.compteurs()
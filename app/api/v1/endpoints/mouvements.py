@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Optional
 from datetime import datetime
 from app.api.v1.models.schemas import MouvementStockCreate, MouvementStockResponse
+from app.schemas.mouvement import MouvementBatchCreate
 from app.services.mouvement_service import MouvementService
 from app.core.security import get_current_user
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
@@ -19,27 +21,43 @@ async def create_mouvement(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/batch")
+async def create_mouvements_batch(
+    data: MouvementBatchCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Enregistrer un lot de mouvements (jusqu'à 5000), avec un résultat par mouvement"""
+    return await MouvementService.create_mouvements_batch(data.mouvements)
+
 @router.get("/article/{article_id}", response_model=List[MouvementStockResponse])
 async def get_mouvements_by_article(
     article_id: str,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"),
     limit: int = Query(50, ge=1, le=500),
     current_user: dict = Depends(get_current_user)
 ):
-    """Récupérer l'historique des mouvements d'un article"""
-    mouvements = await MouvementService.get_mouvements_by_article(article_id, limit)
+    """Récupérer l'historique des mouvements d'un article (page suivante: en-tête X-Next-Cursor)"""
+    mouvements, suivant = await MouvementService.get_mouvements_by_article(article_id, limit, cursor)
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
     return mouvements
 
 @router.get("/magasin/{magasin_id}", response_model=List[MouvementStockResponse])
 async def get_mouvements_by_magasin(
     magasin_id: str,
+    response: Response,
     date_debut: Optional[datetime] = None,
     date_fin: Optional[datetime] = None,
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"),
+    skip: int = Query(0, ge=0, le=10000, deprecated=True),
     limit: int = Query(100, ge=1, le=500),
     current_user: dict = Depends(get_current_user)
 ):
-    """Récupérer tous les mouvements d'un magasin avec filtres optionnels"""
-    mouvements = await MouvementService.get_mouvements_by_magasin(
-        magasin_id, date_debut, date_fin, skip, limit
+    """Récupérer les mouvements d'un magasin avec filtres optionnels (page suivante: en-tête X-Next-Cursor)"""
+    mouvements, suivant = await MouvementService.get_mouvements_by_magasin(
+        magasin_id, date_debut, date_fin, skip, limit, cursor
     )
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
     return mouvements
@@ -1,40 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from app.schemas.notification import NotificationResponse
 from app.core.database import get_db
 from app.core.security import get_current_user
+from app.utils.pagination import NEXT_CURSOR_HEADER, keyset_page
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 
 @router.get("/", response_model=List[NotificationResponse])
 async def list_notifications(
-    limit: int = 50,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"),
+    limit: int = Query(50, ge=1, le=200),
     db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Lister les notifications de l'entreprise"""
-    notifications = await db.notification.find_many(
-        where={"entreprise_id": current_user.entreprise_id},
-        order={"created_at": "desc"},
-        take=limit
+    """Lister les notifications de l'entreprise (page suivante: en-tête X-Next-Cursor)"""
+    notifications, suivant = await keyset_page(
+        db.notification, {"entreprise_id": current_user.entreprise_id}, "created_at", "desc", limit, cursor
     )
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
     return notifications
 
 
 @router.get("/non-lues", response_model=List[NotificationResponse])
 async def list_notifications_non_lues(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"),
+    limit: int = Query(50, ge=1, le=200),
     db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Lister les notifications non lues"""
-    notifications = await db.notification.find_many(
-        where={
-            "entreprise_id": current_user.entreprise_id,
-            "statut": "EN_ATTENTE"
-        },
-        order={"created_at": "desc"}
+    """Lister les notifications non lues (page suivante: en-tête X-Next-Cursor)"""
+    notifications, suivant = await keyset_page(
+        db.notification,
+        {"entreprise_id": current_user.entreprise_id, "statut": "EN_ATTENTE"},
+        "created_at", "desc", limit, cursor
     )
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
     return notifications
 
 
@@ -1,25 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from app.api.v1.models.schemas import RapportRequest
-from app.services.report_service import ReportService
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from app.api.v1.models.schemas import RapportRequest, RapportJobResponse
+from app.core.job_queue import enqueue, get_job, TERMINE
 from app.core.security import get_current_user
+from app.utils.export_writers import parse_byte_range, iter_file_range
+import app.jobs.export_jobs  # noqa: F401 (enregistre les handlers d'export)
+import os
 
 router = APIRouter()
 
-@router.post("/generate")
+
+async def _job_utilisateur(rapport_id: str, current_user: dict) -> dict:
+    job = await get_job(rapport_id)
+    if not job or job["user_id"] != current_user.get("sub"):
+        raise HTTPException(status_code=404, detail="Rapport non trouvé ou expiré")
+    return job
+
+
+@router.post("/generate", response_model=RapportJobResponse, status_code=202)
 async def generate_rapport(
     data: RapportRequest,
     current_user: dict = Depends(get_current_user)
 ):
-    """Générer un rapport (PDF ou Excel) - Phase 2"""
-    # TODO: Implémenter en Phase 2
-    return {"message": "Génération de rapport (Phase 2)", "type": data.type, "format": data.format}
+    """
+    Demander un rapport: la génération est faite par un worker en arrière-plan
+
+    Excel et PDF: rapport agrégé (mouvements, valorisation, marges) par
+    `periode`; csv et parquet: export ligne à ligne (mouvements, stock,
+    valorisation). Renvoie immédiatement la tâche; suivre son statut avec
+    GET /rapports/{id} puis télécharger le fichier avec GET /rapports/download/{id}.
+    """
+    params = data.model_dump(mode="json", exclude={"type"})
+    params["format"] = "xlsx" if data.format == "excel" else data.format
+    if params["format"] in ("xlsx", "pdf") and data.type != "stock":
+        type_job = f"rapport_{data.type}"
+    elif params["format"] == "pdf":
+        raise HTTPException(status_code=400, detail="Export du stock: formats xlsx, csv ou parquet")
+    else:
+        type_job = data.type
+    try:
+        return await enqueue(type_job, params, user_id=current_user.get("sub"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{rapport_id}", response_model=RapportJobResponse)
+async def get_rapport(
+    rapport_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Statut d'un rapport: en_attente, en_cours, termine ou erreur"""
+    return await _job_utilisateur(rapport_id, current_user)
+
 
 @router.get("/download/{rapport_id}")
 async def download_rapport(
     rapport_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
-    """Télécharger un rapport généré - Phase 2"""
-    # TODO: Implémenter en Phase 2
-    raise HTTPException(status_code=501, detail="Fonctionnalité Phase 2")
+    """Télécharger un rapport généré (reprise possible avec l'en-tête Range)"""
+    job = await _job_utilisateur(rapport_id, current_user)
+    if job["statut"] != TERMINE:
+        raise HTTPException(status_code=409, detail=f"Rapport non disponible (statut: {job['statut']})")
+    if not os.path.exists(job["fichier"]):
+        raise HTTPException(status_code=410, detail="Fichier expiré")
+
+    taille = os.path.getsize(job["fichier"])
+    try:
+        plage = parse_byte_range(request.headers.get("range"), taille)
+    except ValueError as e:
+        raise HTTPException(status_code=416, detail=str(e), headers={"Content-Range": f"bytes */{taille}"})
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename={job['nom_fichier']}"
+    }
+    if plage is None:
+        return FileResponse(job["fichier"], media_type=job["media_type"], headers=headers)
+
+    debut, fin = plage
+    headers["Content-Range"] = f"bytes {debut}-{fin}/{taille}"
+    headers["Content-Length"] = str(fin - debut + 1)
+    return StreamingResponse(
+        iter_file_range(job["fichier"], debut, fin),
+        status_code=206,
+        media_type=job["media_type"],
+        headers=headers
+    )
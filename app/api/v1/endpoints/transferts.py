@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from app.schemas.transfert import TransfertCreate, TransfertResponse, TransfertUpdate
 from app.core.database import get_db
 from app.core.security import get_current_user
-from datetime import datetime
+from app.services.transfert_service import TransfertService
+from app.utils.pagination import NEXT_CURSOR_HEADER, keyset_page
 
 router = APIRouter(prefix="/transferts", tags=["Transferts"])
 
@@ -11,35 +12,25 @@ router = APIRouter(prefix="/transferts", tags=["Transferts"])
 @router.post("/", response_model=TransfertResponse)
 async def create_transfert(
     transfert: TransfertCreate,
-    db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Créer un transfert entre magasins"""
-    # Générer référence unique
-    count = await db.transfertstock.count()
-    reference = f"TRF-{datetime.now().year}-{count + 1:04d}"
-    
-    new_transfert = await db.transfertstock.create(
-        data={
-            "reference": reference,
-            "article_id": transfert.article_id,
-            "magasin_origine_id": transfert.magasin_origine_id,
-            "magasin_destination_id": transfert.magasin_destination_id,
-            "quantite": transfert.quantite,
-            "notes": transfert.notes,
-            "statut": "EN_ATTENTE"
-        }
-    )
-    return new_transfert
+    """Créer un transfert entre magasins (une ou plusieurs lignes)"""
+    try:
+        return await TransfertService.create_transfert(transfert)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/", response_model=List[TransfertResponse])
 async def list_transferts(
+    response: Response,
     magasin_id: str = None,
+    cursor: Optional[str] = Query(None, description="Curseur renvoyé dans l'en-tête X-Next-Cursor"),
+    limit: int = Query(50, ge=1, le=200),
     db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Lister les transferts"""
+    """Lister les transferts, plus récents d'abord (page suivante: en-tête X-Next-Cursor)"""
     where = {}
     if magasin_id:
         where = {
@@ -49,56 +40,40 @@ async def list_transferts(
             ]
         }
     
-    transferts = await db.transfertstock.find_many(
-        where=where,
-        include={"article": True, "magasin_origine": True, "magasin_destination": True}
+    transferts, suivant = await keyset_page(
+        db.transfertstock, where, "created_at", "desc", limit, cursor,
+        include={"lignes": True, "magasin_origine": True, "magasin_destination": True}
     )
+    if suivant:
+        response.headers[NEXT_CURSOR_HEADER] = suivant
     return transferts
 
 
-@router.patch("/{transfert_id}/confirmer")
+@router.patch("/{transfert_id}/confirmer", response_model=TransfertResponse)
 async def confirmer_transfert(
     transfert_id: str,
-    db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Confirmer l'envoi d'un transfert"""
-    transfert = await db.transfertstock.find_unique(where={"id": transfert_id})
+    """Confirmer l'envoi d'un transfert (sortie de stock de toutes les lignes en une transaction)"""
+    try:
+        transfert = await TransfertService.confirmer(transfert_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not transfert:
         raise HTTPException(status_code=404, detail="Transfert non trouvé")
-    
-    # Déduire du stock origine
-    await db.article.update(
-        where={"id": transfert.article_id, "magasin_id": transfert.magasin_origine_id},
-        data={"stock_actuel": {"decrement": transfert.quantite}}
-    )
-    
-    updated = await db.transfertstock.update(
-        where={"id": transfert_id},
-        data={"statut": "EN_COURS", "date_transfert": datetime.now()}
-    )
-    return updated
+    return transfert
 
 
-@router.patch("/{transfert_id}/recevoir")
+@router.patch("/{transfert_id}/recevoir", response_model=TransfertResponse)
 async def recevoir_transfert(
     transfert_id: str,
-    db=Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    """Confirmer la réception d'un transfert"""
-    transfert = await db.transfertstock.find_unique(where={"id": transfert_id})
+    """Confirmer la réception d'un transfert (entrée de stock de toutes les lignes en une transaction)"""
+    try:
+        transfert = await TransfertService.recevoir(transfert_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not transfert:
         raise HTTPException(status_code=404, detail="Transfert non trouvé")
-    
-    # Ajouter au stock destination
-    await db.article.update(
-        where={"id": transfert.article_id, "magasin_id": transfert.magasin_destination_id},
-        data={"stock_actuel": {"increment": transfert.quantite}}
-    )
-    
-    updated = await db.transfertstock.update(
-        where={"id": transfert_id},
-        data={"statut": "RECU", "date_reception": datetime.now()}
-    )
-    return updated
+    return transfert
@@ -74,6 +74,10 @@ class ArticleResponse(ArticleBase):
     magasin_id: str
     created_at: datetime
     updated_at: datetime
+    last_entree_at: Optional[datetime] = None
+    last_sortie_at: Optional[datetime] = None
+    sold_7d: int = 0
+    sold_28d: int = 0
 
     class Config:
         from_attributes = True
@@ -177,12 +181,26 @@ class DashboardStats(BaseModel):
     articles_faibles: List[ArticleFaible]
 
 # ============================================
-# RAPPORT SCHEMAS (Phase 2)
+# RAPPORT SCHEMAS
 # ============================================
 
 class RapportRequest(BaseModel):
-    type: str = Field(..., pattern="^(mouvements|valorisation|marges)$")
-    date_debut: datetime
-    date_fin: datetime
+    type: str = Field(..., pattern="^(mouvements|stock|valorisation|marges)$")
+    date_debut: Optional[datetime] = None
+    date_fin: Optional[datetime] = None
     magasin_id: str
-    format: str = Field(default="pdf", pattern="^(pdf|excel)$")
+    format: str = Field(default="excel", pattern="^(pdf|excel|xlsx|csv|parquet)$")
+    gzip: bool = False
+    grouper_par: Optional[List[str]] = None
+    periode: str = Field(default="mois", pattern="^(jour|semaine|mois)$")
+
+class RapportJobResponse(BaseModel):
+    id: str
+    type: str
+    statut: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    nom_fichier: Optional[str] = None
+    taille: Optional[int] = None
+    expire_le: Optional[datetime] = None
+    erreur: Optional[str] = None
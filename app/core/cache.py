@@ -0,0 +1,104 @@
+"""
+Cache clé/valeur partagé (Redis ou mémoire locale)
+
+Le backend est choisi par settings.CACHE_BACKEND: "redis" utilise
+settings.REDIS_URL, "memory" garde les valeurs dans le processus
+(développement, tests, déploiement mono-worker).
+
+`lock(key, timeout)` protège une lecture-modification-écriture: verrou Redis
+(partagé entre processus) ou asyncio.Lock (processus seul, comme le cache).
+"""
+from typing import Any, Dict, Optional, Tuple
+from time import monotonic
+import asyncio
+import json
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """Stand-in local de Redis avec expiration"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        expires_at = monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        value = int(await self.get(key) or 0) + amount
+        expires_at = self._data[key][1] if key in self._data else None
+        self._data[key] = (str(value), expires_at)
+        return value
+
+    def lock(self, key: str, timeout: int) -> asyncio.Lock:
+        return self._locks.setdefault(key, asyncio.Lock())
+
+
+class RedisCache:
+    """Cache adossé à Redis (partagé entre workers)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        await self._client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._client.delete(*keys)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self._client.incrby(key, amount)
+
+    def lock(self, key: str, timeout: int):
+        # Expire après `timeout` si le détenteur meurt; l'attente est bornée au même délai
+        return self._client.lock(key, timeout=timeout, blocking_timeout=timeout)
+
+
+_cache = None
+
+
+def get_cache():
+    """Retourner l'instance de cache du processus"""
+    global _cache
+    if _cache is None:
+        if settings.CACHE_BACKEND == "redis":
+            _cache = RedisCache(settings.REDIS_URL)
+        else:
+            _cache = MemoryCache()
+        logger.info(f"Cache backend: {settings.CACHE_BACKEND}")
+    return _cache
+
+
+async def get_json(key: str) -> Any:
+    value = await get_cache().get(key)
+    return json.loads(value) if value is not None else None
+
+
+async def set_json(key: str, value: Any, ttl: Optional[int] = None):
+    await get_cache().set(key, json.dumps(value, default=str), ttl)
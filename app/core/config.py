@@ -6,6 +6,21 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REDIS_URL: str = "redis://localhost:6379"
+    CACHE_BACKEND: str = "memory"  # memory | redis
+    TX_MAX_WAIT_SECONDS: int = 10  # attente d'une connexion pour ouvrir une transaction
+    ALERT_TX_TIMEOUT_SECONDS: int = 60
+    BACKFILL_TX_TIMEOUT_SECONDS: int = 120  # une tranche magasin × mois
+    BATCH_TX_TIMEOUT_SECONDS: int = 60  # lot de mouvements (caisses)
+    CRON_CONCURRENCY: int = 4
+    CRON_TENANT_TIMEOUT_SECONDS: int = 600
+    CALENDAR_CACHE_TTL_SECONDS: int = 21600
+    JOB_QUEUE_BACKEND: str = "memory"  # memory | redis
+    EXPORT_WORKERS: int = 1  # workers dans le processus API (0: processus dédié)
+    EXPORT_DIR: str = ""  # défaut: <tmp>/stockflow-exports
+    EXPORT_TTL_SECONDS: int = 86400
+    REPORT_CACHE_TTL_SECONDS: int = 86400
+    DASHBOARD_SNAPSHOT_TTL_SECONDS: int = 900
+    DASHBOARD_LOCK_TIMEOUT_SECONDS: int = 30
     ENVIRONMENT: str = "development"
     
     class Config:
@@ -1,5 +1,4 @@
 from prisma import Prisma
-from contextlib import asynccontextmanager
 
 prisma = Prisma()
 
@@ -9,9 +8,6 @@ async def connect_db():
 async def disconnect_db():
     await prisma.disconnect()
 
-@asynccontextmanager
 async def get_db():
-    try:
-        yield prisma
-    finally:
-        pass
+    # Utilisable à la fois via `await get_db()` (services, crons) et `Depends(get_db)` (endpoints)
+    return prisma
@@ -0,0 +1,57 @@
+"""
+Bus d'événements applicatifs en processus
+
+Les services publient des événements (ex: stock modifié) et les abonnés
+(alertes, dashboard...) sont exécutés en tâche de fond pour ne pas
+rallonger la requête HTTP qui a produit l'événement. Les services publient
+après la validation de leur transaction: `publie_le` (UTC, ajouté au
+payload) situe l'événement par rapport aux lectures de la base.
+"""
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Set
+from datetime import datetime, timezone
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+STOCK_CHANGED = "stock_changed"
+CATALOGUE_CHANGED = "catalogue_changed"
+
+Handler = Callable[[Dict], Awaitable[None]]
+
+_handlers: Dict[str, List[Handler]] = defaultdict(list)
+_pending: Set[asyncio.Task] = set()
+
+
+def subscribe(event: str, handler: Handler):
+    """Abonner un handler asynchrone à un événement"""
+    if handler not in _handlers[event]:
+        _handlers[event].append(handler)
+
+
+def unsubscribe(event: str, handler: Handler):
+    if handler in _handlers[event]:
+        _handlers[event].remove(handler)
+
+
+async def _run(handler: Handler, event: str, payload: Dict):
+    try:
+        await handler(payload)
+    except Exception as e:
+        logger.error(f"Error in {event} handler {handler.__qualname__}: {str(e)}")
+
+
+def publish(event: str, payload: Dict):
+    """Publier un événement (les handlers s'exécutent en arrière-plan)"""
+    payload = {**payload, "publie_le": datetime.now(timezone.utc).isoformat()}
+    for handler in _handlers[event]:
+        task = asyncio.create_task(_run(handler, event, payload))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+
+async def drain():
+    """Attendre la fin des handlers en cours (arrêt de l'application, tests)"""
+    while _pending:
+        await asyncio.gather(*list(_pending))
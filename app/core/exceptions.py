@@ -44,3 +44,11 @@ class ForbiddenException(StockFlowException):
             detail=detail,
             status_code=status.HTTP_403_FORBIDDEN
         )
+
+
+class InvalidCursorException(StockFlowException):
+    def __init__(self, detail: str = "Curseur de pagination invalide"):
+        super().__init__(
+            detail=detail,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
@@ -0,0 +1,252 @@
+"""
+File de tâches d'export en arrière-plan
+
+Une demande d'export enregistre une tâche et rend son id immédiatement; des
+workers asyncio la dépilent, produisent le fichier et le déposent dans
+settings.EXPORT_DIR, où il reste settings.EXPORT_TTL_SECONDS.
+
+Le backend est choisi par settings.JOB_QUEUE_BACKEND: "redis" (liste Redis
+partagée, les workers peuvent tourner dans un processus dédié:
+`python -m app.crons export-worker`), "memory" (asyncio.Queue du processus,
+développement et déploiement mono-worker). L'état des tâches est stocké dans
+le cache (app.core.cache), qui doit donc être partagé avec Redis dès que les
+workers tournent dans un autre processus.
+"""
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from datetime import datetime, timedelta
+from uuid import uuid4
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from app.core.cache import get_json, set_json
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EN_ATTENTE = "en_attente"
+EN_COURS = "en_cours"
+TERMINE = "termine"
+ERREUR = "erreur"
+
+QUEUE_KEY = "export_jobs:queue"
+
+# Un handler reçoit les paramètres de la tâche et rend (corps, media type, extension),
+# le même triplet que app.utils.export_writers.export_pages
+Corps = Union[Iterable[bytes], AsyncIterable[bytes]]
+JobHandler = Callable[[Dict], Awaitable[Tuple[Corps, str, str]]]
+
+_handlers: Dict[str, JobHandler] = {}
+_workers: List[asyncio.Task] = []
+
+
+def register_job(type_job: str):
+    """Décorateur: enregistrer le handler d'un type de tâche"""
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[type_job] = handler
+        return handler
+    return decorator
+
+
+def export_dir() -> str:
+    path = settings.EXPORT_DIR or os.path.join(tempfile.gettempdir(), "stockflow-exports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class MemoryJobQueue:
+    """Stand-in local de la liste Redis"""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def push(self, job_id: str):
+        await self._queue.put(job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisJobQueue:
+    """Liste Redis partagée entre l'API et les processus workers"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def push(self, job_id: str):
+        await self._client.lpush(QUEUE_KEY, job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        item = await self._client.brpop(QUEUE_KEY, timeout=max(int(timeout), 1))
+        return item[1] if item else None
+
+
+_queue = None
+
+
+def get_queue():
+    """Retourner la file du processus"""
+    global _queue
+    if _queue is None:
+        if settings.JOB_QUEUE_BACKEND == "redis":
+            _queue = RedisJobQueue(settings.REDIS_URL)
+        else:
+            _queue = MemoryJobQueue()
+        logger.info(f"Job queue backend: {settings.JOB_QUEUE_BACKEND}")
+    return _queue
+
+
+def _key(job_id: str) -> str:
+    return f"export_job:{job_id}"
+
+
+async def get_job(job_id: str) -> Optional[Dict]:
+    return await get_json(_key(job_id))
+
+
+async def _save(job: Dict):
+    await set_json(_key(job["id"]), job, settings.EXPORT_TTL_SECONDS)
+
+
+async def enqueue(type_job: str, params: Dict[str, Any], user_id: Optional[str] = None) -> Dict:
+    """
+    Enregistrer une tâche et la mettre en file
+
+    Returns:
+        La tâche (statut en_attente)
+
+    Raises:
+        ValueError: type de tâche inconnu
+    """
+    if type_job not in _handlers:
+        raise ValueError(f"Type d'export inconnu: {type_job}")
+
+    job = {
+        "id": str(uuid4()),
+        "type": type_job,
+        "statut": EN_ATTENTE,
+        "params": params,
+        "user_id": user_id,
+        "created_at": datetime.now().isoformat(),
+        "started_at": None,
+        "finished_at": None,
+        "fichier": None,
+        "nom_fichier": None,
+        "media_type": None,
+        "taille": None,
+        "expire_le": None,
+        "erreur": None,
+    }
+    await _save(job)
+    await get_queue().push(job["id"])
+    logger.info(f"Export job {job['id']} queued ({type_job})")
+    return job
+
+
+def _write_blocs(blocs, path: str, mode: str = "wb") -> int:
+    taille = 0
+    with open(path, mode) as f:
+        for bloc in blocs:
+            f.write(bloc)
+            taille += len(bloc)
+    return taille
+
+
+async def _write_body(body: Corps, path: str) -> int:
+    """Écrire le corps dans le fichier, hors de la boucle d'événements (les workers partagent celle de l'API)"""
+    if not hasattr(body, "__aiter__"):
+        return await asyncio.to_thread(_write_blocs, body, path)
+    taille = await asyncio.to_thread(_write_blocs, [], path)
+    async for bloc in body:
+        taille += await asyncio.to_thread(_write_blocs, [bloc], path, "ab")
+    return taille
+
+
+async def run_job(job_id: str) -> Optional[Dict]:
+    """Exécuter une tâche: produire le fichier puis mettre à jour son statut"""
+    job = await get_job(job_id)
+    if job is None:
+        logger.warning(f"Export job {job_id} expired before running")
+        return None
+
+    job.update(statut=EN_COURS, started_at=datetime.now().isoformat())
+    await _save(job)
+
+    path = None
+    try:
+        body, media_type, extension = await _handlers[job["type"]](job["params"])
+        path = os.path.join(export_dir(), f"{job['id']}.{extension}")
+        taille = await _write_body(body, path)
+    except Exception as e:
+        if path and os.path.exists(path):
+            os.remove(path)
+        job.update(statut=ERREUR, erreur=str(e), finished_at=datetime.now().isoformat())
+        logger.error(f"Export job {job_id} failed: {str(e)}")
+    else:
+        job.update(
+            statut=TERMINE,
+            fichier=path,
+            nom_fichier=f"{job['type']}_{datetime.now().strftime('%Y%m%d')}.{extension}",
+            media_type=media_type,
+            taille=taille,
+            expire_le=(datetime.now() + timedelta(seconds=settings.EXPORT_TTL_SECONDS)).isoformat(),
+            finished_at=datetime.now().isoformat()
+        )
+        logger.info(f"Export job {job_id} done: {taille} bytes")
+    await _save(job)
+    return job
+
+
+def purge_expired(ttl: Optional[int] = None) -> int:
+    """Supprimer les fichiers d'export plus vieux que le TTL; renvoie le nombre supprimé"""
+    ttl = ttl if ttl is not None else settings.EXPORT_TTL_SECONDS
+    limite = time.time() - ttl
+    supprimes = 0
+    with os.scandir(export_dir()) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < limite:
+                os.remove(entry.path)
+                supprimes += 1
+    if supprimes:
+        logger.info(f"Purged {supprimes} expired export files")
+    return supprimes
+
+
+async def worker(nom: str = "export-worker", poll_seconds: float = 5.0, purge_seconds: float = 600.0):
+    """Boucle d'un worker: dépiler et exécuter les tâches, purger périodiquement"""
+    queue = get_queue()
+    derniere_purge = None
+    while True:
+        if derniere_purge is None or time.monotonic() - derniere_purge > purge_seconds:
+            await asyncio.to_thread(purge_expired)
+            derniere_purge = time.monotonic()
+        job_id = await queue.pop(poll_seconds)
+        if job_id is None:
+            continue
+        try:
+            await run_job(job_id)
+        except Exception as e:
+            # Jamais d'arrêt du worker sur une tâche (ex: cache indisponible)
+            logger.error(f"[{nom}] job {job_id}: {str(e)}")
+
+
+def start_workers(nombre: Optional[int] = None):
+    """Démarrer les workers dans la boucle courante (démarrage de l'API)"""
+    nombre = settings.EXPORT_WORKERS if nombre is None else nombre
+    for i in range(nombre):
+        _workers.append(asyncio.create_task(worker(f"export-worker-{i}")))
+
+
+async def stop_workers():
+    """Arrêter les workers (arrêt de l'application); une tâche en cours est abandonnée"""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
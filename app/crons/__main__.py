@@ -0,0 +1,150 @@
+"""
+Point d'entrée des tâches planifiées et commandes de maintenance
+
+Usage:
+    python -m app.crons alerts      # */6h  - réconciliation des alertes
+    python -m app.crons forecasts   # 2h    - prévisions IA quotidiennes
+    python -m app.crons reports     # 1er du mois 6h - rapports mensuels
+    python -m app.crons activite-articles  # 1h30 - réconciliation de l'activité des articles
+    python -m app.crons backfill-ventes [--magasin ID] [--jours N]
+    python -m app.crons backtest [--magasin ID] [--jours N] [--horizon H] [--synthetic] [--output FICHIER]
+    python -m app.crons export-worker [--workers N]   # service: exports en file (JOB_QUEUE_BACKEND=redis)
+
+Options des tâches par tenant: --concurrency N (tenants en parallèle), --timeout S (par tenant)
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import date, timedelta
+from app.core.config import settings
+from app.core.database import connect_db, disconnect_db
+from app.core import job_queue
+from app.utils.helpers import utc_today
+from app.crons.alert_generator import generate_alerts
+from app.crons.ai_predictions import generate_daily_forecasts
+from app.crons.report_generator import generate_monthly_reports
+from app.crons.article_activity import reconcile_article_activity
+from app.services.sales_aggregate_service import SalesAggregateService
+from app.services.backtest_service import BacktestService
+
+logger = logging.getLogger(__name__)
+
+JOBS = {
+    "alerts": generate_alerts,
+    "forecasts": generate_daily_forecasts,
+    "reports": generate_monthly_reports,
+    "activite-articles": reconcile_article_activity,
+}
+
+
+async def backfill_ventes(magasin_id: str = None, jours: int = None):
+    date_debut = utc_today() - timedelta(days=jours) if jours else None
+    return await SalesAggregateService.backfill(magasin_id=magasin_id, date_debut=date_debut)
+
+
+async def backtest(
+    magasin_id: str = None,
+    jours: int = 112,
+    horizon: int = 7,
+    pas: int = 7,
+    synthetic: bool = False,
+    output: str = None
+):
+    """Backtest des modèles; bascule sur des données synthétiques si la base est indisponible"""
+    rapport = None
+    if not synthetic:
+        try:
+            await connect_db()
+        except Exception as e:
+            logger.warning(f"Database unavailable ({e}), backtesting on synthetic data")
+        else:
+            try:
+                rapport = await BacktestService.run(magasin_id, jours, horizon, pas)
+            finally:
+                await disconnect_db()
+    if rapport is None:
+        rapport = BacktestService.synthetic_report(jours=jours, horizon=horizon, pas=pas)
+
+    output = output or f"backtest-{date.today():%Y%m%d}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+
+    for magasin in rapport["magasins"]:
+        for modele, resultat in magasin["modeles"].items():
+            logger.info(
+                f"{magasin['code']} {modele:<24} MAPE {resultat['mape']:6.2f}%  "
+                f"WMAPE {resultat['wmape']:6.2f}%  {resultat['duree_ms']:9.1f} ms"
+            )
+    logger.info(f"Backtest report written to {output}")
+    return rapport
+
+
+async def export_worker(workers: int = 1):
+    """Dépiler les exports demandés à l'API (jusqu'à l'arrêt du processus)"""
+    import app.jobs.export_jobs  # noqa: F401 (enregistre les handlers d'export)
+
+    if settings.JOB_QUEUE_BACKEND != "redis":
+        logger.warning("JOB_QUEUE_BACKEND is not redis: this worker will not see jobs queued by the API")
+    await asyncio.gather(*(job_queue.worker(f"export-worker-{i}") for i in range(workers)))
+
+
+COMMANDS = {
+    "backfill-ventes": backfill_ventes,
+    "export-worker": export_worker,
+}
+
+# Commandes qui gèrent elles-mêmes la connexion (peuvent tourner sans base)
+STANDALONE = {
+    "backtest": backtest,
+}
+
+
+async def run_job(job: str, **options):
+    if job in STANDALONE:
+        return await STANDALONE[job](**options)
+
+    await connect_db()
+    try:
+        handler = JOBS.get(job) or COMMANDS[job]
+        return await handler(**options)
+    finally:
+        await disconnect_db()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.crons", description="Tâches planifiées StockFlow Pro")
+    subparsers = parser.add_subparsers(dest="job", required=True)
+
+    for job in JOBS:
+        sub = subparsers.add_parser(job)
+        sub.add_argument("--concurrency", type=int, default=None, help="Tenants traités en parallèle")
+        sub.add_argument("--timeout", type=float, default=None, help="Durée max par tenant (secondes)")
+
+    backfill = subparsers.add_parser("backfill-ventes", help="Reconstruire l'agrégat journalier des ventes")
+    backfill.add_argument("--magasin", dest="magasin_id", default=None, help="Limiter à un magasin")
+    backfill.add_argument("--jours", type=int, default=None, help="Reconstruire les N derniers jours (défaut: tout)")
+
+    bt = subparsers.add_parser("backtest", help="Mesurer la précision et la vitesse des modèles de prévision")
+    bt.add_argument("--magasin", dest="magasin_id", default=None, help="Limiter à un magasin")
+    bt.add_argument("--jours", type=int, default=112, help="Historique rejoué (jours)")
+    bt.add_argument("--horizon", type=int, default=7, help="Jours prévus à chaque origine")
+    bt.add_argument("--pas", type=int, default=7, help="Jours entre deux origines")
+    bt.add_argument("--synthetic", action="store_true", help="Données synthétiques reproductibles, sans base")
+    bt.add_argument("--output", default=None, help="Fichier JSON du rapport (défaut: backtest-AAAAMMJJ.json)")
+
+    ew = subparsers.add_parser("export-worker", help="Worker de la file d'export (processus dédié)")
+    ew.add_argument("--workers", type=int, default=1, help="Exports traités en parallèle")
+
+    return parser
+
+
+def main(argv=None):
+    options = vars(build_parser().parse_args(argv))
+    job = options.pop("job")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_job(job, **options))
+
+
+if __name__ == "__main__":
+    main()
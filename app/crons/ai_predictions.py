@@ -2,17 +2,17 @@
 Tâche planifiée pour générer les prévisions IA quotidiennes
 À exécuter via cron: 0 2 * * * (tous les jours à 2h du matin)
 """
-import asyncio
-from datetime import datetime, timedelta
+from typing import Optional
+from datetime import datetime
 from app.core.database import get_db
+from app.crons.runner import run_for_tenants
 from app.services.ai_forecast_service import AIForecastService
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def generate_daily_forecasts():
+async def generate_daily_forecasts(concurrency: Optional[int] = None, timeout: Optional[float] = None):
     """Générer les prévisions pour tous les articles éligibles"""
     logger.info("Starting daily forecast generation...")
     
@@ -21,46 +21,30 @@ async def generate_daily_forecasts():
     
     magasins = await db.magasin.find_many()
     
-    total_forecasts = 0
-    errors = 0
+    resume = await run_for_tenants(
+        "forecasts",
+        magasins,
+        lambda magasin: ai_service.generate_forecasts_batch(magasin.id, entreprise_id=magasin.entreprise_id),
+        name=lambda magasin: magasin.code,
+        concurrency=concurrency,
+        timeout=timeout
+    )
     
-    for magasin in magasins:
-        try:
-            articles = await db.article.find_many(
-                where={"magasin_id": magasin.id, "is_active": True}
-            )
-            
-            for article in articles:
-                try:
-                    date_limite = datetime.now() - timedelta(weeks=4)
-                    ventes_count = await db.vente.count(
-                        where={
-                            "article_id": article.id,
-                            "date_vente": {"gte": date_limite}
-                        }
-                    )
-                    
-                    if ventes_count >= 4:
-                        forecast = await ai_service.generate_forecast(
-                            article_id=article.id,
-                            magasin_id=magasin.id
-                        )
-                        
-                        if forecast:
-                            total_forecasts += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error forecasting article {article.code}: {str(e)}")
-                    errors += 1
-        
-        except Exception as e:
-            logger.error(f"Error processing magasin {magasin.code}: {str(e)}")
-            errors += 1
+    resultats = [r["resultat"] for r in resume["tenants"] if r["statut"] == "ok"]
+    total_forecasts = sum(r["forecasts"] for r in resultats)
+    errors = resume["erreurs"] + resume["timeouts"]
+    duree_s = resume["duree_ms"] / 1000
+    skus_par_seconde = round(total_forecasts / duree_s, 1) if duree_s > 0 else 0.0
     
-    logger.info(f"Forecast generation completed. Total: {total_forecasts}, Errors: {errors}")
+    logger.info(
+        f"Forecast generation completed. Total: {total_forecasts}, Errors: {errors}, "
+        f"Throughput: {skus_par_seconde} SKU/s"
+    )
     
-    return {"total_forecasts": total_forecasts, "errors": errors, "timestamp": datetime.now()}
-
-
-if __name__ == "__main__":
-    asyncio.run(generate_daily_forecasts())
+    return {
+        "total_forecasts": total_forecasts,
+        "errors": errors,
+        "skus_par_seconde": skus_par_seconde,
+        "summary": resume,
+        "timestamp": datetime.now()
+    }
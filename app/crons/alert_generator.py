@@ -1,18 +1,23 @@
 """
-Tâche planifiée pour générer les alertes automatiques
-À exécuter via cron: */30 * * * * (toutes les 30 minutes)
+Tâche planifiée de réconciliation des alertes
+À exécuter via cron: 0 */6 * * * (toutes les 6 heures)
+
+Les alertes sont maintenues en continu par les événements STOCK_CHANGED;
+ce scan complet rattrape ce qui a pu être manqué (péremptions qui
+approchent sans mouvement, événement perdu au redémarrage d'un worker).
 """
-import asyncio
+from typing import Optional
 from datetime import datetime
 from app.core.database import get_db
+from app.crons.runner import run_for_tenants
 from app.services.inventory_service import InventoryService
+from app.services.alert_engine import alert_engine
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def generate_alerts():
+async def generate_alerts(concurrency: Optional[int] = None, timeout: Optional[float] = None):
     """Vérifier les stocks et générer les alertes nécessaires"""
     logger.info("Starting alert generation...")
     
@@ -21,21 +26,26 @@ async def generate_alerts():
     
     magasins = await db.magasin.find_many()
     
-    total_alerts = 0
+    resume = await run_for_tenants(
+        "alerts",
+        magasins,
+        lambda magasin: inventory_service.check_stock_levels(magasin.id),
+        name=lambda magasin: magasin.code,
+        concurrency=concurrency,
+        timeout=timeout
+    )
     
-    for magasin in magasins:
-        try:
-            result = await inventory_service.check_stock_levels(magasin.id)
-            total_alerts += result["alertes_generees"]
-            logger.info(f"Magasin {magasin.code}: {result['alertes_generees']} alertes générées")
-        
-        except Exception as e:
-            logger.error(f"Error generating alerts for {magasin.code}: {str(e)}")
+    resultats = [r["resultat"] for r in resume["tenants"] if r["statut"] == "ok"]
+    total_alerts = sum(r["alertes_generees"] for r in resultats)
+    total_scanned = sum(r["stats"]["lignes_scannees"] for r in resultats)
     
-    logger.info(f"Alert generation completed. Total alerts: {total_alerts}")
+    logger.info(f"Alert generation completed. Total alerts: {total_alerts}, rows scanned: {total_scanned}")
+    logger.info(f"Articles evaluated: {await alert_engine.compteurs()}")
     
-    return {"total_alerts": total_alerts, "timestamp": datetime.now()}
-
-
-if __name__ == "__main__":
-    asyncio.run(generate_alerts())
+    return {
+        "total_alerts": total_alerts,
+        "rows_scanned": total_scanned,
+        "errors": resume["erreurs"] + resume["timeouts"],
+        "summary": resume,
+        "timestamp": datetime.now()
+    }
@@ -0,0 +1,44 @@
+"""
+Tâche planifiée de réconciliation de l'activité des articles
+À exécuter via cron: 30 1 * * * (chaque nuit à 1h30)
+
+Les colonnes last_entree_at, last_sortie_at, sold_7d et sold_28d sont
+maintenues à chaque mouvement; ce passage retire des compteurs glissants les
+sorties devenues trop anciennes et rattrape les mouvements écrits hors
+MouvementService (synchronisation mobile).
+"""
+from typing import Optional
+from datetime import datetime
+from app.core.database import get_db
+from app.crons.runner import run_for_tenants
+from app.services.article_activity_service import ArticleActivityService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_article_activity(concurrency: Optional[int] = None, timeout: Optional[float] = None):
+    """Recalculer l'activité des articles de tous les magasins"""
+    logger.info("Starting article activity reconciliation...")
+
+    db = await get_db()
+    magasins = await db.magasin.find_many()
+
+    resume = await run_for_tenants(
+        "article-activity",
+        magasins,
+        lambda magasin: ArticleActivityService.reconcile(magasin.id),
+        name=lambda magasin: magasin.code,
+        concurrency=concurrency,
+        timeout=timeout
+    )
+
+    corriges = sum(r["resultat"] for r in resume["tenants"] if r["statut"] == "ok")
+    logger.info(f"Article activity reconciliation completed. Articles updated: {corriges}")
+
+    return {
+        "articles_corriges": corriges,
+        "errors": resume["erreurs"] + resume["timeouts"],
+        "summary": resume,
+        "timestamp": datetime.now()
+    }
@@ -2,17 +2,17 @@
 Tâche planifiée pour générer les rapports automatiques
 À exécuter via cron: 0 6 1 * * (1er de chaque mois à 6h)
 """
-import asyncio
+from typing import Optional
 from datetime import datetime
 from app.core.database import get_db
+from app.crons.runner import run_for_tenants
 from app.jobs.export_jobs import generate_monthly_report, export_for_accountant
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def generate_monthly_reports():
+async def generate_monthly_reports(concurrency: Optional[int] = None, timeout: Optional[float] = None):
     """Générer les rapports mensuels pour toutes les entreprises"""
     logger.info("Starting monthly report generation...")
     
@@ -25,22 +25,21 @@ async def generate_monthly_reports():
     
     entreprises = await db.entreprise.find_many()
     
-    total_reports = 0
+    async def _reports_entreprise(entreprise):
+        await generate_monthly_report(entreprise.id, month, year)
+        await export_for_accountant(entreprise.id)
+        logger.info(f"Reports generated for {entreprise.nom}")
     
-    for entreprise in entreprises:
-        try:
-            await generate_monthly_report(entreprise.id, month, year)
-            await export_for_accountant(entreprise.id)
-            total_reports += 1
-            logger.info(f"Reports generated for {entreprise.nom}")
-        
-        except Exception as e:
-            logger.error(f"Error generating reports for {entreprise.nom}: {str(e)}")
+    resume = await run_for_tenants(
+        "reports",
+        entreprises,
+        _reports_entreprise,
+        name=lambda entreprise: entreprise.nom,
+        concurrency=concurrency,
+        timeout=timeout
+    )
     
+    total_reports = resume["succes"]
     logger.info(f"Monthly report generation completed. Total: {total_reports}")
     
-    return {"total_reports": total_reports, "month": month, "year": year}
-
-
-if __name__ == "__main__":
-    asyncio.run(generate_monthly_reports())
+    return {"total_reports": total_reports, "month": month, "year": year, "summary": resume}
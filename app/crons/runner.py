@@ -0,0 +1,80 @@
+"""
+Exécution concurrente des tâches planifiées par tenant (magasin / entreprise)
+
+Chaque tenant est traité sous un sémaphore borné, avec un timeout propre;
+l'échec ou le dépassement d'un tenant n'interrompt pas les autres.
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from time import perf_counter
+import asyncio
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def run_for_tenants(
+    job: str,
+    tenants: Iterable[Any],
+    worker: Callable[[Any], Awaitable[Any]],
+    name: Callable[[Any], str] = lambda tenant: tenant.id,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> Dict:
+    """
+    Exécuter `worker` pour chaque tenant avec un parallélisme borné
+
+    Args:
+        job: nom de la tâche (logs)
+        tenants: magasins ou entreprises à traiter
+        worker: coroutine appelée avec un tenant
+        name: libellé d'un tenant dans le résumé
+        concurrency: nombre de tenants traités simultanément (défaut: settings)
+        timeout: durée max en secondes par tenant (défaut: settings)
+
+    Returns:
+        Résumé avec le statut, la durée et le résultat de chaque tenant
+    """
+    concurrency = concurrency or settings.CRON_CONCURRENCY
+    timeout = timeout or settings.CRON_TENANT_TIMEOUT_SECONDS
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run_one(tenant: Any) -> Dict:
+        async with semaphore:
+            rapport = {"tenant": name(tenant), "statut": "ok", "resultat": None, "erreur": None}
+            debut = perf_counter()
+            try:
+                rapport["resultat"] = await asyncio.wait_for(worker(tenant), timeout)
+            except asyncio.TimeoutError:
+                rapport["statut"] = "timeout"
+                rapport["erreur"] = f"Timeout après {timeout}s"
+                logger.error(f"[{job}] {rapport['tenant']}: timeout after {timeout}s")
+            except Exception as e:
+                rapport["statut"] = "erreur"
+                rapport["erreur"] = str(e)
+                logger.error(f"[{job}] {rapport['tenant']}: {str(e)}")
+            rapport["duree_ms"] = round((perf_counter() - debut) * 1000, 2)
+            return rapport
+
+    debut = perf_counter()
+    rapports = await asyncio.gather(*[_run_one(tenant) for tenant in tenants])
+    duree_ms = round((perf_counter() - debut) * 1000, 2)
+
+    resume = {
+        "job": job,
+        "total": len(rapports),
+        "succes": sum(1 for r in rapports if r["statut"] == "ok"),
+        "erreurs": sum(1 for r in rapports if r["statut"] == "erreur"),
+        "timeouts": sum(1 for r in rapports if r["statut"] == "timeout"),
+        "concurrence": concurrency,
+        "duree_ms": duree_ms,
+        "tenants": sorted(rapports, key=lambda r: r["duree_ms"], reverse=True)
+    }
+
+    plus_lents = ", ".join(f"{r['tenant']}={r['duree_ms']}ms" for r in resume["tenants"][:5])
+    logger.info(
+        f"[{job}] {resume['succes']}/{resume['total']} ok, {resume['erreurs']} errors, "
+        f"{resume['timeouts']} timeouts in {duree_ms}ms (slowest: {plus_lents})"
+    )
+    return resume
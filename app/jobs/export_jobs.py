@@ -1,14 +1,94 @@
 """
 Jobs d'export en arrière-plan
+
+Les handlers de la file d'export (app.core.job_queue) sont enregistrés ici:
+chacun rend (corps, media type, extension), que le worker écrit sur disque.
+Les workers tournent par défaut dans la boucle de l'API: les rendus
+synchrones (openpyxl, pandas) passent par asyncio.to_thread.
 """
-from datetime import datetime
+from typing import Dict
+from datetime import datetime, timedelta
+import asyncio
 from app.core.database import get_db
+from app.core.job_queue import register_job
 from app.services.export_service import ExportService
+from app.services.report_service import ReportService
+from app.utils.export_writers import COLONNES_STOCK, COLONNES_VALORISATION, MEDIA_TYPES, as_datetime
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 
+@register_job("mouvements")
+async def export_mouvements_job(params: Dict):
+    db = await get_db()
+    return await ExportService().export_mouvements(
+        db,
+        params["magasin_id"],
+        as_datetime(params.get("date_debut")),
+        as_datetime(params.get("date_fin")),
+        format=params.get("format", "xlsx"),
+        gzip=params.get("gzip", False)
+    )
+
+
+@register_job("stock")
+async def export_stock_job(params: Dict):
+    db = await get_db()
+    articles = await db.article.find_many(where={"magasin_id": params["magasin_id"], "is_active": True})
+    export_service = ExportService()
+    return await export_service.export_rows(
+        params.get("format", "xlsx"), "Stock", COLONNES_STOCK, export_service.stock_values(articles),
+        params.get("gzip", False)
+    )
+
+
+@register_job("valorisation")
+async def export_valorisation_job(params: Dict):
+    db = await get_db()
+    articles = await db.article.find_many(where={"magasin_id": params["magasin_id"], "is_active": True})
+    export_service = ExportService()
+    format = params.get("format", "xlsx")
+    if format == "xlsx":
+        # Mise en page comptable (sous-totaux) construite en mémoire: volume borné par le catalogue
+        contenu = await asyncio.to_thread(export_service.export_valorisation_excel, articles, params.get("grouper_par"))
+        return [contenu], MEDIA_TYPES["xlsx"], "xlsx"
+    return await export_service.export_rows(
+        format, "Valorisation Stock", COLONNES_VALORISATION, export_service.valorisation_values(articles),
+        params.get("gzip", False)
+    )
+
+
+def _rapport(contenu: bytes, format: str):
+    format = "xlsx" if format in ("excel", "xlsx") else format
+    return [contenu], MEDIA_TYPES[format], format
+
+
+@register_job("rapport_mouvements")
+async def rapport_mouvements_job(params: Dict):
+    contenu = await ReportService.generate_mouvements_report(
+        params["magasin_id"], as_datetime(params.get("date_debut")), as_datetime(params.get("date_fin")),
+        format=params["format"], periode=params.get("periode", "mois")
+    )
+    return _rapport(contenu, params["format"])
+
+
+@register_job("rapport_valorisation")
+async def rapport_valorisation_job(params: Dict):
+    contenu = await ReportService.generate_valorisation_report(params["magasin_id"], format=params["format"])
+    return _rapport(contenu, params["format"])
+
+
+@register_job("rapport_marges")
+async def rapport_marges_job(params: Dict):
+    contenu = await ReportService.generate_marges_report(
+        params["magasin_id"], as_datetime(params.get("date_debut")), as_datetime(params.get("date_fin")),
+        format=params["format"], periode=params.get("periode", "mois")
+    )
+    return _rapport(contenu, params["format"])
+
+
 async def generate_monthly_report(entreprise_id: str, month: int, year: int):
     """Générer le rapport mensuel automatique"""
     db = await get_db()
@@ -20,22 +100,14 @@ async def generate_monthly_report(entreprise_id: str, month: int, year: int):
     
     for magasin in magasins:
         try:
-            # Récupérer les données du mois
-            mouvements = await db.mouvementstock.find_many(
-                where={
-                    "magasin_id": magasin.id,
-                    "date_mouvement": {
-                        "gte": datetime(year, month, 1),
-                        "lt": datetime(year, month + 1, 1) if month < 12 else datetime(year + 1, 1, 1)
-                    }
-                },
-                include={"article": True}
+            # Générer l'export du mois (écrit page par page dans un fichier temporaire)
+            fin = datetime(year, month + 1, 1) if month < 12 else datetime(year + 1, 1, 1)
+            path = await export_service.write_mouvements_excel(
+                db, magasin.id, datetime(year, month, 1), fin - timedelta(microseconds=1)
             )
             
-            # Générer l'export
-            excel_buffer = export_service.export_mouvements_excel(mouvements)
-            
             # Sauvegarder ou envoyer par email
+            os.remove(path)
             logger.info(f"Monthly report generated for magasin {magasin.code}")
             
         except Exception as e:
@@ -56,6 +128,6 @@ async def export_for_accountant(entreprise_id: str):
             where={"magasin_id": magasin.id, "is_active": True}
         )
         
-        excel_buffer = export_service.export_valorisation_excel(articles)
+        excel_buffer = await asyncio.to_thread(export_service.export_valorisation_excel, articles)
         
         logger.info(f"Accounting export generated for {magasin.code}")
@@ -2,14 +2,24 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.database import connect_db, disconnect_db
+from app.core.events import drain
+from app.core.job_queue import start_workers, stop_workers
+from app.services.alert_engine import register_alert_handlers
+from app.services.dashboard_service import register_dashboard_handlers
 from app.api.v1.api import api_router
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_db()
+    register_alert_handlers()
+    register_dashboard_handlers()
+    start_workers()
     yield
     # Shutdown
+    await stop_workers()
+    await drain()
     await disconnect_db()
 
 app = FastAPI(
@@ -28,6 +38,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Routes API v1
@@ -36,6 +36,10 @@ class ArticleResponse(ArticleBase):
     magasin_id: str
     created_at: datetime
     updated_at: datetime
+    last_entree_at: Optional[datetime] = None
+    last_sortie_at: Optional[datetime] = None
+    sold_7d: int = 0
+    sold_28d: int = 0
 
     class Config:
         from_attributes = True
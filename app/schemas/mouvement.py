@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class MouvementStockBase(BaseModel):
@@ -15,6 +15,13 @@ class MouvementStockCreate(MouvementStockBase):
     magasin_id: str
     fournisseur_id: Optional[str] = None
 
+MOUVEMENTS_PAR_LOT_MAX = 5000
+
+
+class MouvementBatchCreate(BaseModel):
+    # Validés un par un par le service: un mouvement invalide n'invalide pas le lot
+    mouvements: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MOUVEMENTS_PAR_LOT_MAX)
+
 class MouvementStockResponse(MouvementStockBase):
     id: str
     article_id: str
@@ -1,25 +1,59 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 
-class TransfertCreate(BaseModel):
+LIGNES_PAR_TRANSFERT_MAX = 2000
+
+
+class LigneTransfertCreate(BaseModel):
     article_id: str
+    quantite: int = Field(..., gt=0)
+
+
+class TransfertCreate(BaseModel):
     magasin_origine_id: str
     magasin_destination_id: str
-    quantite: int = Field(..., gt=0)
+    lignes: List[LigneTransfertCreate] = Field(default_factory=list, max_length=LIGNES_PAR_TRANSFERT_MAX)
+    # Forme mono-article historique, équivalente à une seule ligne
+    article_id: Optional[str] = None
+    quantite: Optional[int] = Field(None, gt=0)
     notes: Optional[str] = None
 
+    @model_validator(mode="after")
+    def check_lignes(self):
+        if self.article_id and self.quantite:
+            self.lignes = [*self.lignes, LigneTransfertCreate(article_id=self.article_id, quantite=self.quantite)]
+        if not self.lignes:
+            raise ValueError("Le transfert doit contenir au moins une ligne")
+        if len({l.article_id for l in self.lignes}) != len(self.lignes):
+            raise ValueError("Un article ne peut apparaître qu'une fois par transfert")
+        if self.magasin_origine_id == self.magasin_destination_id:
+            raise ValueError("Les magasins d'origine et de destination doivent être différents")
+        return self
+
 
 class TransfertUpdate(BaseModel):
     statut: Optional[str] = None
     notes: Optional[str] = None
 
 
+class LigneTransfertResponse(BaseModel):
+    id: str
+    article_id: str
+    article_destination_id: Optional[str] = None
+    quantite: int
+    quantite_recue: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
 class TransfertResponse(BaseModel):
     id: str
     reference: str
-    article_id: str
+    entreprise_id: str
+    article_id: Optional[str] = None
     magasin_origine_id: str
     magasin_destination_id: str
     quantite: int
@@ -27,6 +61,7 @@ class TransfertResponse(BaseModel):
     date_transfert: Optional[datetime] = None
     date_reception: Optional[datetime] = None
     notes: Optional[str] = None
+    lignes: List[LigneTransfertResponse] = []
     created_at: datetime
     updated_at: datetime
 
@@ -1,22 +1,48 @@
 """
 Service IA pour la prévision de la demande
-Version MVP: Moyenne Mobile Pondérée
+Modèles: moyenne mobile pondérée, Holt-Winters hebdomadaire, Croston (voir app.utils.forecast_engine)
 """
 from typing import Dict, Optional, List
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from app.core.database import get_db
-import numpy as np
+from app.utils.forecasting import build_demand_matrix, forecast_confidence, forecast_window, history_start
+from app.utils.helpers import utc_today
+from app.utils.forecast_engine import forecast_series
+from app.utils.calendrier import CalendrierImpact, deseasonalize, apply_impact
+from app.services.calendar_service import CalendarService
+from app.services.reorder_service import ReorderService
+from app.utils.forecast_metrics import compute_metrics, metrics_as_dicts
+from app.utils.timing import PhaseTimer
+from prisma import Json
 import logging
 
 logger = logging.getLogger(__name__)
 
+HISTORIQUE_JOURS = 56      # 8 semaines d'historique, jusqu'à hier inclus
+ELIGIBILITE_JOURS = 28     # fenêtre du critère d'éligibilité
+ELIGIBILITE_TICKETS = 4    # ventes minimum sur cette fenêtre
+
+# Historique journalier lu dans l'agrégat ventes_journalieres: une requête par magasin.
+# Le jour en cours, partiel, est exclu: il pèserait le plus dans la WMA avec des ventes sous-estimées.
+# $2 = jour courant UTC (utc_today), convention de ventes_journalieres.jour
+VENTES_JOURNALIERES_SQL = f"""
+    SELECT vj.article_id, vj.jour, vj.quantite, vj.nb_tickets AS tickets
+    FROM ventes_journalieres vj
+    JOIN articles a ON a.id = vj.article_id
+    WHERE vj.magasin_id = $1
+      AND a.is_active = true
+      AND vj.jour >= $2::date - {HISTORIQUE_JOURS}
+      AND vj.jour < $2::date
+      {{filtre_article}}
+"""
+
 
 class AIForecastService:
     """Service de prévision IA basé sur l'historique des ventes"""
     
-    def __init__(self):
-        self.version_modele = "1.0"
-        self.algorithme = "moving_average"
+    def __init__(self, algorithme: Optional[str] = None):
+        # None = modèle choisi par article par forecast_engine.select_models
+        self.algorithme = algorithme
     
     async def generate_forecast(
         self,
@@ -37,65 +63,37 @@ class AIForecastService:
         """
         db = await get_db()
         
-        # Récupérer l'historique des ventes (4 dernières semaines minimum)
-        date_debut = datetime.now() - timedelta(weeks=8)
-        
-        ventes = await db.vente.find_many(
-            where={
-                "article_id": article_id,
-                "magasin_id": magasin_id,
-                "date_vente": {"gte": date_debut}
-            },
-            order={"date_vente": "asc"}
+        aujourd_hui = utc_today()
+        rows = await db.query_raw(
+            VENTES_JOURNALIERES_SQL.format(filtre_article="AND vj.article_id = $3"),
+            magasin_id, aujourd_hui.isoformat(), article_id
         )
+        calendrier = await self._get_calendrier(magasin_id)
+        previsions = self._build_previsions(magasin_id, rows, horizon_jours, calendrier, aujourd_hui)
         
-        if len(ventes) < 4:
-            logger.warning(f"Insufficient data for article {article_id}: {len(ventes)} sales")
+        if not previsions:
+            logger.warning(f"Insufficient data for article {article_id}: {sum(r['tickets'] for r in rows)} sales")
             return None
         
-        # Calculer la prévision avec moyenne mobile pondérée
-        quantites = [v.quantite for v in ventes]
-        
-        # Pondération: plus récent = plus important
-        weights = np.linspace(0.5, 1.0, len(quantites))
-        quantite_prevue = np.average(quantites, weights=weights)
-        
-        # Calculer le niveau de confiance basé sur la variance
-        variance = np.var(quantites)
-        confiance = max(0.3, min(0.95, 1.0 - (variance / 100)))
-        
-        # Calculer les métriques
-        metriques = self._calculate_metrics(quantites, quantite_prevue)
-        
-        # Période de prévision
-        date_periode = datetime.now() + timedelta(days=1)
-        date_fin_periode = date_periode + timedelta(days=horizon_jours)
+        data = previsions[0]
         
         # Sauvegarder la prévision
-        prevision = await db.prevision.upsert(
+        await db.prevision.upsert(
             where={
                 "article_id_magasin_id_date_periode": {
                     "article_id": article_id,
                     "magasin_id": magasin_id,
-                    "date_periode": date_periode
+                    "date_periode": data["date_periode"]
                 }
             },
             data={
-                "create": {
-                    "article_id": article_id,
-                    "magasin_id": magasin_id,
-                    "date_periode": date_periode,
-                    "date_fin_periode": date_fin_periode,
-                    "quantite_prevue": round(quantite_prevue, 2),
-                    "confiance": round(confiance, 2),
-                    "algorithme": self.algorithme,
-                    "version_modele": self.version_modele,
-                    "metriques": metriques
-                },
+                "create": data,
                 "update": {
-                    "quantite_prevue": round(quantite_prevue, 2),
-                    "confiance": round(confiance, 2),
-                    "metriques": metriques,
+                    "quantite_prevue": data["quantite_prevue"],
+                    "confiance": data["confiance"],
+                    "metriques": data["metriques"],
+                    "algorithme": data["algorithme"],
+                    "version_modele": data["version_modele"],
                     "date_calcul": datetime.now()
                 }
             }
@@ -103,81 +101,134 @@ class AIForecastService:
         
         return {
             "article_id": article_id,
-            "quantite_prevue": round(quantite_prevue, 2),
-            "confiance": round(confiance, 2),
+            "quantite_prevue": data["quantite_prevue"],
+            "confiance": data["confiance"],
             "periode": f"{horizon_jours} jours",
-            "metriques": metriques
+            "algorithme": data["algorithme"],
+            "metriques": data["metriques"].data
         }
     
-    def _calculate_metrics(self, historique: List[float], prevision: float) -> Dict:
-        """Calculer les métriques de performance"""
-        if not historique:
-            return {}
+    async def _get_calendrier(self, magasin_id: str, entreprise_id: Optional[str] = None) -> CalendrierImpact:
+        """Index calendaire de l'entreprise du magasin (vide si magasin introuvable)"""
+        if entreprise_id is None:
+            db = await get_db()
+            magasin = await db.magasin.find_unique(where={"id": magasin_id})
+            if not magasin:
+                return CalendrierImpact()
+            entreprise_id = magasin.entreprise_id
+        return await CalendarService.get_calendrier(entreprise_id)
+    
+    def _build_previsions(
+        self,
+        magasin_id: str,
+        rows: List[Dict],
+        horizon_jours: int,
+        calendrier: Optional[CalendrierImpact] = None,
+        aujourd_hui: Optional[date] = None
+    ) -> List[Dict]:
+        """
+        Calculer les prévisions des articles éligibles à partir des agrégats journaliers
+
+        L'historique est ramené à des jours normaux (divisé par l'impact calendaire
+        de chaque jour), prévu, puis l'impact des jours de l'horizon est réappliqué.
+        """
+        calendrier = calendrier or CalendrierImpact()
+        date_debut = history_start(HISTORIQUE_JOURS, aujourd_hui)
+        article_ids, quantites, tickets = build_demand_matrix(rows, date_debut, HISTORIQUE_JOURS)
         
-        # MAPE (Mean Absolute Percentage Error)
-        mape = np.mean([abs((h - prevision) / h) for h in historique if h > 0]) * 100
+        eligibles = tickets[:, -ELIGIBILITE_JOURS:].sum(axis=1) >= ELIGIBILITE_TICKETS
+        article_ids = [a for a, ok in zip(article_ids, eligibles) if ok]
+        quantites = deseasonalize(quantites[eligibles], calendrier.facteurs(date_debut, HISTORIQUE_JOURS))
         
-        # WMAPE (Weighted MAPE)
-        total_actual = sum(historique)
-        total_error = sum([abs(h - prevision) for h in historique])
-        wmape = (total_error / total_actual * 100) if total_actual > 0 else 0
+        date_periode, date_fin_periode = forecast_window(horizon_jours)
+        facteurs_horizon = calendrier.facteurs(date_periode, horizon_jours)
         
-        # Coverage (pourcentage de données utilisées)
-        coverage = (len(historique) / 28) * 100  # 28 jours = 4 semaines
+        resultat = forecast_series(quantites, horizon_jours, algorithme=self.algorithme)
+        totaux = apply_impact(resultat["previsions"], facteurs_horizon).sum(axis=1)
+        confiances = forecast_confidence(quantites)
+        metriques = metrics_as_dicts(compute_metrics(quantites, resultat["previsions"].mean(axis=1)))
+        impact_horizon = round(float(facteurs_horizon.mean()), 3) if horizon_jours else 1.0
         
+        return [
+            {
+                "article_id": article_id,
+                "magasin_id": magasin_id,
+                "date_periode": date_periode,
+                "date_fin_periode": date_fin_periode,
+                "quantite_prevue": round(float(totaux[i]), 2),
+                "confiance": round(float(confiances[i]), 2),
+                "algorithme": resultat["algorithmes"][i],
+                "version_modele": resultat["versions"][i],
+                "metriques": Json({**metriques[i], "impact_calendrier": impact_horizon})
+            }
+            for i, article_id in enumerate(article_ids)
+        ]
+    
+    async def generate_forecasts_batch(
+        self,
+        magasin_id: str,
+        horizon_jours: int = 7,
+        entreprise_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Générer les prévisions de tous les articles éligibles d'un magasin
+
+        Une requête sur l'agrégat journalier (articles × jours), calculs NumPy
+        vectorisés, puis remplacement des prévisions de la période en bulk.
+
+        Returns:
+            Dict avec le nombre de prévisions écrites et le débit (SKU/s)
+        """
+        db = await get_db()
+        timer = PhaseTimer()
+
+        with timer.phase("lecture"):
+            aujourd_hui = utc_today()
+            rows = await db.query_raw(VENTES_JOURNALIERES_SQL.format(filtre_article=""), magasin_id, aujourd_hui.isoformat())
+            calendrier = await self._get_calendrier(magasin_id, entreprise_id)
+
+        with timer.phase("calcul"):
+            previsions = self._build_previsions(magasin_id, rows, horizon_jours, calendrier, aujourd_hui)
+            article_ids = [p["article_id"] for p in previsions]
+
+        with timer.phase("ecriture"):
+            if previsions:
+                async with db.tx() as tx:
+                    await tx.prevision.delete_many(
+                        where={
+                            "magasin_id": magasin_id,
+                            "date_periode": previsions[0]["date_periode"],
+                            "article_id": {"in": article_ids}
+                        }
+                    )
+                    await tx.prevision.create_many(data=previsions)
+
+        duree = timer.total
+        skus_par_seconde = round(len(previsions) / duree, 1) if duree > 0 else 0.0
+        logger.info(
+            f"Batch forecast magasin {magasin_id}: {len(previsions)} SKUs in {duree:.2f}s "
+            f"({skus_par_seconde} SKU/s), phases {timer.as_dict()}"
+        )
+
         return {
-            "mape": round(mape, 2),
-            "wmape": round(wmape, 2),
-            "coverage": round(min(coverage, 100), 2),
-            "nb_points": len(historique)
+            "magasin_id": magasin_id,
+            "forecasts": len(previsions),
+            "skus_par_seconde": skus_par_seconde,
+            "durees_ms": timer.as_dict()
         }
     
     async def get_purchase_suggestions(self, magasin_id: str) -> List[Dict]:
         """
         Générer des suggestions de commande basées sur les prévisions
         
+        Délègue au moteur de réapprovisionnement (point de commande, délai
+        fournisseur, EOQ), restreint au magasin.
+        
         Returns:
             Liste d'articles à commander avec quantités suggérées
         """
         db = await get_db()
-        
-        # Récupérer les articles avec prévisions récentes
-        date_limite = datetime.now() - timedelta(days=1)
-        
-        previsions = await db.prevision.find_many(
-            where={
-                "magasin_id": magasin_id,
-                "date_calcul": {"gte": date_limite}
-            },
-            include={"article": True}
-        )
-        
-        suggestions = []
-        
-        for prev in previsions:
-            article = prev.article
-            
-            # Calculer la quantité à commander
-            stock_actuel = article.stock_actuel
-            demande_prevue = prev.quantite_prevue
-            stock_securite = article.stock_securite
-            
-            # Quantité nécessaire = demande prévue + stock sécurité - stock actuel
-            quantite_necessaire = demande_prevue + stock_securite - stock_actuel
-            
-            if quantite_necessaire > 0:
-                suggestions.append({
-                    "article_id": article.id,
-                    "code": article.code,
-                    "designation": article.designation,
-                    "stock_actuel": stock_actuel,
-                    "demande_prevue": round(demande_prevue, 0),
-                    "quantite_a_commander": round(quantite_necessaire, 0),
-                    "confiance": prev.confiance,
-                    "priorite": "HAUTE" if stock_actuel <= article.stock_min else "NORMALE"
-                })
-        
-        # Trier par priorité et stock actuel
-        suggestions.sort(key=lambda x: (x["priorite"] == "HAUTE", -x["stock_actuel"]), reverse=True)
-        
-        return suggestions
+        magasin = await db.magasin.find_unique(where={"id": magasin_id})
+        if not magasin:
+            return []
+        return await ReorderService.get_suggestions(magasin.entreprise_id, magasin_id)
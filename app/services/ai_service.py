@@ -1,19 +1,22 @@
 from typing import List
-from datetime import datetime, timedelta
 import numpy as np
+from app.utils.forecasting import forecast_confidence
+from app.utils.forecast_engine import forecast_series
+from app.utils.forecast_metrics import compute_metrics, metrics_as_dicts
 
 class AIService:
     """
     Service IA pour la prévision de la demande
-    Phase 1 (MVP): Moyenne mobile simple
-    Phase 2: Facebook Prophet + modèles avancés
+    Les calculs sont faits par le moteur de prévision (app.utils.forecast_engine)
     """
     
     @staticmethod
     async def calculate_prevision_simple(article_id: str, historique_ventes: List[dict]) -> dict:
         """
-        Algorithme MVP: Moyenne mobile pondérée
-        Phase 2: Remplacer par Prophet ou LightGBM
+        Prévision de la période suivante à partir d'un historique agrégé par période
+
+        Délègue au moteur de prévision (app.utils.forecast_engine). Les périodes
+        n'étant pas forcément journalières, la saisonnalité hebdomadaire est exclue.
         """
         if len(historique_ventes) < 4:
             return {
@@ -22,25 +25,17 @@ class AIService:
                 "message": "Données insuffisantes"
             }
         
-        # Extraire les quantités des 4 dernières semaines
-        quantites = [v["quantite"] for v in historique_ventes[-4:]]
-        
-        # Moyenne mobile pondérée (plus de poids sur les semaines récentes)
-        poids = [0.1, 0.2, 0.3, 0.4]
-        prevision = sum(q * p for q, p in zip(quantites, poids))
-        
-        # Calcul de la confiance basé sur la variance
-        variance = np.var(quantites)
-        confiance = max(0.3, 1.0 - (variance / 100))
+        quantites = np.array([[v["quantite"] for v in historique_ventes]], dtype=np.float64)
+        resultat = forecast_series(quantites, 1, candidats=("weighted_moving_average", "croston"))
+        prevision = resultat["previsions"][0]
+        metriques = metrics_as_dicts(compute_metrics(quantites, prevision))[0]
         
         return {
-            "quantite_prevue": round(prevision, 2),
-            "confiance": min(0.95, confiance),
-            "metriques": {
-                "mape": None,  # Phase 2
-                "wmape": None,  # Phase 2
-                "variance": variance
-            }
+            "quantite_prevue": round(float(prevision[0]), 2),
+            "confiance": round(float(forecast_confidence(quantites)[0]), 2),
+            "algorithme": resultat["algorithmes"][0],
+            "version_modele": resultat["versions"][0],
+            "metriques": metriques
         }
     
     @staticmethod
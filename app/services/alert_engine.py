@@ -0,0 +1,240 @@
+"""
+Moteur d'alertes ensembliste
+
+Une exécution = une projection de colonnes des articles candidats, une
+classification en mémoire, puis un diff avec l'état des alertes ouvertes
+(clé article/type au sein du magasin): seules les transitions sont écrites.
+
+Les mouvements de stock publient STOCK_CHANGED: seul l'article touché est
+réévalué (évaluation incrémentale). Le scan complet du cron ne sert plus que
+de passe de réconciliation.
+
+L'état des alertes ouvertes est lu dans la table alertes, dans la transaction
+qui écrit le diff, sous un verrou consultatif (pg_advisory_xact_lock) par
+magasin: workers de l'API et cron s'excluent quel que soit le processus.
+L'index unique partiel des alertes ouvertes (prisma/sql/alertes_index.sql)
+garantit en plus une seule alerte ouverte par article et type.
+"""
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.events import subscribe, STOCK_CHANGED
+from app.utils.alert_rules import (
+    classify_articles, diff_alert_states, alert_key,
+    JOURS_ALERTE_PEREMPTION, TYPES_SUIVIS
+)
+from app.utils.timing import PhaseTimer
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Seuls les articles susceptibles de lever une alerte sont remontés
+CANDIDATS_SQL = f"""
+    SELECT id, designation, stock_actuel, stock_min,
+           (date_peremption::date - CURRENT_DATE) AS jours_peremption
+    FROM articles
+    WHERE magasin_id = $1
+      AND is_active = true
+      AND (
+        stock_actuel <= stock_min
+        OR stock_actuel <= 0
+        OR (date_peremption > NOW() AND date_peremption <= NOW() + INTERVAL '{JOURS_ALERTE_PEREMPTION} days')
+      )
+"""
+
+# Réévaluation ciblée: les articles sont remontés même sans alerte pour pouvoir résoudre
+ARTICLES_SQL = """
+    SELECT id, designation, stock_actuel, stock_min, is_active,
+           (date_peremption::date - CURRENT_DATE) AS jours_peremption
+    FROM articles
+    WHERE magasin_id = $1 AND id IN ({placeholders})
+"""
+
+
+# Verrou de transaction par magasin (clé texte hachée), libéré au commit
+LOCK_MAGASIN_SQL = "SELECT pg_advisory_xact_lock(hashtext($1))"
+
+
+def _compteur_key(mode: str) -> str:
+    return f"alertes:evalues:{mode}"
+
+
+class AlertEngine:
+    """Générer les alertes d'un magasin en une passe"""
+
+    # Modes des compteurs d'articles évalués (cache partagé entre workers et cron)
+    MODES = ("incremental", "full_scan")
+
+    async def run(self, magasin_id: str) -> Dict:
+        """
+        Classer les articles du magasin et appliquer les transitions d'alertes
+
+        Returns:
+            Dict avec compteurs par type et statistiques d'exécution
+        """
+        db = await get_db()
+        timer = PhaseTimer()
+
+        with timer.phase("comptage"):
+            total_articles = await db.article.count(
+                where={"magasin_id": magasin_id, "is_active": True}
+            )
+
+        with timer.phase("projection"):
+            candidats = await db.query_raw(CANDIDATS_SQL, magasin_id)
+
+        with timer.phase("classification"):
+            resultat = classify_articles(candidats, magasin_id)
+
+        with timer.phase("ecriture"):
+            diff = await self._apply(magasin_id, resultat["alertes"])
+
+        await get_cache().incr(_compteur_key("full_scan"), total_articles)
+
+        stats = {
+            "lignes_scannees": len(candidats),
+            "alertes_ecrites": len(diff["a_creer"]),
+            "alertes_escaladees": len(diff["a_escalader"]),
+            "alertes_resolues": len(diff["a_resoudre"]),
+            "durees_ms": timer.as_dict()
+        }
+        logger.info(
+            f"Alert engine magasin {magasin_id}: {len(candidats)}/{total_articles} candidates, "
+            f"+{stats['alertes_ecrites']} ^{stats['alertes_escaladees']} -{stats['alertes_resolues']} "
+            f"in {stats['durees_ms']['total']}ms"
+        )
+
+        compteurs = resultat["compteurs"]
+        return {
+            "magasin_id": magasin_id,
+            "date_verification": datetime.now(),
+            "total_articles": total_articles,
+            "ruptures": compteurs["RUPTURE"],
+            "stock_faible": compteurs["SEUIL_BAS"],
+            "peremption_proche": compteurs["PEREMPTION"],
+            "alertes_generees": stats["alertes_ecrites"],
+            "stats": stats
+        }
+
+    async def evaluate_articles(self, magasin_id: str, article_ids: List[str]) -> Dict:
+        """
+        Réévaluer uniquement les articles touchés par un mouvement
+
+        Returns:
+            Dict avec le nombre d'alertes créées, escaladées et résolues
+        """
+        db = await get_db()
+        article_ids = list(dict.fromkeys(article_ids))
+        if not article_ids:
+            return {"alertes_ecrites": 0, "alertes_escaladees": 0, "alertes_resolues": 0}
+
+        placeholders = ", ".join(f"${i + 2}" for i in range(len(article_ids)))
+        articles = await db.query_raw(
+            ARTICLES_SQL.format(placeholders=placeholders), magasin_id, *article_ids
+        )
+        actifs = [a for a in articles if a["is_active"]]
+        resultat = classify_articles(actifs, magasin_id)
+
+        diff = await self._apply(magasin_id, resultat["alertes"], article_ids)
+
+        await get_cache().incr(_compteur_key("incremental"), len(article_ids))
+
+        return {
+            "alertes_ecrites": len(diff["a_creer"]),
+            "alertes_escaladees": len(diff["a_escalader"]),
+            "alertes_resolues": len(diff["a_resoudre"])
+        }
+
+    async def compteurs(self) -> Dict[str, int]:
+        """Articles évalués par mode, tous processus confondus (Redis) ou pour ce processus (mémoire)"""
+        cache = get_cache()
+        return {mode: int(await cache.get(_compteur_key(mode)) or 0) for mode in self.MODES}
+
+    async def _apply(self, magasin_id: str, alertes: List[Dict], article_ids: Optional[List[str]] = None) -> Dict:
+        """
+        Comparer la classification à l'état en base et écrire les transitions, en une transaction
+
+        Args:
+            article_ids: périmètre de l'évaluation incrémentale (None = magasin entier)
+
+        Returns:
+            Le diff appliqué (a_creer, a_escalader, a_resoudre, etat)
+        """
+        db = await get_db()
+        async with db.tx(
+            max_wait=timedelta(seconds=settings.TX_MAX_WAIT_SECONDS),
+            timeout=timedelta(seconds=settings.ALERT_TX_TIMEOUT_SECONDS)
+        ) as tx:
+            # Un diff à la fois par magasin, tous processus confondus
+            await tx.execute_raw(LOCK_MAGASIN_SQL, f"alertes:{magasin_id}")
+            etat = await self._load_state(tx, magasin_id, article_ids)
+            perimetre = set(article_ids) if article_ids is not None else None
+            diff = diff_alert_states(etat, alertes, perimetre=perimetre)
+            await self._apply_diff(tx, diff)
+        return diff
+
+    async def _load_state(self, client, magasin_id: str, article_ids: Optional[List[str]] = None) -> Dict[str, List]:
+        """
+        Charger l'état des alertes ouvertes depuis la table alertes
+
+        Les doublons ouverts hérités (même article/type) sont résolus pour
+        repartir d'une seule alerte par clé.
+        """
+        where = {
+            "magasin_id": magasin_id,
+            "est_resolue": False,
+            "article_id": {"in": article_ids} if article_ids is not None else {"not": None},
+            "type": {"in": TYPES_SUIVIS}
+        }
+        ouvertes = await client.alerte.find_many(where=where, order={"date_alerte": "desc"})
+
+        etat = {}
+        doublons = []
+        for alerte in ouvertes:
+            cle = alert_key(alerte.article_id, alerte.type)
+            if cle in etat:
+                doublons.append(alerte.id)
+            else:
+                etat[cle] = [alerte.id, alerte.niveau]
+
+        if doublons:
+            await self._resolve(client, doublons)
+            logger.info(f"Resolved {len(doublons)} duplicate open alerts for magasin {magasin_id}")
+
+        return etat
+
+    async def _apply_diff(self, client, diff: Dict):
+        """Écrire créations, escalades et résolutions"""
+        if diff["a_creer"]:
+            # Filet de l'index unique partiel: une alerte déjà ouverte n'est pas recréée
+            await client.alerte.create_many(data=diff["a_creer"], skip_duplicates=True)
+
+        for alerte in diff["a_escalader"]:
+            await client.alerte.update(
+                where={"id": alerte["id"]},
+                data={"niveau": alerte["niveau"], "message": alerte["message"]}
+            )
+
+        if diff["a_resoudre"]:
+            await self._resolve(client, diff["a_resoudre"])
+
+    async def _resolve(self, client, alerte_ids: List[str]):
+        await client.alerte.update_many(
+            where={"id": {"in": alerte_ids}},
+            data={"est_resolue": True, "date_resolution": datetime.now()}
+        )
+
+
+alert_engine = AlertEngine()
+
+
+async def on_stock_changed(payload: Dict):
+    """Handler STOCK_CHANGED: réévaluer les articles touchés (dans le worker qui a traité le mouvement)"""
+    await alert_engine.evaluate_articles(payload["magasin_id"], payload["article_ids"])
+
+
+def register_alert_handlers():
+    subscribe(STOCK_CHANGED, on_stock_changed)
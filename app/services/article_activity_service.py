@@ -0,0 +1,105 @@
+"""
+Maintien des colonnes d'activité des articles (app.utils.article_activity)
+
+`record` est appelé dans la transaction du mouvement, après la mise à jour du
+stock: la ligne de l'article est déjà verrouillée, la mise à jour ne pose
+aucun verrou supplémentaire. `reconcile` recalcule les colonnes d'un magasin
+depuis mouvements_stock (tâche planifiée `activite-articles`); une sortie
+validée pendant la réconciliation peut n'y être comptée qu'au passage suivant.
+"""
+from typing import Dict, Iterable
+from datetime import datetime, timedelta, timezone
+from app.core.database import prisma
+from app.utils.article_activity import FENETRES_VENTES, activity_deltas
+from app.utils.helpers import as_utc
+import logging
+
+logger = logging.getLogger(__name__)
+
+# GREATEST ignore les NULL: un lot sans entrée ne touche pas last_entree_at
+RECORD_SQL = """
+    UPDATE articles a
+    SET last_entree_at = GREATEST(a.last_entree_at, d.last_entree_at),
+        last_sortie_at = GREATEST(a.last_sortie_at, d.last_sortie_at),
+        sold_7d = a.sold_7d + d.sold_7d,
+        sold_28d = a.sold_28d + d.sold_28d
+    FROM (VALUES {values}) AS d(id, last_entree_at, last_sortie_at, sold_7d, sold_28d)
+    WHERE a.id = d.id
+"""
+
+RECONCILE_SQL = """
+    WITH activite AS (
+        SELECT article_id,
+               MAX(date_mouvement) FILTER (WHERE type = 'ENTREE') AS last_entree_at,
+               MAX(date_mouvement) FILTER (WHERE type = 'SORTIE') AS last_sortie_at,
+               COALESCE(SUM(quantite) FILTER (WHERE type = 'SORTIE' AND date_mouvement >= $2::timestamp), 0)::int AS sold_7d,
+               COALESCE(SUM(quantite) FILTER (WHERE type = 'SORTIE' AND date_mouvement >= $3::timestamp), 0)::int AS sold_28d
+        FROM mouvements_stock
+        WHERE magasin_id = $1 AND type IN ('ENTREE', 'SORTIE')
+        GROUP BY article_id
+    ),
+    cible AS (
+        SELECT a.id, act.last_entree_at, act.last_sortie_at,
+               COALESCE(act.sold_7d, 0) AS sold_7d, COALESCE(act.sold_28d, 0) AS sold_28d
+        FROM articles a
+        LEFT JOIN activite act ON act.article_id = a.id
+        WHERE a.magasin_id = $1
+    )
+    UPDATE articles a
+    SET last_entree_at = c.last_entree_at, last_sortie_at = c.last_sortie_at,
+        sold_7d = c.sold_7d, sold_28d = c.sold_28d
+    FROM cible c
+    WHERE a.id = c.id
+      AND (a.last_entree_at, a.last_sortie_at, a.sold_7d, a.sold_28d)
+          IS DISTINCT FROM (c.last_entree_at, c.last_sortie_at, c.sold_7d, c.sold_28d)
+"""
+
+
+def _timestamp(valeur):
+    """Paramètre ::timestamp: UTC naïf, comme les colonnes DateTime de Prisma"""
+    return as_utc(valeur).replace(tzinfo=None).isoformat() if valeur else None
+
+
+class ArticleActivityService:
+
+    @staticmethod
+    async def record(mouvements: Iterable[Dict], client=None) -> int:
+        """
+        Répercuter des mouvements sur l'activité de leurs articles (une requête)
+
+        Args:
+            mouvements: dicts {article_id, type, quantite, date_mouvement}
+            client: transaction du mouvement, sinon le client global
+
+        Returns:
+            Nombre d'articles mis à jour
+        """
+        client = client or prisma
+        activite = activity_deltas(mouvements, datetime.now(timezone.utc))
+        if not activite:
+            return 0
+
+        values = []
+        params = []
+        for article_id, a in activite.items():
+            n = len(params)
+            values.append(f"(${n + 1}::text, ${n + 2}::timestamp, ${n + 3}::timestamp, ${n + 4}::int, ${n + 5}::int)")
+            params.extend([
+                article_id, _timestamp(a["last_entree_at"]), _timestamp(a["last_sortie_at"]),
+                a["sold_7d"], a["sold_28d"]
+            ])
+        return await client.execute_raw(RECORD_SQL.format(values=", ".join(values)), *params)
+
+    @staticmethod
+    async def reconcile(magasin_id: str) -> int:
+        """
+        Recalculer l'activité des articles d'un magasin depuis les mouvements
+
+        Returns:
+            Nombre d'articles corrigés (fenêtres glissantes comprises)
+        """
+        maintenant = datetime.now(timezone.utc)
+        limites = [_timestamp(maintenant - timedelta(days=FENETRES_VENTES[cle])) for cle in ("sold_7d", "sold_28d")]
+        corriges = await prisma.execute_raw(RECONCILE_SQL, magasin_id, *limites)
+        logger.info(f"Article activity reconciled for magasin {magasin_id}: {corriges} articles updated")
+        return corriges
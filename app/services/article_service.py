@@ -1,13 +1,16 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from prisma.models import Article
 from app.core.database import prisma
+from app.core.events import publish, CATALOGUE_CHANGED
+from app.services.stock_query_service import StockQueryService
+from app.utils.pagination import keyset_page
 from app.schemas.article import ArticleCreate, ArticleUpdate
 
 class ArticleService:
     
     @staticmethod
     async def create_article(data: ArticleCreate) -> Article:
-        return await prisma.article.create(
+        article = await prisma.article.create(
             data={
                 "code": data.code,
                 "designation": data.designation,
@@ -22,18 +25,23 @@ class ArticleService:
                 "magasin_id": data.magasin_id
             }
         )
+        publish(CATALOGUE_CHANGED, {"magasin_id": article.magasin_id, "source": "article"})
+        return article
     
     @staticmethod
     async def get_article(article_id: str) -> Optional[Article]:
         return await prisma.article.find_unique(where={"id": article_id})
     
     @staticmethod
-    async def get_articles_by_magasin(magasin_id: str, skip: int = 0, limit: int = 100) -> List[Article]:
-        return await prisma.article.find_many(
-            where={"magasin_id": magasin_id, "is_active": True},
-            skip=skip,
-            take=limit,
-            order={"designation": "asc"}
+    async def get_articles_by_magasin(
+        magasin_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[Article], Optional[str]]:
+        """Page d'articles par désignation: (articles, curseur suivant)"""
+        return await keyset_page(
+            prisma.article,
+            {"magasin_id": magasin_id, "is_active": True},
+            "designation", "asc", limit, cursor,
+            **({"skip": skip} if skip and not cursor else {})
         )
     
     @staticmethod
@@ -42,29 +50,28 @@ class ArticleService:
         if not update_data:
             return await ArticleService.get_article(article_id)
         
-        return await prisma.article.update(
+        article = await prisma.article.update(
             where={"id": article_id},
             data=update_data
         )
+        if article:
+            publish(CATALOGUE_CHANGED, {"magasin_id": article.magasin_id, "source": "article"})
+        return article
     
     @staticmethod
     async def delete_article(article_id: str) -> bool:
-        await prisma.article.update(
+        article = await prisma.article.update(
             where={"id": article_id},
             data={"is_active": False}
         )
+        if article:
+            publish(CATALOGUE_CHANGED, {"magasin_id": article.magasin_id, "source": "article"})
         return True
     
     @staticmethod
     async def get_articles_faibles(magasin_id: str) -> List[Article]:
-        """Articles avec stock actuel <= stock_min"""
-        articles = await prisma.article.find_many(
-            where={
-                "magasin_id": magasin_id,
-                "is_active": True
-            }
-        )
-        return [a for a in articles if a.stock_actuel <= a.stock_min]
+        """Articles avec stock actuel <= stock_min (filtré par la base)"""
+        return await StockQueryService.articles_faibles(magasin_id)
     
     @staticmethod
     async def search_articles(magasin_id: str, query: str) -> List[Article]:
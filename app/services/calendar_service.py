@@ -0,0 +1,46 @@
+"""
+Chargement et cache de l'index calendaire (jours fériés nationaux + entreprise)
+"""
+from app.core.cache import get_json, set_json, get_cache
+from app.core.config import settings
+from app.core.database import get_db
+from app.utils.calendrier import CalendrierImpact
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_key(entreprise_id: str) -> str:
+    return f"calendrier:{entreprise_id}"
+
+
+class CalendarService:
+
+    @staticmethod
+    async def get_calendrier(entreprise_id: str) -> CalendrierImpact:
+        """
+        Index calendaire d'une entreprise (jours nationaux × jours propres à l'entreprise)
+
+        Construit une fois puis servi depuis le cache jusqu'à expiration ou invalidation.
+        """
+        cached = await get_json(_cache_key(entreprise_id))
+        if cached is not None:
+            return CalendrierImpact.from_dict(cached)
+
+        db = await get_db()
+        nationaux = await db.jourferie.find_many()
+        entreprise = await db.jourferieentreprise.find_many(where={"entreprise_id": entreprise_id})
+
+        calendrier = CalendrierImpact.from_entries(
+            {"date": j.date, "date_fin": j.date_fin, "impact_estime": j.impact_estime}
+            for j in [*nationaux, *entreprise]
+        )
+        await set_json(_cache_key(entreprise_id), calendrier.to_dict(), settings.CALENDAR_CACHE_TTL_SECONDS)
+
+        logger.info(f"Calendar index built for entreprise {entreprise_id}: {len(calendrier)} special days")
+        return calendrier
+
+    @staticmethod
+    async def invalidate(entreprise_id: str):
+        """À appeler après modification des jours fériés de l'entreprise"""
+        await get_cache().delete(_cache_key(entreprise_id))
@@ -1,55 +1,129 @@
-from typing import Dict
-from app.core.database import prisma
-from app.utils.helpers import calculate_stock_value
+"""
+Statistiques du tableau de bord servies depuis un snapshot en cache
+
+Le snapshot d'un magasin (app.utils.dashboard_snapshot) est construit par deux
+requêtes de StockQueryService (agrégat + articles faibles les plus critiques), puis maintenu par
+les événements STOCK_CHANGED à partir du stock avant/après de chaque article.
+Il expire après settings.DASHBOARD_SNAPSHOT_TTL_SECONDS (filet de sécurité
+pour les écritures faites hors événements) et est invalidé explicitement
+quand le catalogue change (création, modification, suppression d'article).
+
+Reconstruction, mises à jour et invalidation prennent le même verrou par
+magasin, dans le cache (app.core.cache.lock): avec Redis, les workers qui
+appliquent chacun leurs événements sur le snapshot partagé ne perdent pas
+les deltas des autres. Le cache mémoire, propre au processus, suppose un
+seul worker. Un événement publié avant la reconstruction (payload `publie_le` antérieur au
+`construit_le` du snapshot) est ignoré, ses effets étant déjà lus. Un
+mouvement validé pendant les deux lectures peut encore être compté deux
+fois, jusqu'à l'expiration du snapshot.
+"""
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from app.core.cache import get_json, set_json, get_cache
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.events import subscribe, STOCK_CHANGED, CATALOGUE_CHANGED
+from app.services.stock_query_service import StockQueryService
+from app.utils.dashboard_snapshot import (
+    TAILLE_TAMPON, apply_stock_changes, build_snapshot, deja_compte, top_entry, to_stats
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARTICLES_SQL = """
+    SELECT id, code, designation, stock_min, prix_achat
+    FROM articles
+    WHERE magasin_id = $1 AND is_active = true AND id IN ({placeholders})
+"""
+
+
+def _snapshot_key(magasin_id: str) -> str:
+    return f"dashboard:{magasin_id}"
+
 
 class DashboardService:
-    
+
+    @staticmethod
+    def _lock(magasin_id: str):
+        """Une lecture-modification-écriture du snapshot à la fois par magasin, tous workers confondus"""
+        return get_cache().lock(f"dashboard:verrou:{magasin_id}", settings.DASHBOARD_LOCK_TIMEOUT_SECONDS)
+
     @staticmethod
     async def get_dashboard_stats(magasin_id: str) -> Dict:
-        """Récupérer les statistiques du tableau de bord pour le MVP"""
-        
-        # Récupérer tous les articles du magasin
-        articles = await prisma.article.find_many(
-            where={"magasin_id": magasin_id, "is_active": True}
-        )
-        
-        # Convertir en dict pour calculate_stock_value
-        articles_dict = [
-            {
-                "stock_actuel": a.stock_actuel,
-                "prix_achat": a.prix_achat
-            }
-            for a in articles
-        ]
-        
-        # Calculer la valeur totale du stock
-        valeur_stock_total = calculate_stock_value(articles_dict)
-        
-        # Articles avec stock faible
-        articles_faibles = [
-            a for a in articles 
-            if a.stock_actuel <= a.stock_min
-        ]
-        
-        # Articles en rupture
-        articles_rupture = [
-            a for a in articles 
-            if a.stock_actuel == 0
-        ]
-        
-        return {
-            "valeur_stock_total_dt": round(valeur_stock_total, 2),
-            "total_articles": len(articles),
-            "articles_faibles_count": len(articles_faibles),
-            "articles_rupture_count": len(articles_rupture),
-            "articles_faibles": [
-                {
-                    "id": a.id,
-                    "code": a.code,
-                    "designation": a.designation,
-                    "stock_actuel": a.stock_actuel,
-                    "stock_min": a.stock_min
-                }
-                for a in articles_faibles[:10]  # Top 10
+        """Récupérer les statistiques du tableau de bord (snapshot, reconstruit s'il manque)"""
+        snapshot = await get_json(_snapshot_key(magasin_id))
+        if snapshot is None:
+            snapshot = await DashboardService.rebuild(magasin_id)
+        return to_stats(snapshot)
+
+    @staticmethod
+    async def rebuild(magasin_id: str) -> Dict:
+        """Reconstruire le snapshot depuis la base"""
+        async with DashboardService._lock(magasin_id):
+            db = await get_db()
+            construit_le = datetime.now(timezone.utc)
+            resume = await StockQueryService.resume(magasin_id, client=db)
+            faibles = await StockQueryService.faibles_resume(magasin_id, TAILLE_TAMPON, client=db)
+            snapshot = build_snapshot(resume, faibles, construit_le)
+            await set_json(_snapshot_key(magasin_id), snapshot, settings.DASHBOARD_SNAPSHOT_TTL_SECONDS)
+            return snapshot
+
+    @staticmethod
+    async def apply_stock_changes(magasin_id: str, stocks: Dict[str, List[int]], publie_le: Optional[str] = None):
+        """
+        Répercuter des changements de stock sur le snapshot
+
+        Args:
+            stocks: {article_id: [stock_avant, stock_apres]}
+            publie_le: date de publication de l'événement (ISO, UTC)
+        """
+        async with DashboardService._lock(magasin_id):
+            snapshot = await get_json(_snapshot_key(magasin_id))
+            if snapshot is None:
+                # Rien en cache: le prochain affichage reconstruira
+                return
+            if publie_le and deja_compte(snapshot, publie_le):
+                return
+
+            db = await get_db()
+            ids = list(stocks)
+            placeholders = ", ".join(f"${i + 2}" for i in range(len(ids)))
+            articles = await db.query_raw(ARTICLES_SQL.format(placeholders=placeholders), magasin_id, *ids)
+            changements = [
+                {**a, "stock_avant": stocks[a["id"]][0], "stock_apres": stocks[a["id"]][1]}
+                for a in articles
             ]
-        }
+
+            if apply_stock_changes(snapshot, changements):
+                faibles = await StockQueryService.faibles_resume(magasin_id, TAILLE_TAMPON, client=db)
+                snapshot["top"] = [top_entry(a) for a in faibles]
+            await set_json(_snapshot_key(magasin_id), snapshot, settings.DASHBOARD_SNAPSHOT_TTL_SECONDS)
+
+    @staticmethod
+    async def invalidate(magasin_id: str):
+        """Oublier le snapshot d'un magasin (catalogue modifié)"""
+        async with DashboardService._lock(magasin_id):
+            await get_cache().delete(_snapshot_key(magasin_id))
+
+
+async def on_stock_changed(payload: Dict):
+    """Handler STOCK_CHANGED: ajuster le snapshot, ou l'invalider sans stock avant/après"""
+    if payload.get("stocks"):
+        try:
+            await DashboardService.apply_stock_changes(payload["magasin_id"], payload["stocks"], payload.get("publie_le"))
+        except Exception:
+            # Delta non appliqué (verrou non obtenu, base indisponible): reconstruire au prochain affichage
+            await get_cache().delete(_snapshot_key(payload["magasin_id"]))
+            raise
+    else:
+        await DashboardService.invalidate(payload["magasin_id"])
+
+
+async def on_catalogue_changed(payload: Dict):
+    await DashboardService.invalidate(payload["magasin_id"])
+
+
+def register_dashboard_handlers():
+    subscribe(STOCK_CHANGED, on_stock_changed)
+    subscribe(CATALOGUE_CHANGED, on_catalogue_changed)
@@ -1,31 +1,138 @@
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
 import pandas as pd
 from io import BytesIO
 from datetime import datetime
+from openpyxl.utils import get_column_letter
+from app.utils.valorisation import MONTANTS, build_valorisation, column_widths, valorisation_frame
+from app.utils.export_writers import (
+    COLONNES_MOUVEMENTS, Colonnes, XlsxStreamWriter, export_pages, mouvement_values, single_page
+)
+
+TAILLE_PAGE_EXPORT = 5000
+
+# Pagination keyset sur (date_mouvement, id): chaque page est une recherche
+# d'index (magasin_id, date_mouvement, id), sans OFFSET ni curseur serveur
+MOUVEMENTS_PAGE_SQL = """
+    SELECT m.id, m.date_mouvement, m.type::text AS type, a.designation, a.code,
+           m.quantite, m.prix_unitaire, m.valeur_totale, m.motif
+    FROM mouvements_stock m
+    JOIN articles a ON a.id = m.article_id
+    WHERE m.magasin_id = $1 {filtres}
+    ORDER BY m.date_mouvement, m.id
+    LIMIT {limite}
+"""
+
+
+async def iter_mouvements(
+    db,
+    magasin_id: str,
+    date_debut: Optional[datetime] = None,
+    date_fin: Optional[datetime] = None,
+    taille_page: int = TAILLE_PAGE_EXPORT
+) -> AsyncIterator[List[Dict]]:
+    """Parcourir les mouvements d'un magasin page par page (au plus `taille_page` lignes en mémoire)"""
+    filtres = []
+    params: list = [magasin_id]
+    if date_debut:
+        params.append(date_debut)
+        filtres.append(f"AND m.date_mouvement >= ${len(params)}::timestamp")
+    if date_fin:
+        params.append(date_fin)
+        filtres.append(f"AND m.date_mouvement <= ${len(params)}::timestamp")
+
+    curseur = None
+    while True:
+        conditions = list(filtres)
+        page_params = list(params)
+        if curseur:
+            page_params.extend(curseur)
+            conditions.append(
+                f"AND (m.date_mouvement, m.id) > (${len(page_params) - 1}::timestamp, ${len(page_params)})"
+            )
+        sql = MOUVEMENTS_PAGE_SQL.format(filtres=" ".join(conditions), limite=int(taille_page))
+        rows = await db.query_raw(sql, *page_params)
+        if not rows:
+            return
+        yield rows
+        if len(rows) < taille_page:
+            return
+        curseur = (rows[-1]["date_mouvement"], rows[-1]["id"])
+
+
+async def mouvement_pages(
+    db,
+    magasin_id: str,
+    date_debut: Optional[datetime] = None,
+    date_fin: Optional[datetime] = None,
+    brut: bool = False
+) -> AsyncIterator[List[list]]:
+    """Pages de mouvements converties en lignes d'export (ordre de COLONNES_MOUVEMENTS)"""
+    async for page in iter_mouvements(db, magasin_id, date_debut, date_fin):
+        yield [mouvement_values(row, brut) for row in page]
 
 
 class ExportService:
     """Service pour générer des exports PDF et Excel"""
     
-    def export_mouvements_excel(self, mouvements: List) -> bytes:
-        """Exporter les mouvements en Excel"""
-        data = []
-        for m in mouvements:
-            data.append({
-                "Date": m.date_mouvement.strftime("%d/%m/%Y %H:%M"),
-                "Type": m.type,
-                "Article": m.article.designation if hasattr(m, 'article') else "",
-                "Code": m.article.code if hasattr(m, 'article') else "",
-                "Quantité": m.quantite,
-                "Prix Unitaire": m.prix_unitaire or 0,
-                "Valeur Totale": m.valeur_totale or 0,
-                "Motif": m.motif or ""
-            })
+    async def write_mouvements_excel(
+        self,
+        db,
+        magasin_id: str,
+        date_debut: Optional[datetime] = None,
+        date_fin: Optional[datetime] = None
+    ) -> str:
+        """Écrire les mouvements dans un fichier Excel temporaire, page par page (renvoie son chemin)"""
+        writer = XlsxStreamWriter("Mouvements", [entete for entete, _ in COLONNES_MOUVEMENTS])
+        async for rows in mouvement_pages(db, magasin_id, date_debut, date_fin):
+            await asyncio.to_thread(writer.append_rows, rows)
+        return await asyncio.to_thread(writer.close)
+    
+    async def export_mouvements(
+        self,
+        db,
+        magasin_id: str,
+        date_debut: Optional[datetime] = None,
+        date_fin: Optional[datetime] = None,
+        format: str = "xlsx",
+        gzip: bool = False
+    ) -> Tuple[object, str, str]:
+        """
+        Exporter les mouvements en xlsx, csv (gzip optionnel) ou parquet
         
-        df = pd.DataFrame(data)
-        buffer = BytesIO()
-        df.to_excel(buffer, index=False, engine='openpyxl')
-        return buffer.getvalue()
+        Returns:
+            (corps pour StreamingResponse, media type, extension); en CSV les
+            pages sont lues pendant l'envoi de la réponse
+        """
+        pages = mouvement_pages(db, magasin_id, date_debut, date_fin, brut=format != "xlsx")
+        return await export_pages(format, "Mouvements", COLONNES_MOUVEMENTS, pages, gzip)
+    
+    async def export_rows(
+        self,
+        format: str,
+        titre: str,
+        colonnes: Colonnes,
+        rows: List[list],
+        gzip: bool = False
+    ) -> Tuple[object, str, str]:
+        """Exporter des lignes déjà chargées (état du stock, valorisation) en csv ou parquet"""
+        return await export_pages(format, titre, colonnes, single_page(rows), gzip)
+    
+    @staticmethod
+    def stock_values(articles: List) -> List[list]:
+        """Lignes de l'état du stock (ordre de COLONNES_STOCK)"""
+        return [
+            [a.code, a.designation, a.stock_actuel, a.stock_min, a.prix_achat, a.stock_actuel * a.prix_achat]
+            for a in articles
+        ]
+    
+    @staticmethod
+    def valorisation_values(articles: List) -> List[list]:
+        """Lignes de valorisation (ordre de COLONNES_VALORISATION), taux de TVA numérique et sans ligne de total"""
+        df = valorisation_frame(articles)
+        df[["prix_achat"] + MONTANTS] = df[["prix_achat"] + MONTANTS].round(3)
+        colonnes = ["code", "designation", "categorie", "stock_actuel", "prix_achat", "valeur_ht", "tva_taux", "tva", "valeur_ttc"]
+        return df[colonnes].astype(object).values.tolist()
     
     def export_stock_pdf(self, articles: List, magasin_id: str) -> bytes:
         """Exporter l'état du stock en PDF (placeholder - nécessite reportlab)"""
@@ -47,59 +154,17 @@ class ExportService:
         df.to_excel(buffer, index=False, engine='openpyxl')
         return buffer.getvalue()
     
-    def export_valorisation_excel(self, articles: List) -> bytes:
-        """Exporter la valorisation du stock (format comptabilité tunisienne)"""
-        data = []
-        total_valeur = 0
-        
-        for a in articles:
-            valeur = a.stock_actuel * a.prix_achat
-            tva = valeur * (a.tva_taux or 0.19)
-            total_valeur += valeur
-            
-            data.append({
-                "Code Article": a.code,
-                "Désignation": a.designation,
-                "Quantité en Stock": a.stock_actuel,
-                "Prix Achat HT (DT)": round(a.prix_achat, 3),
-                "Valeur Stock HT (DT)": round(valeur, 3),
-                "Taux TVA": f"{(a.tva_taux or 0.19) * 100}%",
-                "TVA (DT)": round(tva, 3),
-                "Valeur TTC (DT)": round(valeur + tva, 3)
-            })
-        
-        df = pd.DataFrame(data)
-        
-        # Ajouter ligne de total
-        total_row = pd.DataFrame([{
-            "Code Article": "TOTAL",
-            "Désignation": "",
-            "Quantité en Stock": sum(a.stock_actuel for a in articles),
-            "Prix Achat HT (DT)": "",
-            "Valeur Stock HT (DT)": round(total_valeur, 3),
-            "Taux TVA": "",
-            "TVA (DT)": round(sum(a.stock_actuel * a.prix_achat * (a.tva_taux or 0.19) for a in articles), 3),
-            "Valeur TTC (DT)": round(sum(a.stock_actuel * a.prix_achat * (1 + (a.tva_taux or 0.19)) for a in articles), 3)
-        }])
-        
-        df = pd.concat([df, total_row], ignore_index=True)
+    def export_valorisation_excel(self, articles: List, grouper_par: Optional[List[str]] = None) -> bytes:
+        """Exporter la valorisation du stock (format comptabilité tunisienne), sous-totaux optionnels"""
+        df = build_valorisation(articles, grouper_par)
         
         buffer = BytesIO()
         with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
             df.to_excel(writer, index=False, sheet_name='Valorisation Stock')
             
-            # Formater le fichier
+            # Largeurs calculées sur les colonnes du DataFrame, sans parcourir les cellules
             worksheet = writer.sheets['Valorisation Stock']
-            for column in worksheet.columns:
-                max_length = 0
-                column = [cell for cell in column]
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
+            for index, largeur in enumerate(column_widths(df), start=1):
+                worksheet.column_dimensions[get_column_letter(index)].width = largeur
         
         return buffer.getvalue()
@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from prisma.models import Fournisseur
 from app.core.database import prisma
 from app.api.v1.models.schemas import FournisseurCreate, FournisseurUpdate
+from app.utils.pagination import keyset_page
 
 class FournisseurService:
     
@@ -25,12 +26,15 @@ class FournisseurService:
         return await prisma.fournisseur.find_unique(where={"id": fournisseur_id})
     
     @staticmethod
-    async def get_fournisseurs_by_entreprise(entreprise_id: str, skip: int = 0, limit: int = 100) -> List[Fournisseur]:
-        return await prisma.fournisseur.find_many(
-            where={"entreprise_id": entreprise_id},
-            skip=skip,
-            take=limit,
-            order={"nom": "asc"}
+    async def get_fournisseurs_by_entreprise(
+        entreprise_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[Fournisseur], Optional[str]]:
+        """Page de fournisseurs par nom: (fournisseurs, curseur suivant)"""
+        return await keyset_page(
+            prisma.fournisseur,
+            {"entreprise_id": entreprise_id},
+            "nom", "asc", limit, cursor,
+            **({"skip": skip} if skip and not cursor else {})
         )
     
     @staticmethod
@@ -1,17 +1,35 @@
 from typing import List, Dict
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from app.core.database import get_db
 from app.services.whatsapp_service import WhatsAppService
+from app.services.alert_engine import alert_engine
+from app.services.sales_aggregate_service import SalesAggregateService
+from app.services.stock_query_service import StockQueryService
+from app.utils.calculators import ageing_buckets, calculate_rotation_stock, calculate_couverture_stock
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Dernière sortie lue sur la colonne maintenue last_sortie_at (ArticleActivityService).
+# Dates et jours en UTC: $2 = limite (UTC naïf), $3 = jour courant UTC
+STOCK_DORMANT_SQL = """
+    SELECT id, code, designation, categorie, stock_actuel, prix_achat,
+           (stock_actuel * prix_achat)::float8 AS valeur_immobilisee,
+           last_sortie_at AS date_sortie,
+           ($3::date - COALESCE(last_sortie_at, created_at)::date)::int AS jours_sans_sortie
+    FROM articles
+    WHERE magasin_id = $1 AND is_active = true AND stock_actuel > 0
+      AND COALESCE(last_sortie_at, created_at) < $2::timestamp
+    ORDER BY valeur_immobilisee DESC, code
+"""
+
 
 class InventoryService:
     """Service pour gérer les niveaux de stock et générer des alertes"""
     
     def __init__(self):
         self.whatsapp_service = WhatsAppService()
+        self.alert_engine = alert_engine
     
     async def check_stock_levels(self, magasin_id: str) -> Dict:
         """
@@ -20,103 +38,14 @@ class InventoryService:
         Returns:
             Dict avec statistiques et alertes générées
         """
-        db = await get_db()
-        
-        # Récupérer tous les articles actifs
-        articles = await db.article.find_many(
-            where={"magasin_id": magasin_id, "is_active": True}
-        )
-        
-        alertes_generees = []
-        ruptures = []
-        stock_faible = []
-        peremption_proche = []
-        
-        for article in articles:
-            # Vérifier rupture de stock
-            if article.stock_actuel == 0:
-                ruptures.append(article)
-                await self._create_alerte(
-                    article_id=article.id,
-                    magasin_id=magasin_id,
-                    type_alerte="RUPTURE",
-                    niveau="CRITIQUE",
-                    message=f"Rupture de stock: {article.designation}"
-                )
-                alertes_generees.append("RUPTURE")
-            
-            # Vérifier stock faible
-            elif article.stock_actuel <= article.stock_min:
-                stock_faible.append(article)
-                await self._create_alerte(
-                    article_id=article.id,
-                    magasin_id=magasin_id,
-                    type_alerte="SEUIL_BAS",
-                    niveau="ELEVE",
-                    message=f"Stock faible: {article.designation} ({article.stock_actuel}/{article.stock_min})"
-                )
-                alertes_generees.append("SEUIL_BAS")
-            
-            # Vérifier péremption
-            if article.date_peremption:
-                jours_restants = (article.date_peremption - datetime.now()).days
-                if 0 < jours_restants <= 30:
-                    peremption_proche.append(article)
-                    await self._create_alerte(
-                        article_id=article.id,
-                        magasin_id=magasin_id,
-                        type_alerte="PEREMPTION",
-                        niveau="MOYEN" if jours_restants > 7 else "ELEVE",
-                        message=f"Péremption proche: {article.designation} (dans {jours_restants} jours)"
-                    )
-                    alertes_generees.append("PEREMPTION")
-        
-        return {
-            "magasin_id": magasin_id,
-            "date_verification": datetime.now(),
-            "total_articles": len(articles),
-            "ruptures": len(ruptures),
-            "stock_faible": len(stock_faible),
-            "peremption_proche": len(peremption_proche),
-            "alertes_generees": len(alertes_generees)
-        }
-    
-    async def _create_alerte(
-        self,
-        article_id: str,
-        magasin_id: str,
-        type_alerte: str,
-        niveau: str,
-        message: str
-    ):
-        """Créer une alerte dans la base de données"""
-        db = await get_db()
-        
-        try:
-            await db.alerte.create(
-                data={
-                    "article_id": article_id,
-                    "magasin_id": magasin_id,
-                    "type": type_alerte,
-                    "niveau": niveau,
-                    "message": message,
-                    "est_vue": False,
-                    "est_resolue": False
-                }
-            )
-        except Exception as e:
-            logger.error(f"Error creating alert: {str(e)}")
+        return await self.alert_engine.run(magasin_id)
     
     async def calculate_stock_value(self, magasin_id: str) -> Dict:
         """Calculer la valeur totale du stock (Cash immobilisé)"""
-        db = await get_db()
-        
-        articles = await db.article.find_many(
-            where={"magasin_id": magasin_id, "is_active": True}
-        )
+        resume = await StockQueryService.resume(magasin_id)
         
-        valeur_achat = sum(a.stock_actuel * a.prix_achat for a in articles)
-        valeur_vente = sum(a.stock_actuel * a.prix_vente for a in articles)
+        valeur_achat = resume["valeur_achat"]
+        valeur_vente = resume["valeur_vente"]
         marge_potentielle = valeur_vente - valeur_achat
         
         return {
@@ -125,41 +54,55 @@ class InventoryService:
             "valeur_vente_dt": round(valeur_vente, 2),
             "marge_potentielle_dt": round(marge_potentielle, 2),
             "taux_marge": round((marge_potentielle / valeur_achat * 100) if valeur_achat > 0 else 0, 2),
-            "nombre_articles": len(articles)
+            "nombre_articles": resume["total_articles"]
         }
     
-    async def get_slow_moving_items(self, magasin_id: str, days: int = 90) -> List:
-        """Identifier les articles à rotation lente (stock dormant)"""
+    async def get_slow_moving_items(self, magasin_id: str, days: int = 90) -> Dict:
+        """
+        Identifier le stock dormant: articles en stock sans sortie depuis `days` jours
+
+        Une seule requête sur les articles (date de dernière sortie
+        dénormalisée). Sans sortie connue, l'ancienneté part de la création
+        de l'article.
+
+        Returns:
+            Dict avec les articles (les plus coûteux d'abord), leur ancienneté
+            réelle et la répartition par tranche (30/60/90/180 jours)
+        """
         db = await get_db()
+        maintenant = datetime.now(timezone.utc)
+        date_limite = (maintenant - timedelta(days=days)).replace(tzinfo=None).isoformat()
+        articles = await db.query_raw(STOCK_DORMANT_SQL, magasin_id, date_limite, maintenant.date().isoformat())
         
-        date_limite = datetime.now() - timedelta(days=days)
+        return {
+            "magasin_id": magasin_id,
+            "jours": days,
+            "nombre_articles": len(articles),
+            "valeur_immobilisee_totale": round(sum(a["valeur_immobilisee"] for a in articles), 2),
+            "tranches": ageing_buckets(articles),
+            "articles": [{**a, "valeur_immobilisee": round(a["valeur_immobilisee"], 2)} for a in articles]
+        }
+    
+    async def get_rotation_stock(self, magasin_id: str, days: int = 365) -> List[Dict]:
+        """Rotation et couverture du stock par article, à partir de l'agrégat des ventes"""
+        db = await get_db()
         
-        # Articles sans mouvement récent
         articles = await db.article.find_many(
-            where={
-                "magasin_id": magasin_id,
-                "is_active": True,
-                "stock_actuel": {"gt": 0}
-            }
+            where={"magasin_id": magasin_id, "is_active": True}
         )
+        vendus = await SalesAggregateService.get_ventes_periode(magasin_id, days)
         
-        slow_items = []
+        rotations = []
         for article in articles:
-            # Vérifier s'il y a eu des mouvements récents
-            recent_movements = await db.mouvementstock.count(
-                where={
-                    "article_id": article.id,
-                    "date_mouvement": {"gte": date_limite},
-                    "type": "SORTIE"
-                }
-            )
-            
-            if recent_movements == 0:
-                valeur_immobilisee = article.stock_actuel * article.prix_achat
-                slow_items.append({
-                    "article": article,
-                    "valeur_immobilisee": round(valeur_immobilisee, 2),
-                    "jours_sans_mouvement": days
-                })
+            quantite_vendue = vendus.get(article.id, {}).get("quantite", 0)
+            rotations.append({
+                "article_id": article.id,
+                "code": article.code,
+                "designation": article.designation,
+                "stock_actuel": article.stock_actuel,
+                "quantite_vendue": quantite_vendue,
+                "taux_rotation": calculate_rotation_stock(quantite_vendue, article.stock_actuel),
+                "couverture_jours": calculate_couverture_stock(article.stock_actuel, quantite_vendue / days)
+            })
         
-        return sorted(slow_items, key=lambda x: x["valeur_immobilisee"], reverse=True)
+        return sorted(rotations, key=lambda x: x["taux_rotation"])
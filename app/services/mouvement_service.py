@@ -1,60 +1,184 @@
-from typing import List
-from datetime import datetime
-from prisma.models import MouvementStock, Article
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from uuid import uuid4
+from pydantic import ValidationError
+from prisma.models import MouvementStock
+from app.core.config import settings
 from app.core.database import prisma
+from app.core.events import publish, STOCK_CHANGED
+from app.services.article_activity_service import ArticleActivityService
+from app.services.sales_aggregate_service import SalesAggregateService
+from app.services.stock_service import StockService, SIGNES
 from app.schemas.mouvement import MouvementStockCreate
+from app.utils.pagination import keyset_page
 
 class MouvementService:
     
     @staticmethod
     async def create_mouvement(data: MouvementStockCreate) -> MouvementStock:
-        # Créer le mouvement
-        mouvement = await prisma.mouvementstock.create(
-            data={
+        # Mouvement, stock, activité de l'article et vente (sortie) dans la même transaction
+        date_mouvement = data.date_mouvement or datetime.now(timezone.utc)
+        async with prisma.tx(max_wait=timedelta(seconds=settings.TX_MAX_WAIT_SECONDS)) as tx:
+            mouvement = await tx.mouvementstock.create(
+                data={
+                    "type": data.type.upper(),
+                    "quantite": data.quantite,
+                    "prix_unitaire": data.prix_unitaire,
+                    "valeur_totale": MouvementService._valeur_totale(data.quantite, data.prix_unitaire),
+                    "motif": data.motif,
+                    "reference_doc": data.reference_doc,
+                    "date_mouvement": date_mouvement,
+                    "article_id": data.article_id,
+                    "magasin_id": data.magasin_id,
+                    "fournisseur_id": data.fournisseur_id
+                }
+            )
+            
+            stock = await MouvementService._update_stock(data.article_id, data.type, data.quantite, client=tx)
+            await ArticleActivityService.record([{
+                "article_id": data.article_id,
                 "type": data.type,
                 "quantite": data.quantite,
-                "prix_unitaire": data.prix_unitaire,
-                "motif": data.motif,
-                "reference_doc": data.reference_doc,
-                "date_mouvement": data.date_mouvement or datetime.now(),
-                "article_id": data.article_id,
-                "magasin_id": data.magasin_id,
-                "fournisseur_id": data.fournisseur_id
-            }
-        )
+                "date_mouvement": date_mouvement
+            }], client=tx)
+            if data.type == "sortie":
+                prix = data.prix_unitaire
+                if prix is None:
+                    article = await tx.article.find_unique(where={"id": data.article_id})
+                    prix = article.prix_vente if article else 0
+                await SalesAggregateService.create_ventes([{
+                    "article_id": data.article_id,
+                    "magasin_id": data.magasin_id,
+                    "quantite": data.quantite,
+                    "prix_unitaire": prix,
+                    "date_vente": date_mouvement
+                }], client=tx)
         
-        # Mettre à jour le stock de l'article
-        await MouvementService._update_stock(data.article_id, data.type, data.quantite)
+        publish(STOCK_CHANGED, {
+            "magasin_id": data.magasin_id,
+            "article_ids": [data.article_id],
+            "stocks": {data.article_id: [stock["stock_avant"], stock["stock_apres"]]} if stock else {},
+            "source": "mouvement"
+        })
         
         return mouvement
     
     @staticmethod
-    async def _update_stock(article_id: str, type_mouvement: str, quantite: int):
-        article = await prisma.article.find_unique(where={"id": article_id})
-        if not article:
-            return
+    async def create_mouvements_batch(mouvements: List[Dict]) -> Dict:
+        """
+        Enregistrer un lot de mouvements (caisses)
+
+        Chaque mouvement est validé individuellement; les valides sont insérés
+        en un create_many et le delta net de chaque article appliqué en une
+        mise à jour, le tout dans une transaction. Les ajustements (quantité
+        absolue) dépendent de l'ordre et passent par POST /mouvements/.
+
+        Returns:
+            Dict avec les compteurs, le stock final des articles touchés et
+            un résultat par mouvement (index dans le lot, statut, id ou erreur)
+        """
+        resultats: List[Optional[Dict]] = [None] * len(mouvements)
+        valides = []
+        for index, brut in enumerate(mouvements):
+            try:
+                mouvement = MouvementStockCreate.model_validate(brut)
+            except ValidationError as e:
+                erreur = e.errors()[0]
+                champ = ".".join(str(l) for l in erreur["loc"])
+                resultats[index] = {"index": index, "statut": "erreur", "erreur": f"{champ}: {erreur['msg']}"}
+                continue
+            if mouvement.type == "ajustement":
+                resultats[index] = {"index": index, "statut": "erreur", "erreur": "Ajustement non accepté en lot"}
+                continue
+            valides.append((index, mouvement))
         
-        if type_mouvement == "entree":
-            nouveau_stock = article.stock_actuel + quantite
-        elif type_mouvement == "sortie":
-            nouveau_stock = max(0, article.stock_actuel - quantite)
-        elif type_mouvement == "ajustement":
-            nouveau_stock = quantite
-        else:  # retour
-            nouveau_stock = article.stock_actuel + quantite
+        article_ids = sorted({m.article_id for _, m in valides})
+        articles = await prisma.article.find_many(where={"id": {"in": article_ids}}) if article_ids else []
+        magasin_par_article = {a.id: a.magasin_id for a in articles if a.is_active}
+        prix_vente = {a.id: a.prix_vente for a in articles}
         
-        await prisma.article.update(
-            where={"id": article_id},
-            data={"stock_actuel": nouveau_stock}
-        )
+        lignes = []
+        deltas: Dict[str, int] = defaultdict(int)
+        for index, mouvement in valides:
+            if magasin_par_article.get(mouvement.article_id) != mouvement.magasin_id:
+                resultats[index] = {"index": index, "statut": "erreur", "erreur": "Article non trouvé dans ce magasin"}
+                continue
+            mouvement_id = str(uuid4())
+            lignes.append({
+                "id": mouvement_id,
+                "type": mouvement.type.upper(),
+                "quantite": mouvement.quantite,
+                "prix_unitaire": mouvement.prix_unitaire,
+                "valeur_totale": MouvementService._valeur_totale(mouvement.quantite, mouvement.prix_unitaire),
+                "motif": mouvement.motif,
+                "reference_doc": mouvement.reference_doc,
+                "date_mouvement": mouvement.date_mouvement or datetime.now(timezone.utc),
+                "article_id": mouvement.article_id,
+                "magasin_id": mouvement.magasin_id,
+                "fournisseur_id": mouvement.fournisseur_id
+            })
+            deltas[mouvement.article_id] += SIGNES[mouvement.type] * mouvement.quantite
+            resultats[index] = {"index": index, "statut": "ok", "id": mouvement_id}
+        
+        stocks = {}
+        if lignes:
+            # Stock d'abord (verrous dans l'ordre des ids), puis insertion des mouvements.
+            # Délais explicites: un lot (jusqu'à 5000 lignes) dépasse le délai par défaut de 5 s
+            async with prisma.tx(
+                max_wait=timedelta(seconds=settings.TX_MAX_WAIT_SECONDS),
+                timeout=timedelta(seconds=settings.BATCH_TX_TIMEOUT_SECONDS)
+            ) as tx:
+                stocks = await StockService.apply_deltas(deltas, client=tx, details=True)
+                await tx.mouvementstock.create_many(data=lignes)
+                await ArticleActivityService.record(lignes, client=tx)
+                # Les sorties de caisse sont des ventes: table brute et agrégat journalier
+                await SalesAggregateService.create_ventes([
+                    {
+                        "article_id": ligne["article_id"],
+                        "magasin_id": ligne["magasin_id"],
+                        "quantite": ligne["quantite"],
+                        "prix_unitaire": ligne["prix_unitaire"] if ligne["prix_unitaire"] is not None else prix_vente[ligne["article_id"]],
+                        "date_vente": ligne["date_mouvement"]
+                    }
+                    for ligne in lignes if ligne["type"] == "SORTIE"
+                ], client=tx)
+            
+            articles_par_magasin = defaultdict(set)
+            for ligne in lignes:
+                articles_par_magasin[ligne["magasin_id"]].add(ligne["article_id"])
+            for magasin_id, ids in articles_par_magasin.items():
+                publish(STOCK_CHANGED, {
+                    "magasin_id": magasin_id,
+                    "article_ids": sorted(ids),
+                    "stocks": {article_id: stocks[article_id] for article_id in ids if article_id in stocks},
+                    "source": "mouvement"
+                })
+        
+        return {
+            "total": len(mouvements),
+            "crees": len(lignes),
+            "erreurs": len(mouvements) - len(lignes),
+            "stocks": {article_id: apres for article_id, (_, apres) in stocks.items()},
+            "resultats": resultats
+        }
     
     @staticmethod
-    async def get_mouvements_by_article(article_id: str, limit: int = 50) -> List[MouvementStock]:
-        return await prisma.mouvementstock.find_many(
-            where={"article_id": article_id},
-            order={"date_mouvement": "desc"},
-            take=limit
-        )
+    def _valeur_totale(quantite: int, prix_unitaire: Optional[float]) -> Optional[float]:
+        # Même valeur quel que soit le chemin d'écriture (rapports de mouvements)
+        return quantite * prix_unitaire if prix_unitaire is not None else None
+    
+    @staticmethod
+    async def _update_stock(article_id: str, type_mouvement: str, quantite: int, client=None) -> Optional[Dict]:
+        # Une requête atomique (UPDATE ... RETURNING), voir StockService
+        return await StockService.apply_mouvement(article_id, type_mouvement, quantite, client=client)
+    
+    @staticmethod
+    async def get_mouvements_by_article(
+        article_id: str, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[MouvementStock], Optional[str]]:
+        """Historique d'un article, plus récent d'abord: (mouvements, curseur suivant)"""
+        return await keyset_page(prisma.mouvementstock, {"article_id": article_id}, "date_mouvement", "desc", limit, cursor)
     
     @staticmethod
     async def get_mouvements_by_magasin(
@@ -62,8 +186,10 @@ class MouvementService:
         date_debut: datetime = None,
         date_fin: datetime = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[MouvementStock]:
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[MouvementStock], Optional[str]]:
+        """Mouvements d'un magasin, plus récents d'abord: (mouvements, curseur suivant)"""
         where_clause = {"magasin_id": magasin_id}
         
         if date_debut or date_fin:
@@ -73,10 +199,8 @@ class MouvementService:
             if date_fin:
                 where_clause["date_mouvement"]["lte"] = date_fin
         
-        return await prisma.mouvementstock.find_many(
-            where=where_clause,
-            skip=skip,
-            take=limit,
-            order={"date_mouvement": "desc"},
-            include={"article": True}
+        return await keyset_page(
+            prisma.mouvementstock, where_clause, "date_mouvement", "desc", limit, cursor,
+            include={"article": True},
+            **({"skip": skip} if skip and not cursor else {})
         )
@@ -0,0 +1,145 @@
+"""
+Réapprovisionnement: suggestions d'achat et bons de commande brouillons
+
+Une requête ramène, pour toute l'entreprise, le stock, la dernière prévision,
+le fournisseur habituel et son délai de chaque article actif. Les calculs sont
+vectorisés (app.utils.reorder) et les brouillons écrits en une transaction.
+"""
+from typing import Dict, List, Optional
+from uuid import uuid4
+from app.core.database import get_db
+from app.services.sequence_service import SequenceService
+from app.utils.reorder import plan_reorders, group_by_fournisseur
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Au-delà, une entrée fournisseur ne désigne plus le fournisseur habituel
+FENETRE_FOURNISSEUR_JOURS = 365
+
+# Fournisseur habituel: dernier prix d'achat connu, sinon dernière entrée fournisseur
+# de la fenêtre. La LATERAL sur mouvements_stock lit l'index partiel
+# mouvements_fournisseur_idx (prisma/sql/mouvements_index.sql): les ventes,
+# sans fournisseur, ne sont pas parcourues.
+ARTICLES_REAPPRO_SQL = f"""
+    SELECT a.id AS article_id, a.code, a.designation, a.magasin_id,
+           a.stock_actuel, a.stock_min, a.stock_max, a.stock_securite,
+           COALESCE(hp.prix_achat, a.prix_achat) AS prix_achat,
+           (p.quantite_prevue / GREATEST(EXTRACT(EPOCH FROM p.date_fin_periode - p.date_periode) / 86400, 1))::float8
+               AS demande_jour,
+           p.confiance,
+           f.id AS fournisseur_id, f.nom AS fournisseur, f.delai_livraison
+    FROM articles a
+    JOIN magasins m ON m.id = a.magasin_id
+    LEFT JOIN LATERAL (
+        SELECT quantite_prevue, date_periode, date_fin_periode, confiance
+        FROM previsions
+        WHERE article_id = a.id AND magasin_id = a.magasin_id
+        ORDER BY date_calcul DESC
+        LIMIT 1
+    ) p ON true
+    LEFT JOIN LATERAL (
+        SELECT fournisseur_id, prix_achat
+        FROM historiques_prix
+        WHERE article_id = a.id
+        ORDER BY date_effet DESC
+        LIMIT 1
+    ) hp ON true
+    LEFT JOIN LATERAL (
+        SELECT fournisseur_id
+        FROM mouvements_stock
+        WHERE article_id = a.id AND fournisseur_id IS NOT NULL
+          AND date_mouvement >= (NOW() AT TIME ZONE 'UTC') - INTERVAL '{FENETRE_FOURNISSEUR_JOURS} days'
+        ORDER BY date_mouvement DESC
+        LIMIT 1
+    ) ms ON true
+    LEFT JOIN fournisseurs f ON f.id = COALESCE(hp.fournisseur_id, ms.fournisseur_id)
+    WHERE m.entreprise_id = $1 AND a.is_active = true {{filtre_magasin}}
+"""
+
+
+class ReorderService:
+
+    @staticmethod
+    async def get_suggestions(entreprise_id: str, magasin_id: Optional[str] = None) -> List[Dict]:
+        """Articles à commander (point de commande atteint), triés par priorité"""
+        db = await get_db()
+        params = [entreprise_id]
+        filtre_magasin = ""
+        if magasin_id:
+            filtre_magasin = "AND a.magasin_id = $2"
+            params.append(magasin_id)
+
+        articles = await db.query_raw(ARTICLES_REAPPRO_SQL.format(filtre_magasin=filtre_magasin), *params)
+        return plan_reorders(articles)
+
+    @staticmethod
+    async def plan(entreprise_id: str, magasin_id: Optional[str] = None) -> Dict:
+        """Suggestions regroupées par fournisseur"""
+        suggestions = await ReorderService.get_suggestions(entreprise_id, magasin_id)
+        groupes = group_by_fournisseur(suggestions)
+        sans_fournisseur = groupes.pop(None, None)
+
+        return {
+            "total_articles": len(suggestions),
+            "fournisseurs": list(groupes.values()),
+            "sans_fournisseur": sans_fournisseur["lignes"] if sans_fournisseur else []
+        }
+
+    @staticmethod
+    async def create_draft_orders(entreprise_id: str, magasin_id: Optional[str] = None) -> Dict:
+        """
+        Émettre un bon de commande brouillon par fournisseur
+
+        Les bons et leurs lignes sont écrits en deux create_many dans une seule
+        transaction; les articles sans fournisseur connu sont renvoyés à part.
+        """
+        db = await get_db()
+        plan = await ReorderService.plan(entreprise_id, magasin_id)
+        if not plan["fournisseurs"]:
+            return {"bons_crees": 0, "lignes_creees": 0, "bons": [], "sans_fournisseur": plan["sans_fournisseur"]}
+
+        bons = []
+        lignes = []
+
+        async with db.tx() as tx:
+            references = await SequenceService.allocate(
+                entreprise_id, "BON_COMMANDE", len(plan["fournisseurs"]), client=tx
+            )
+            for reference, groupe in zip(references, plan["fournisseurs"]):
+                bon_id = str(uuid4())
+                bons.append({
+                    "id": bon_id,
+                    "reference": reference,
+                    "entreprise_id": entreprise_id,
+                    "fournisseur_id": groupe["fournisseur_id"],
+                    "statut": "BROUILLON",
+                    "montant_total": groupe["montant_total"],
+                    "notes": "Brouillon généré par le réapprovisionnement automatique"
+                })
+                lignes.extend(
+                    {
+                        "bon_commande_id": bon_id,
+                        "article_id": ligne["article_id"],
+                        "quantite_commandee": ligne["quantite_a_commander"],
+                        "prix_unitaire": ligne["prix_achat"],
+                        "montant_total": round(ligne["quantite_a_commander"] * ligne["prix_achat"], 3)
+                    }
+                    for ligne in groupe["lignes"]
+                )
+
+            await tx.boncommande.create_many(data=bons)
+            await tx.lignecommande.create_many(data=lignes)
+
+        logger.info(f"Draft purchase orders for entreprise {entreprise_id}: {len(bons)} orders, {len(lignes)} lines")
+
+        return {
+            "bons_crees": len(bons),
+            "lignes_creees": len(lignes),
+            "bons": [
+                {"id": b["id"], "reference": b["reference"], "fournisseur_id": b["fournisseur_id"],
+                 "montant_total": b["montant_total"]}
+                for b in bons
+            ],
+            "sans_fournisseur": plan["sans_fournisseur"]
+        }
@@ -1,38 +1,232 @@
-from datetime import datetime
-from typing import List
+"""
+Rapports agrégés (mouvements, valorisation, marges) en Excel ou PDF
+
+Les trois rapports s'appuient sur une même requête d'agrégation paramétrée
+(source × dimensions × période): les GROUP BY sont faits par PostgreSQL, seuls
+les agrégats remontent. Ils sont mis en cache par paramètres; une période
+close (terminée avant aujourd'hui) est servie depuis le cache pendant
+settings.REPORT_CACHE_TTL_SECONDS, une période ouverte quelques minutes.
+"""
+from datetime import date, datetime, timedelta
+from io import BytesIO
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 import pandas as pd
+from openpyxl.utils import get_column_letter
+from app.core.cache import get_json, set_json
+from app.core.config import settings
+from app.core.database import get_db
+from app.utils.pdf_table import PdfTableDocument
+from app.utils.helpers import utc_today
+from app.utils.valorisation import column_widths
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Période encore ouverte: les agrégats changent, cache court
+CACHE_PERIODE_OUVERTE_SECONDS = 300
+
+PERIODES = {"jour": "day", "semaine": "week", "mois": "month"}
+
+SOURCES = {
+    "mouvements": {
+        "from": "mouvements_stock m JOIN articles a ON a.id = m.article_id",
+        "magasin": "m.magasin_id",
+        "date": "m.date_mouvement",
+        "mesures": [
+            "COUNT(*)::int AS nb_mouvements",
+            "COALESCE(SUM(m.quantite) FILTER (WHERE m.type = 'ENTREE'), 0)::int AS quantite_entrees",
+            "COALESCE(SUM(m.quantite) FILTER (WHERE m.type = 'SORTIE'), 0)::int AS quantite_sorties",
+            "COALESCE(SUM(m.quantite) FILTER (WHERE m.type = 'RETOUR'), 0)::int AS quantite_retours",
+            "COALESCE(SUM(m.valeur_totale) FILTER (WHERE m.type = 'ENTREE'), 0)::float8 AS valeur_entrees",
+            "COALESCE(SUM(m.valeur_totale) FILTER (WHERE m.type = 'SORTIE'), 0)::float8 AS valeur_sorties",
+        ],
+    },
+    "marges": {
+        "from": "ventes_journalieres v JOIN articles a ON a.id = v.article_id",
+        "magasin": "v.magasin_id",
+        "date": "v.jour",
+        "mesures": [
+            "SUM(v.quantite)::int AS quantite",
+            "SUM(v.chiffre_affaires)::float8 AS chiffre_affaires",
+            "SUM(v.quantite * a.prix_achat)::float8 AS cout_achat",
+            "SUM(v.chiffre_affaires - v.quantite * a.prix_achat)::float8 AS marge",
+            "(CASE WHEN SUM(v.chiffre_affaires) > 0 THEN "
+            "SUM(v.chiffre_affaires - v.quantite * a.prix_achat) / SUM(v.chiffre_affaires) * 100 END)::float8 AS taux_marge",
+        ],
+    },
+    "valorisation": {
+        "from": "articles a",
+        "magasin": "a.magasin_id",
+        "date": None,
+        "filtre": "AND a.is_active = true",
+        "mesures": [
+            "COUNT(*)::int AS nb_articles",
+            "SUM(a.stock_actuel)::int AS quantite",
+            "SUM(a.stock_actuel * a.prix_achat)::float8 AS valeur_ht",
+            "SUM(a.stock_actuel * a.prix_achat * COALESCE(a.tva_taux, 0.19))::float8 AS tva",
+            "SUM(a.stock_actuel * a.prix_achat * (1 + COALESCE(a.tva_taux, 0.19)))::float8 AS valeur_ttc",
+        ],
+    },
+}
+
+CATEGORIE_SQL = "COALESCE(a.categorie, 'Sans catégorie')"
+TVA_SQL = "COALESCE(a.tva_taux, 0.19)"
+
+# (colonnes sélectionnées, expressions de regroupement, tri)
+DIMENSIONS = {
+    "article": (
+        ["a.id AS article_id", "a.code", "a.designation", f"{CATEGORIE_SQL} AS categorie"],
+        ["a.id"],
+        ["a.code"],
+    ),
+    "categorie": ([f"{CATEGORIE_SQL} AS categorie"], [CATEGORIE_SQL], [CATEGORIE_SQL]),
+    "tva_taux": ([f"{TVA_SQL}::float8 AS tva_taux"], [TVA_SQL], [TVA_SQL]),
+}
+
+# (titre du tableau, [(en-tête, clé)], lignes)
+Tableau = Tuple[str, List[Tuple[str, str]], List[Dict]]
+
+COLONNES_MOUVEMENTS = [
+    ("Entrées", "quantite_entrees"), ("Sorties", "quantite_sorties"), ("Retours", "quantite_retours"),
+    ("Mouvements", "nb_mouvements"), ("Valeur entrées (DT)", "valeur_entrees"), ("Valeur sorties (DT)", "valeur_sorties"),
+]
+COLONNES_MARGES = [
+    ("Quantité", "quantite"), ("CA (DT)", "chiffre_affaires"), ("Coût d'achat (DT)", "cout_achat"),
+    ("Marge (DT)", "marge"), ("Taux de marge (%)", "taux_marge"),
+]
+COLONNES_VALORISATION = [
+    ("Catégorie", "categorie"), ("Taux TVA", "tva_taux"), ("Articles", "nb_articles"), ("Quantité", "quantite"),
+    ("Valeur HT (DT)", "valeur_ht"), ("TVA (DT)", "tva"), ("Valeur TTC (DT)", "valeur_ttc"),
+]
+
+
+def build_aggregate_sql(source: str, dimensions: Sequence[str], periode: Optional[str] = None) -> str:
+    """
+    Requête d'agrégation d'une source par dimensions (et période)
+
+    Paramètres: $1 magasin_id, puis $2 / $3 bornes de dates incluses si la source est datée
+    """
+    config = SOURCES[source]
+    colonnes, groupes, tri = [], [], []
+    if periode:
+        if config["date"] is None:
+            raise ValueError(f"La source {source} n'est pas datée")
+        expression = f"date_trunc('{PERIODES[periode]}', {config['date']})::date"
+        colonnes.append(f"{expression} AS periode")
+        groupes.append(expression)
+        tri.append(expression)
+    for dimension in dimensions:
+        selection, regroupement, ordre = DIMENSIONS[dimension]
+        colonnes.extend(selection)
+        groupes.extend(regroupement)
+        tri.extend(ordre)
+
+    filtres = [f"{config['magasin']} = $1", config.get("filtre", "")]
+    if config["date"]:
+        filtres.append(f"AND {config['date']} >= $2::date AND {config['date']} < $3::date + 1")
+
+    return (
+        f"SELECT {', '.join(colonnes + config['mesures'])} "
+        f"FROM {config['from']} "
+        f"WHERE {' '.join(f for f in filtres if f)} "
+        + (f"GROUP BY {', '.join(groupes)} ORDER BY {', '.join(tri)}" if groupes else "")
+    )
+
+
+def _jour(value: Union[date, datetime, None], defaut: date) -> date:
+    if value is None:
+        return defaut
+    return value.date() if isinstance(value, datetime) else value
+
 
 class ReportService:
     """
     Service de génération de rapports (PDF, Excel)
-    Phase 1 (MVP): Exports basiques
-    Phase 2: Rapports avancés avec graphiques
     """
-    
+
     @staticmethod
-    async def generate_mouvements_report(magasin_id: str, date_debut: datetime, date_fin: datetime, format: str = "pdf"):
-        """
-        Générer un rapport des mouvements de stock
-        TODO: Implémenter en Phase 2 avec ReportLab (PDF) ou openpyxl (Excel)
-        """
-        pass
-    
+    async def aggregate(
+        source: str,
+        magasin_id: str,
+        dimensions: Sequence[str],
+        date_debut: Optional[date] = None,
+        date_fin: Optional[date] = None,
+        periode: Optional[str] = None
+    ) -> List[Dict]:
+        """Agrégats d'une source, servis depuis le cache quand les mêmes paramètres ont déjà été demandés"""
+        cle = f"rapport:{source}:{magasin_id}:{','.join(dimensions)}:{periode}:{date_debut}:{date_fin}"
+        cached = await get_json(cle)
+        if cached is not None:
+            return cached
+
+        params = [magasin_id]
+        if SOURCES[source]["date"]:
+            params.extend([date_debut.isoformat(), date_fin.isoformat()])
+        db = await get_db()
+        rows = await db.query_raw(build_aggregate_sql(source, dimensions, periode), *params)
+
+        close = date_fin is not None and date_fin < utc_today()
+        ttl = settings.REPORT_CACHE_TTL_SECONDS if close else CACHE_PERIODE_OUVERTE_SECONDS
+        await set_json(cle, rows, ttl)
+        return rows
+
     @staticmethod
-    async def generate_valorisation_report(magasin_id: str, format: str = "pdf"):
-        """
-        Générer un rapport de valorisation du stock
-        TODO: Implémenter en Phase 2
-        """
-        pass
-    
+    async def generate_mouvements_report(
+        magasin_id: str,
+        date_debut: datetime = None,
+        date_fin: datetime = None,
+        format: str = "pdf",
+        periode: str = "mois"
+    ) -> bytes:
+        """Entrées / sorties / retours par période et catégorie, puis par article"""
+        debut, fin = ReportService._bornes(date_debut, date_fin)
+        par_categorie = await ReportService.aggregate("mouvements", magasin_id, ["categorie"], debut, fin, periode)
+        par_article = await ReportService.aggregate("mouvements", magasin_id, ["article"], debut, fin)
+
+        return await asyncio.to_thread(ReportService._render, format, "Rapport des mouvements de stock", ReportService._sous_titre(debut, fin), [
+            ("Par période et catégorie", [("Période", "periode"), ("Catégorie", "categorie")] + COLONNES_MOUVEMENTS,
+             par_categorie + [ReportService._total(par_categorie, COLONNES_MOUVEMENTS, "periode")]),
+            ("Par article", [("Code", "code"), ("Désignation", "designation"), ("Catégorie", "categorie")] + COLONNES_MOUVEMENTS,
+             par_article),
+        ])
+
+    @staticmethod
+    async def generate_valorisation_report(magasin_id: str, format: str = "pdf") -> bytes:
+        """Valorisation du stock actuel par catégorie et taux de TVA"""
+        lignes = await ReportService.aggregate("valorisation", magasin_id, ["categorie", "tva_taux"])
+        for ligne in lignes:
+            ligne["tva_taux"] = f"{ligne['tva_taux'] * 100:g}%"
+        total = ReportService._total(lignes, COLONNES_VALORISATION[2:], "categorie")
+
+        return await asyncio.to_thread(ReportService._render, format, "Valorisation du stock", f"Au {date.today():%d/%m/%Y}", [
+            ("Par catégorie et taux de TVA", COLONNES_VALORISATION, lignes + [total]),
+        ])
+
     @staticmethod
-    async def generate_marges_report(magasin_id: str, date_debut: datetime, date_fin: datetime, format: str = "excel"):
+    async def generate_marges_report(
+        magasin_id: str,
+        date_debut: datetime = None,
+        date_fin: datetime = None,
+        format: str = "excel",
+        periode: str = "mois"
+    ) -> bytes:
         """
-        Générer un rapport des marges par produit
-        TODO: Implémenter en Phase 2
+        Marges par période et catégorie, puis par article
+
+        Coût d'achat valorisé au prix d'achat actuel de l'article.
         """
-        pass
-    
+        debut, fin = ReportService._bornes(date_debut, date_fin)
+        par_categorie = await ReportService.aggregate("marges", magasin_id, ["categorie"], debut, fin, periode)
+        par_article = await ReportService.aggregate("marges", magasin_id, ["article"], debut, fin)
+
+        return await asyncio.to_thread(ReportService._render, format, "Rapport des marges", ReportService._sous_titre(debut, fin), [
+            ("Par période et catégorie", [("Période", "periode"), ("Catégorie", "categorie")] + COLONNES_MARGES,
+             par_categorie + [ReportService._total(par_categorie, COLONNES_MARGES, "periode")]),
+            ("Par article", [("Code", "code"), ("Désignation", "designation"), ("Catégorie", "categorie")] + COLONNES_MARGES,
+             sorted(par_article, key=lambda l: l["marge"] or 0, reverse=True)),
+        ])
+
     @staticmethod
     async def export_to_excel(data: List[dict], filename: str):
         """
@@ -41,3 +235,65 @@ class ReportService:
         df = pd.DataFrame(data)
         df.to_excel(filename, index=False)
         return filename
+
+    @staticmethod
+    def _bornes(date_debut, date_fin) -> Tuple[date, date]:
+        """Période par défaut: les 30 derniers jours"""
+        fin = _jour(date_fin, utc_today())
+        return _jour(date_debut, fin - timedelta(days=30)), fin
+
+    @staticmethod
+    def _sous_titre(debut: date, fin: date) -> str:
+        return f"Du {debut:%d/%m/%Y} au {fin:%d/%m/%Y}"
+
+    @staticmethod
+    def _total(lignes: List[Dict], colonnes: List[Tuple[str, str]], libelle: str) -> Dict:
+        """Ligne de total des agrégats (taux de marge recalculé sur les totaux)"""
+        total = {libelle: "TOTAL"}
+        for _, cle in colonnes:
+            if cle != "taux_marge":
+                total[cle] = sum(l.get(cle) or 0 for l in lignes)
+        if "taux_marge" in {cle for _, cle in colonnes}:
+            ca = total.get("chiffre_affaires") or 0
+            total["taux_marge"] = total["marge"] / ca * 100 if ca else None
+        return total
+
+    @staticmethod
+    def _render(format: str, titre: str, sous_titre: str, tableaux: List[Tableau]) -> bytes:
+        """Mettre en forme les tableaux en PDF ou Excel (une feuille par tableau)"""
+        if format == "pdf":
+            document = PdfTableDocument(titre, sous_titre)
+            for nom, colonnes, lignes in tableaux:
+                document.add_table(
+                    nom,
+                    [entete for entete, _ in colonnes],
+                    [[ReportService._valeur(cle, l.get(cle)) for _, cle in colonnes] for l in lignes],
+                    gras=[i for i, l in enumerate(lignes) if "TOTAL" in l.values()]
+                )
+            return document.to_bytes()
+
+        if format not in ("excel", "xlsx"):
+            raise ValueError(f"Format de rapport inconnu: {format}")
+
+        buffer = BytesIO()
+        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+            for nom, colonnes, lignes in tableaux:
+                df = pd.DataFrame(
+                    [[ReportService._valeur(cle, l.get(cle)) for _, cle in colonnes] for l in lignes],
+                    columns=[entete for entete, _ in colonnes]
+                )
+                df.to_excel(writer, index=False, sheet_name=nom[:31], startrow=2)
+                worksheet = writer.sheets[nom[:31]]
+                worksheet["A1"] = f"{titre} - {sous_titre}"
+                for index, largeur in enumerate(column_widths(df), start=1):
+                    worksheet.column_dimensions[get_column_letter(index)].width = largeur
+        return buffer.getvalue()
+
+    @staticmethod
+    def _valeur(cle: str, value):
+        """Arrondi au millime; début de période (texte ISO dans les requêtes brutes) en date"""
+        if isinstance(value, float):
+            return round(value, 3)
+        if cle == "periode" and isinstance(value, str) and value != "TOTAL":
+            return date.fromisoformat(value[:10])
+        return value
@@ -0,0 +1,210 @@
+"""
+Agrégat journalier des ventes (article, magasin, jour → quantité, CA, tickets)
+
+Les prévisions, la détection du stock dormant et la rotation lisent cette
+table plutôt que la table brute `ventes`. Elle est maintenue à l'insertion
+de chaque vente (upsert incrémental) et reconstruite par backfill, magasin
+par magasin et mois par mois (une courte transaction par tranche). Les
+sorties de stock enregistrées par MouvementService sont des ventes: elles
+passent par `create_ventes` dans la transaction du mouvement.
+"""
+from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+from prisma.models import Vente
+from app.core.config import settings
+from app.core.database import prisma
+from app.utils.forecasting import as_date
+from app.utils.helpers import as_utc, get_month_ranges, utc_today
+import logging
+
+logger = logging.getLogger(__name__)
+
+UPSERT_SQL = """
+    INSERT INTO ventes_journalieres
+        (id, article_id, magasin_id, jour, quantite, chiffre_affaires, nb_tickets, updated_at)
+    VALUES {values}
+    ON CONFLICT (article_id, magasin_id, jour) DO UPDATE SET
+        quantite = ventes_journalieres.quantite + EXCLUDED.quantite,
+        chiffre_affaires = ventes_journalieres.chiffre_affaires + EXCLUDED.chiffre_affaires,
+        nb_tickets = ventes_journalieres.nb_tickets + EXCLUDED.nb_tickets,
+        updated_at = NOW()
+"""
+
+BACKFILL_DELETE_SQL = """
+    DELETE FROM ventes_journalieres
+    WHERE magasin_id = $1 AND jour >= $2::date AND jour < $3::date
+"""
+
+BACKFILL_INSERT_SQL = """
+    INSERT INTO ventes_journalieres
+        (id, article_id, magasin_id, jour, quantite, chiffre_affaires, nb_tickets, updated_at)
+    SELECT gen_random_uuid()::text, article_id, magasin_id, date_vente::date,
+           SUM(quantite), SUM(montant_total), COUNT(*), NOW()
+    FROM ventes
+    WHERE magasin_id = $1 AND date_vente >= $2::date AND date_vente < $3::date
+    GROUP BY article_id, magasin_id, date_vente::date
+    ON CONFLICT (article_id, magasin_id, jour) DO UPDATE SET
+        quantite = EXCLUDED.quantite,
+        chiffre_affaires = EXCLUDED.chiffre_affaires,
+        nb_tickets = EXCLUDED.nb_tickets,
+        updated_at = NOW()
+"""
+
+PREMIERE_VENTE_SQL = """
+    SELECT MIN(date_vente)::date AS jour FROM ventes WHERE magasin_id = $1
+"""
+
+VENTES_PERIODE_SQL = """
+    SELECT vj.article_id, SUM(vj.quantite)::int AS quantite, SUM(vj.chiffre_affaires) AS chiffre_affaires
+    FROM ventes_journalieres vj
+    WHERE vj.magasin_id = $1 AND vj.jour >= $2::date
+    GROUP BY vj.article_id
+"""
+
+
+class SalesAggregateService:
+
+    @staticmethod
+    async def create_vente(
+        article_id: str,
+        magasin_id: str,
+        quantite: int,
+        prix_unitaire: float,
+        date_vente: Optional[datetime] = None
+    ) -> Vente:
+        """Enregistrer une vente et mettre à jour l'agrégat dans la même transaction"""
+        date_vente = date_vente or datetime.now(timezone.utc)
+        montant_total = round(quantite * prix_unitaire, 3)
+
+        async with prisma.tx() as tx:
+            vente = await tx.vente.create(
+                data=SalesAggregateService._vente_data(article_id, magasin_id, quantite, prix_unitaire, date_vente)
+            )
+            await SalesAggregateService.record_ventes([{
+                "article_id": article_id,
+                "magasin_id": magasin_id,
+                "date_vente": date_vente,
+                "quantite": quantite,
+                "montant_total": montant_total
+            }], client=tx)
+
+        return vente
+
+    @staticmethod
+    async def create_ventes(ventes: List[Dict], client=None) -> int:
+        """
+        Enregistrer un lot de ventes (table brute + agrégat), à appeler dans la transaction en cours
+
+        Args:
+            ventes: dicts {article_id, magasin_id, quantite, prix_unitaire, date_vente}
+
+        Returns:
+            Nombre de ventes insérées
+        """
+        client = client or prisma
+        if not ventes:
+            return 0
+
+        lignes = [
+            SalesAggregateService._vente_data(
+                v["article_id"], v["magasin_id"], v["quantite"], v["prix_unitaire"], v["date_vente"]
+            )
+            for v in ventes
+        ]
+        await client.vente.create_many(data=lignes)
+        await SalesAggregateService.record_ventes(lignes, client=client)
+        return len(lignes)
+
+    @staticmethod
+    def _vente_data(article_id: str, magasin_id: str, quantite: int, prix_unitaire: float, date_vente: datetime) -> Dict:
+        return {
+            "article_id": article_id,
+            "magasin_id": magasin_id,
+            "quantite": quantite,
+            "prix_unitaire": prix_unitaire,
+            "montant_total": round(quantite * prix_unitaire, 3),
+            "date_vente": date_vente,
+            "jour_semaine": date_vente.weekday(),
+            "semaine_annee": date_vente.isocalendar()[1]
+        }
+
+    @staticmethod
+    async def record_ventes(ventes: List[Dict], client=None) -> int:
+        """
+        Ajouter des ventes à l'agrégat (une seule requête, quel que soit le nombre de ventes)
+
+        Args:
+            ventes: dicts {article_id, magasin_id, date_vente, quantite, montant_total}
+            client: transaction en cours, sinon le client global
+
+        Returns:
+            Nombre de lignes (article, jour) touchées
+        """
+        client = client or prisma
+
+        # Pré-agrégation par clé pour ne pas toucher deux fois la même ligne dans l'INSERT
+        cumuls: Dict[tuple, List] = {}
+        for vente in ventes:
+            # Jour UTC, comme date_vente::date du backfill sur la colonne stockée en UTC
+            cle = (vente["article_id"], vente["magasin_id"], as_utc(vente["date_vente"]).date().isoformat())
+            cumul = cumuls.setdefault(cle, [0, 0.0, 0])
+            cumul[0] += vente["quantite"]
+            cumul[1] += vente["montant_total"]
+            cumul[2] += 1
+
+        if not cumuls:
+            return 0
+
+        values = []
+        params = []
+        for (article_id, magasin_id, jour), (quantite, montant, tickets) in cumuls.items():
+            n = len(params)
+            values.append(
+                f"(gen_random_uuid()::text, ${n + 1}, ${n + 2}, ${n + 3}::date, "
+                f"${n + 4}::int, ${n + 5}::float8, ${n + 6}::int, NOW())"
+            )
+            params.extend([article_id, magasin_id, jour, quantite, montant, tickets])
+
+        return await client.execute_raw(UPSERT_SQL.format(values=", ".join(values)), *params)
+
+    @staticmethod
+    async def backfill(magasin_id: Optional[str] = None, date_debut: Optional[date] = None) -> int:
+        """
+        Reconstruire l'agrégat depuis la table brute `ventes`
+
+        Args:
+            magasin_id: limiter à un magasin (défaut: tous)
+            date_debut: premier jour reconstruit (défaut: tout l'historique)
+
+        Returns:
+            Nombre de lignes agrégées écrites
+        """
+        if magasin_id:
+            magasin_ids = [magasin_id]
+        else:
+            magasin_ids = [m.id for m in await prisma.magasin.find_many()]
+
+        lignes = 0
+        for magasin in magasin_ids:
+            debut = date_debut
+            if debut is None:
+                premiere = await prisma.query_raw(PREMIERE_VENTE_SQL, magasin)
+                debut = as_date(premiere[0]["jour"]) if premiere and premiere[0]["jour"] else None
+            if debut is None:
+                continue
+            # Un mois par transaction: chacune reste loin du délai des transactions interactives
+            for mois, mois_suivant in get_month_ranges(debut, utc_today()):
+                params = [magasin, mois.isoformat(), mois_suivant.isoformat()]
+                async with prisma.tx(timeout=timedelta(seconds=settings.BACKFILL_TX_TIMEOUT_SECONDS)) as tx:
+                    await tx.execute_raw(BACKFILL_DELETE_SQL, *params)
+                    lignes += await tx.execute_raw(BACKFILL_INSERT_SQL, *params)
+
+        logger.info(f"Daily sales aggregate backfilled from {date_debut or 'first sale'} ({magasin_id or 'all magasins'}): {lignes} rows")
+        return lignes
+
+    @staticmethod
+    async def get_ventes_periode(magasin_id: str, jours: int) -> Dict[str, Dict]:
+        """Quantités et CA vendus par article sur les `jours` derniers jours"""
+        date_debut = (utc_today() - timedelta(days=jours)).isoformat()
+        rows = await prisma.query_raw(VENTES_PERIODE_SQL, magasin_id, date_debut)
+        return {row["article_id"]: row for row in rows}
@@ -0,0 +1,90 @@
+"""
+Numérotation des documents (bons de commande, transferts)
+
+Un compteur par (entreprise, type de document, année), incrémenté par un seul
+UPDATE ... RETURNING (INSERT ... ON CONFLICT à la première référence de
+l'année): la ligne du compteur est le seul point de contention, et seulement
+entre documents du même type de la même entreprise. Appelé dans la transaction
+qui crée le document, un rollback annule aussi l'incrément: la numérotation
+reste sans trou.
+"""
+from typing import List, Optional
+from datetime import datetime
+from app.core.database import prisma
+from app.utils.helpers import PREFIXES_DOCUMENTS as PREFIXES, format_reference
+
+INCREMENT_SQL = """
+    UPDATE sequences_documents
+    SET dernier_numero = dernier_numero + $4::int, updated_at = NOW()
+    WHERE entreprise_id = $1 AND type_document = $2 AND annee = $3::int
+    RETURNING dernier_numero
+"""
+
+# Première référence de l'année: le compteur part du plus grand numéro déjà attribué
+# (références créées avant l'introduction des compteurs)
+CREATE_SQL = """
+    INSERT INTO sequences_documents (id, entreprise_id, type_document, annee, dernier_numero, updated_at)
+    VALUES (gen_random_uuid()::text, $1, $2, $3::int, ({amorce}) + $4::int, NOW())
+    ON CONFLICT (entreprise_id, type_document, annee) DO UPDATE SET
+        dernier_numero = sequences_documents.dernier_numero + $4::int,
+        updated_at = NOW()
+    RETURNING dernier_numero
+"""
+
+AMORCES = {
+    "BON_COMMANDE": """
+        SELECT COALESCE(MAX(substring(reference from '-(\\d+)$')::int), 0)
+        FROM bons_commande
+        WHERE entreprise_id = $1 AND reference LIKE $5
+    """,
+    "TRANSFERT": """
+        SELECT COALESCE(MAX(substring(t.reference from '-(\\d+)$')::int), 0)
+        FROM transferts_stock t
+        JOIN magasins m ON m.id = t.magasin_origine_id
+        WHERE m.entreprise_id = $1 AND t.reference LIKE $5
+    """,
+}
+
+
+class SequenceService:
+
+    @staticmethod
+    async def allocate(
+        entreprise_id: str,
+        type_document: str,
+        nombre: int = 1,
+        client=None,
+        annee: Optional[int] = None
+    ) -> List[str]:
+        """
+        Réserver `nombre` références consécutives (pré-allocation par bloc pour les imports)
+
+        Args:
+            type_document: clé de PREFIXES
+            client: transaction du document à créer (recommandé), sinon le client global
+
+        Returns:
+            Les références, dans l'ordre
+        """
+        if type_document not in PREFIXES:
+            raise ValueError(f"Type de document inconnu: {type_document}")
+        if nombre < 1:
+            return []
+
+        client = client or prisma
+        annee = annee or datetime.now().year
+        rows = await client.query_raw(INCREMENT_SQL, entreprise_id, type_document, annee, nombre)
+        if not rows:
+            motif = f"{PREFIXES[type_document]}-{annee}-%"
+            rows = await client.query_raw(
+                CREATE_SQL.format(amorce=AMORCES[type_document]),
+                entreprise_id, type_document, annee, nombre, motif
+            )
+        dernier = rows[0]["dernier_numero"]
+        return [format_reference(type_document, annee, numero) for numero in range(dernier - nombre + 1, dernier + 1)]
+
+    @staticmethod
+    async def next_reference(entreprise_id: str, type_document: str, client=None) -> str:
+        """Réserver la prochaine référence"""
+        references = await SequenceService.allocate(entreprise_id, type_document, 1, client=client)
+        return references[0]
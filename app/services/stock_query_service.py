@@ -0,0 +1,62 @@
+"""
+Agrégats et filtres sur le stock des articles, calculés par PostgreSQL
+
+Les sommes (SUM(stock_actuel * prix_achat)) et le filtre stock faible
+(stock_actuel <= stock_min, comparaison entre deux colonnes que les filtres
+Prisma ne savent pas exprimer) sont faits en SQL: seuls les totaux et les
+articles concernés quittent la base, jamais le catalogue complet.
+
+Index partiels correspondants: prisma/sql/articles_stock_index.sql.
+"""
+from typing import Dict, List, Optional
+from prisma.models import Article
+from app.core.database import prisma
+
+# Index partiel articles_actifs_stock_idx (index-only scan)
+RESUME_SQL = """
+    SELECT COUNT(*)::int AS total_articles,
+           COALESCE(SUM(stock_actuel * prix_achat), 0)::float8 AS valeur_achat,
+           COALESCE(SUM(stock_actuel * prix_vente), 0)::float8 AS valeur_vente,
+           COUNT(*) FILTER (WHERE stock_actuel <= stock_min)::int AS faibles,
+           COUNT(*) FILTER (WHERE stock_actuel = 0)::int AS ruptures
+    FROM articles
+    WHERE magasin_id = $1 AND is_active = true
+"""
+
+# Index partiel articles_faibles_idx: mêmes prédicat et ordre, LIMIT sans tri
+# (LIMIT NULL = pas de limite)
+FAIBLES_SQL = """
+    SELECT {colonnes}
+    FROM articles
+    WHERE magasin_id = $1 AND is_active = true AND stock_actuel <= stock_min
+    ORDER BY stock_actuel - stock_min, code
+    LIMIT $2::int
+"""
+
+COLONNES_FAIBLES = "id, code, designation, stock_actuel, stock_min"
+
+
+class StockQueryService:
+
+    @staticmethod
+    async def resume(magasin_id: str, client=None) -> Dict:
+        """
+        Totaux du stock actif d'un magasin
+
+        Returns:
+            Dict {total_articles, valeur_achat, valeur_vente, faibles, ruptures}
+        """
+        client = client or prisma
+        return (await client.query_raw(RESUME_SQL, magasin_id))[0]
+
+    @staticmethod
+    async def articles_faibles(magasin_id: str, limit: Optional[int] = None, client=None) -> List[Article]:
+        """Articles actifs avec stock_actuel <= stock_min, les plus en déficit d'abord"""
+        client = client or prisma
+        return await client.query_raw(FAIBLES_SQL.format(colonnes="*"), magasin_id, limit, model=Article)
+
+    @staticmethod
+    async def faibles_resume(magasin_id: str, limit: int, client=None) -> List[Dict]:
+        """Comme articles_faibles, réduit aux colonnes affichées (id, code, désignation, stocks)"""
+        client = client or prisma
+        return await client.query_raw(FAIBLES_SQL.format(colonnes=COLONNES_FAIBLES), magasin_id, limit)
@@ -0,0 +1,134 @@
+"""
+Mutations atomiques du stock des articles
+
+Chaque mutation est une seule requête SQL qui verrouille la ligne de l'article,
+applique le changement et renvoie le stock avant/après. À appeler avec la
+transaction en cours (`client=tx`) pour rester atomique avec l'écriture du
+mouvement qui la justifie.
+"""
+from typing import Dict, Optional
+from app.core.database import prisma
+
+# `avant` lit la ligne verrouillée: stock_avant est exact même sous concurrence.
+# FOR NO KEY UPDATE n'entre pas en conflit avec les verrous de clé étrangère (KEY SHARE)
+# que l'insertion d'un mouvement pose sur l'article: FOR UPDATE provoquerait des
+# interblocages entre transactions concurrentes ayant chacune inséré leur mouvement.
+APPLY_DELTA_SQL = """
+    UPDATE articles a
+    SET stock_actuel = GREATEST(avant.stock_actuel + $2::int, 0), updated_at = NOW()
+    FROM (SELECT id, stock_actuel FROM articles WHERE id = $1 FOR NO KEY UPDATE) avant
+    WHERE a.id = avant.id {condition}
+    RETURNING avant.stock_actuel AS stock_avant, a.stock_actuel AS stock_apres
+"""
+
+SET_STOCK_SQL = """
+    UPDATE articles a
+    SET stock_actuel = $2::int, updated_at = NOW()
+    FROM (SELECT id, stock_actuel FROM articles WHERE id = $1 FOR NO KEY UPDATE) avant
+    WHERE a.id = avant.id
+    RETURNING avant.stock_actuel AS stock_avant, a.stock_actuel AS stock_apres
+"""
+
+# Verrouillage dans l'ordre des ids: deux lots concurrents ne peuvent pas s'interbloquer
+LOCK_ARTICLES_SQL = """
+    SELECT id, stock_actuel FROM articles WHERE id IN ({placeholders}) ORDER BY id FOR NO KEY UPDATE
+"""
+
+APPLY_DELTAS_SQL = """
+    UPDATE articles a
+    SET stock_actuel = GREATEST(a.stock_actuel + d.delta, 0), updated_at = NOW()
+    FROM (VALUES {values}) AS d(id, delta)
+    WHERE a.id = d.id
+    RETURNING a.id AS article_id, a.stock_actuel AS stock_apres
+"""
+
+# Effet des types de mouvement sur le stock (ajustement = quantité absolue)
+SIGNES = {"entree": 1, "retour": 1, "sortie": -1}
+
+
+class StockInsuffisantError(ValueError):
+    """Sortie refusée: le stock deviendrait négatif"""
+
+
+class StockService:
+
+    @staticmethod
+    async def apply_delta(article_id: str, delta: int, client=None, strict: bool = False) -> Optional[Dict]:
+        """
+        Ajouter `delta` (positif ou négatif) au stock d'un article
+
+        Args:
+            client: transaction en cours, sinon le client global
+            strict: refuser la mutation si le stock deviendrait négatif
+                (sinon il est ramené à 0)
+
+        Returns:
+            {article_id, stock_avant, stock_apres}, None si l'article n'existe pas
+
+        Raises:
+            StockInsuffisantError: en mode strict, stock insuffisant
+        """
+        client = client or prisma
+        condition = "AND avant.stock_actuel + $2::int >= 0" if strict else ""
+        rows = await client.query_raw(APPLY_DELTA_SQL.format(condition=condition), article_id, delta)
+
+        if not rows:
+            if strict and await client.article.find_unique(where={"id": article_id}):
+                raise StockInsuffisantError(f"Stock insuffisant pour l'article {article_id}")
+            return None
+        return {"article_id": article_id, **rows[0]}
+
+    @staticmethod
+    async def apply_deltas(deltas: Dict[str, int], client=None, strict: bool = False, details: bool = False) -> Dict:
+        """
+        Appliquer des deltas nets à plusieurs articles en une mise à jour
+
+        Le plancher à 0 s'applique au delta net de chaque article.
+
+        Args:
+            strict: refuser l'ensemble si un stock deviendrait négatif
+            details: renvoyer aussi le stock avant (lu sous verrou)
+
+        Returns:
+            {article_id: stock_apres} des articles mis à jour,
+            {article_id: [stock_avant, stock_apres]} avec `details`
+
+        Raises:
+            StockInsuffisantError: en mode strict, au moins un stock insuffisant
+        """
+        client = client or prisma
+        deltas = {article_id: delta for article_id, delta in deltas.items() if delta}
+        if not deltas:
+            return {}
+
+        ids = sorted(deltas)
+        placeholders = ", ".join(f"${i + 1}" for i in range(len(ids)))
+        verrous = await client.query_raw(LOCK_ARTICLES_SQL.format(placeholders=placeholders), *ids)
+
+        if strict:
+            insuffisants = [row["id"] for row in verrous if row["stock_actuel"] + deltas[row["id"]] < 0]
+            if insuffisants:
+                raise StockInsuffisantError(f"Stock insuffisant pour {len(insuffisants)} article(s): {', '.join(insuffisants)}")
+
+        values = ", ".join(f"(${2 * i + 1}::text, ${2 * i + 2}::int)" for i in range(len(ids)))
+        params = [v for article_id in ids for v in (article_id, deltas[article_id])]
+        rows = await client.query_raw(APPLY_DELTAS_SQL.format(values=values), *params)
+        if details:
+            avant = {row["id"]: row["stock_actuel"] for row in verrous}
+            return {row["article_id"]: [avant[row["article_id"]], row["stock_apres"]] for row in rows}
+        return {row["article_id"]: row["stock_apres"] for row in rows}
+
+    @staticmethod
+    async def set_stock(article_id: str, quantite: int, client=None) -> Optional[Dict]:
+        """Fixer le stock à une valeur absolue (ajustement, inventaire)"""
+        client = client or prisma
+        rows = await client.query_raw(SET_STOCK_SQL, article_id, quantite)
+        return {"article_id": article_id, **rows[0]} if rows else None
+
+    @staticmethod
+    async def apply_mouvement(article_id: str, type_mouvement: str, quantite: int, client=None) -> Optional[Dict]:
+        """Appliquer l'effet d'un mouvement (entree, sortie, retour, ajustement) sur le stock"""
+        type_mouvement = type_mouvement.lower()
+        if type_mouvement == "ajustement":
+            return await StockService.set_stock(article_id, quantite, client)
+        return await StockService.apply_delta(article_id, SIGNES.get(type_mouvement, 1) * quantite, client)
@@ -0,0 +1,213 @@
+"""
+Transferts de stock entre magasins (documents multi-lignes)
+
+Confirmation et réception sont chacune une transaction: changement de statut
+conditionnel, mise à jour groupée des stocks (StockService.apply_deltas) et
+mouvements TRANSFERT écrits en un create_many.
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from prisma.models import TransfertStock
+from app.core.database import prisma
+from app.core.events import publish, STOCK_CHANGED, CATALOGUE_CHANGED
+from app.schemas.transfert import TransfertCreate
+from app.services.sequence_service import SequenceService
+from app.services.stock_service import StockService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Champs recopiés quand l'article n'existe pas encore dans le magasin de destination
+CHAMPS_ARTICLE_COPIES = (
+    "code", "designation", "description", "unite", "categorie", "prix_achat", "prix_vente",
+    "tva_taux", "stock_min", "stock_max", "stock_securite", "date_peremption", "image_url"
+)
+
+LIGNES_RECUES_SQL = """
+    UPDATE lignes_transfert l
+    SET quantite_recue = l.quantite, article_destination_id = d.article_destination_id
+    FROM (VALUES {values}) AS d(article_id, article_destination_id)
+    WHERE l.transfert_id = $1 AND l.article_id = d.article_id
+"""
+
+
+class TransfertService:
+
+    @staticmethod
+    async def create_transfert(data: TransfertCreate) -> TransfertStock:
+        """Créer un transfert EN_ATTENTE; les articles doivent appartenir au magasin d'origine"""
+        magasins = await prisma.magasin.find_many(
+            where={"id": {"in": [data.magasin_origine_id, data.magasin_destination_id]}}
+        )
+        entreprises = {m.id: m.entreprise_id for m in magasins}
+        if len(entreprises) != 2 or len(set(entreprises.values())) != 1:
+            raise ValueError("Les deux magasins doivent exister et appartenir à la même entreprise")
+
+        article_ids = [ligne.article_id for ligne in data.lignes]
+        trouves = await prisma.article.count(
+            where={"id": {"in": article_ids}, "magasin_id": data.magasin_origine_id}
+        )
+        if trouves != len(article_ids):
+            raise ValueError(f"{len(article_ids) - trouves} article(s) absent(s) du magasin d'origine")
+
+        entreprise_id = entreprises[data.magasin_origine_id]
+        async with prisma.tx() as tx:
+            reference = await SequenceService.next_reference(entreprise_id, "TRANSFERT", client=tx)
+            return await tx.transfertstock.create(
+                data={
+                    "reference": reference,
+                    "entreprise_id": entreprise_id,
+                    "magasin_origine_id": data.magasin_origine_id,
+                    "magasin_destination_id": data.magasin_destination_id,
+                    "quantite": sum(ligne.quantite for ligne in data.lignes),
+                    "notes": data.notes,
+                    "statut": "EN_ATTENTE",
+                    "lignes": {
+                        "create": [
+                            {"article_id": ligne.article_id, "quantite": ligne.quantite}
+                            for ligne in data.lignes
+                        ]
+                    }
+                },
+                include={"lignes": True}
+            )
+
+    @staticmethod
+    async def confirmer(transfert_id: str) -> Optional[TransfertStock]:
+        """
+        Expédier: sortie de stock au magasin d'origine (refusée si stock insuffisant)
+
+        Returns:
+            Le transfert EN_COURS, None si introuvable
+
+        Raises:
+            ValueError: transfert pas EN_ATTENTE, StockInsuffisantError
+        """
+        async with prisma.tx() as tx:
+            transfert = await tx.transfertstock.find_unique(where={"id": transfert_id}, include={"lignes": True})
+            if not transfert:
+                return None
+            await TransfertService._changer_statut(tx, transfert, "EN_ATTENTE", "EN_COURS", "date_transfert")
+
+            lignes = TransfertService._lignes(transfert)
+            stocks = await StockService.apply_deltas(
+                {ligne["article_id"]: -ligne["quantite"] for ligne in lignes}, client=tx, strict=True, details=True
+            )
+            await tx.mouvementstock.create_many(data=[
+                TransfertService._mouvement(
+                    transfert, ligne["article_id"], transfert.magasin_origine_id, ligne["quantite"], "sortant"
+                )
+                for ligne in lignes
+            ])
+            transfert = await tx.transfertstock.find_unique(where={"id": transfert_id}, include={"lignes": True})
+
+        publish(STOCK_CHANGED, {
+            "magasin_id": transfert.magasin_origine_id,
+            "article_ids": [ligne["article_id"] for ligne in lignes],
+            "stocks": stocks,
+            "source": "transfert"
+        })
+        logger.info(f"Transfer {transfert.reference} shipped: {len(lignes)} lines")
+        return transfert
+
+    @staticmethod
+    async def recevoir(transfert_id: str) -> Optional[TransfertStock]:
+        """
+        Réceptionner: entrée de stock au magasin de destination
+
+        Chaque ligne est rapprochée de l'article de même code dans le magasin de
+        destination; les articles absents y sont créés (stock 0) avant l'entrée.
+
+        Returns:
+            Le transfert RECU, None si introuvable
+
+        Raises:
+            ValueError: transfert pas EN_COURS
+        """
+        async with prisma.tx() as tx:
+            transfert = await tx.transfertstock.find_unique(where={"id": transfert_id}, include={"lignes": True})
+            if not transfert:
+                return None
+            await TransfertService._changer_statut(tx, transfert, "EN_COURS", "RECU", "date_reception")
+
+            lignes = TransfertService._lignes(transfert)
+            destinations, crees = await TransfertService._articles_destination(
+                tx, [ligne["article_id"] for ligne in lignes], transfert.magasin_destination_id
+            )
+
+            stocks = await StockService.apply_deltas(
+                {destinations[ligne["article_id"]]: ligne["quantite"] for ligne in lignes}, client=tx, details=True
+            )
+            await tx.mouvementstock.create_many(data=[
+                TransfertService._mouvement(
+                    transfert, destinations[ligne["article_id"]], transfert.magasin_destination_id,
+                    ligne["quantite"], "entrant"
+                )
+                for ligne in lignes
+            ])
+            if transfert.lignes:
+                values = ", ".join(f"(${2 * i + 2}, ${2 * i + 3})" for i in range(len(transfert.lignes)))
+                params = [v for l in transfert.lignes for v in (l.article_id, destinations[l.article_id])]
+                await tx.execute_raw(LIGNES_RECUES_SQL.format(values=values), transfert.id, *params)
+            transfert = await tx.transfertstock.find_unique(where={"id": transfert_id}, include={"lignes": True})
+
+        if crees:
+            publish(CATALOGUE_CHANGED, {"magasin_id": transfert.magasin_destination_id, "source": "transfert"})
+        publish(STOCK_CHANGED, {
+            "magasin_id": transfert.magasin_destination_id,
+            "article_ids": sorted(set(destinations.values())),
+            "stocks": stocks,
+            "source": "transfert"
+        })
+        logger.info(f"Transfer {transfert.reference} received: {len(lignes)} lines")
+        return transfert
+
+    @staticmethod
+    async def _changer_statut(tx, transfert: TransfertStock, attendu: str, nouveau: str, champ_date: str):
+        # Mise à jour conditionnelle: deux confirmations concurrentes ne peuvent pas passer toutes les deux
+        modifies = await tx.transfertstock.update_many(
+            where={"id": transfert.id, "statut": attendu},
+            data={"statut": nouveau, champ_date: datetime.now()}
+        )
+        if modifies == 0:
+            raise ValueError(f"Transfert {transfert.reference} au statut {transfert.statut}, {attendu} attendu")
+
+    @staticmethod
+    def _lignes(transfert: TransfertStock) -> List[Dict]:
+        """Lignes du transfert (transfert mono-article historique = une ligne)"""
+        if transfert.lignes:
+            return [{"article_id": l.article_id, "quantite": l.quantite} for l in transfert.lignes]
+        return [{"article_id": transfert.article_id, "quantite": transfert.quantite}]
+
+    @staticmethod
+    async def _articles_destination(tx, article_ids: List[str], magasin_id: str) -> Tuple[Dict[str, str], int]:
+        """({article d'origine: article de destination}, nombre d'articles créés)"""
+        origines = await tx.article.find_many(where={"id": {"in": article_ids}})
+        codes = {a.code: a for a in origines}
+
+        existants = await tx.article.find_many(where={"magasin_id": magasin_id, "code": {"in": list(codes)}})
+        manquants = [a for code, a in codes.items() if code not in {e.code for e in existants}]
+        if manquants:
+            await tx.article.create_many(data=[
+                {
+                    **{champ: getattr(a, champ) for champ in CHAMPS_ARTICLE_COPIES if getattr(a, champ) is not None},
+                    "stock_actuel": 0,
+                    "magasin_id": magasin_id
+                }
+                for a in manquants
+            ])
+            existants = await tx.article.find_many(where={"magasin_id": magasin_id, "code": {"in": list(codes)}})
+
+        par_code = {a.code: a.id for a in existants}
+        return {a.id: par_code[a.code] for a in origines}, len(manquants)
+
+    @staticmethod
+    def _mouvement(transfert: TransfertStock, article_id: str, magasin_id: str, quantite: int, sens: str) -> Dict:
+        return {
+            "type": "TRANSFERT",
+            "quantite": quantite,
+            "motif": f"Transfert {sens} {transfert.reference}",
+            "reference_doc": transfert.reference,
+            "article_id": article_id,
+            "magasin_id": magasin_id
+        }
@@ -0,0 +1,154 @@
+"""
+Règles de classification des alertes de stock (RUPTURE / SEUIL_BAS / PEREMPTION)
+
+Les fonctions travaillent sur des projections de colonnes (dicts) et non sur
+des modèles Prisma complets, pour pouvoir classer un magasin entier en une passe.
+"""
+from typing import Dict, List, Optional, Set
+from uuid import uuid4
+
+JOURS_ALERTE_PEREMPTION = 30
+JOURS_PEREMPTION_ELEVE = 7
+
+
+def classify_article(article: Dict) -> List[Dict]:
+    """
+    Classer un article en alertes
+
+    Args:
+        article: projection avec id, designation, stock_actuel, stock_min
+            et jours_peremption (jours restants, None si pas de date)
+
+    Returns:
+        Liste de dicts {type, niveau, message}
+    """
+    alertes = []
+    stock_actuel = article["stock_actuel"]
+    stock_min = article["stock_min"]
+    designation = article["designation"]
+
+    if stock_actuel <= 0:
+        alertes.append({
+            "type": "RUPTURE",
+            "niveau": "CRITIQUE",
+            "message": f"Rupture de stock: {designation}"
+        })
+    elif stock_actuel <= stock_min:
+        alertes.append({
+            "type": "SEUIL_BAS",
+            "niveau": "ELEVE",
+            "message": f"Stock faible: {designation} ({stock_actuel}/{stock_min})"
+        })
+
+    jours_restants = article.get("jours_peremption")
+    if jours_restants is not None and 0 < jours_restants <= JOURS_ALERTE_PEREMPTION:
+        alertes.append({
+            "type": "PEREMPTION",
+            "niveau": "MOYEN" if jours_restants > JOURS_PEREMPTION_ELEVE else "ELEVE",
+            "message": f"Péremption proche: {designation} (dans {jours_restants} jours)"
+        })
+
+    return alertes
+
+
+def classify_articles(articles: List[Dict], magasin_id: str) -> Dict:
+    """
+    Classer un ensemble d'articles en une seule passe
+
+    Les identifiants sont générés côté client pour pouvoir suivre l'état des
+    alertes sans relire la table après un create_many.
+
+    Returns:
+        Dict avec les lignes Alerte prêtes pour create_many et les compteurs par type
+    """
+    lignes = []
+    compteurs = {"RUPTURE": 0, "SEUIL_BAS": 0, "PEREMPTION": 0}
+
+    for article in articles:
+        for alerte in classify_article(article):
+            compteurs[alerte["type"]] += 1
+            lignes.append({
+                "id": str(uuid4()),
+                "article_id": article["id"],
+                "magasin_id": magasin_id,
+                "type": alerte["type"],
+                "niveau": alerte["niveau"],
+                "message": alerte["message"],
+                "est_vue": False,
+                "est_resolue": False
+            })
+
+    return {"alertes": lignes, "compteurs": compteurs}
+
+
+# ============================================
+# ÉTAT DES ALERTES (déduplication)
+# ============================================
+
+NIVEAUX = ["FAIBLE", "MOYEN", "ELEVE", "CRITIQUE"]
+TYPES_SUIVIS = ["RUPTURE", "SEUIL_BAS", "PEREMPTION"]
+
+
+def alert_key(article_id: str, type_alerte: str) -> str:
+    """Clé d'état d'une alerte: (article, type) au sein d'un magasin"""
+    return f"{article_id}:{type_alerte}"
+
+
+def diff_alert_states(
+    etat: Dict[str, List],
+    alertes_courantes: List[Dict],
+    perimetre: Optional[Set[str]] = None
+) -> Dict:
+    """
+    Comparer l'état connu des alertes ouvertes avec la classification courante
+
+    Args:
+        etat: {cle: [alerte_id, niveau]} des alertes ouvertes du magasin
+        alertes_courantes: lignes produites par classify_articles (avec "id")
+        perimetre: articles réévalués; None = magasin entier (les clés hors
+            périmètre sont conservées telles quelles)
+
+    Returns:
+        Dict avec a_creer, a_escalader, a_resoudre et le nouvel etat
+    """
+    nouvel_etat = {}
+    a_creer = []
+    a_escalader = []
+    vues = set()
+
+    for alerte in alertes_courantes:
+        cle = alert_key(alerte["article_id"], alerte["type"])
+        vues.add(cle)
+        existante = etat.get(cle)
+
+        if existante is None:
+            a_creer.append(alerte)
+            nouvel_etat[cle] = [alerte["id"], alerte["niveau"]]
+            continue
+
+        alerte_id, niveau = existante
+        if NIVEAUX.index(alerte["niveau"]) > NIVEAUX.index(niveau):
+            a_escalader.append({
+                "id": alerte_id,
+                "niveau": alerte["niveau"],
+                "message": alerte["message"]
+            })
+            niveau = alerte["niveau"]
+        nouvel_etat[cle] = [alerte_id, niveau]
+
+    a_resoudre = []
+    for cle, (alerte_id, niveau) in etat.items():
+        if cle in vues:
+            continue
+        article_id = cle.split(":", 1)[0]
+        if perimetre is not None and article_id not in perimetre:
+            nouvel_etat[cle] = [alerte_id, niveau]
+        else:
+            a_resoudre.append(alerte_id)
+
+    return {
+        "a_creer": a_creer,
+        "a_escalader": a_escalader,
+        "a_resoudre": a_resoudre,
+        "etat": nouvel_etat
+    }
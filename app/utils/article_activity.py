@@ -0,0 +1,50 @@
+"""
+Activité dénormalisée des articles (dernière entrée, dernière sortie, ventes glissantes)
+
+Chaque mouvement ENTREE ou SORTIE met à jour ces colonnes dans sa transaction;
+les compteurs glissants ne font qu'augmenter entre deux réconciliations, qui
+les recalculent depuis les mouvements pour retirer les sorties devenues
+trop anciennes. Toutes les dates sont en UTC, comme les colonnes DateTime
+de Prisma: une date naïve est lue comme UTC.
+"""
+from typing import Dict, Iterable
+from datetime import datetime, timedelta
+from app.utils.helpers import as_utc
+
+# Compteur → fenêtre en jours
+FENETRES_VENTES = {"sold_7d": 7, "sold_28d": 28}
+
+
+def activity_deltas(mouvements: Iterable[Dict], maintenant: datetime) -> Dict[str, Dict]:
+    """
+    Effet d'un lot de mouvements sur l'activité de chaque article
+
+    Args:
+        mouvements: dicts {article_id, type, quantite, date_mouvement}, type en
+            minuscules ou majuscules; seuls ENTREE et SORTIE comptent
+        maintenant: référence des fenêtres glissantes
+
+    Returns:
+        {article_id: {last_entree_at, last_sortie_at, sold_7d, sold_28d}}
+        (dates UTC, None si le lot n'en contient pas; compteurs à ajouter)
+    """
+    maintenant = as_utc(maintenant)
+    limites = {cle: maintenant - timedelta(days=jours) for cle, jours in FENETRES_VENTES.items()}
+    activite: Dict[str, Dict] = {}
+    for m in mouvements:
+        type_mouvement = m["type"].upper()
+        if type_mouvement not in ("ENTREE", "SORTIE"):
+            continue
+        article = activite.setdefault(
+            m["article_id"],
+            {"last_entree_at": None, "last_sortie_at": None, **{cle: 0 for cle in FENETRES_VENTES}}
+        )
+        date_mouvement = as_utc(m["date_mouvement"])
+        champ = "last_entree_at" if type_mouvement == "ENTREE" else "last_sortie_at"
+        if article[champ] is None or date_mouvement > article[champ]:
+            article[champ] = date_mouvement
+        if type_mouvement == "SORTIE":
+            for cle, limite in limites.items():
+                if date_mouvement >= limite:
+                    article[cle] += m["quantite"]
+    return activite
@@ -1,7 +1,12 @@
 """
 Utilitaires de calcul pour la gestion de stock
 """
-from typing import Dict, List
+from typing import Dict, List, Sequence
+from bisect import bisect_right
+import numpy as np
+
+# Tranches d'ancienneté du stock dormant (jours depuis la dernière sortie)
+TRANCHES_ANCIENNETE = (30, 60, 90, 180)
 
 
 def calculate_stock_value(articles: List) -> Dict:
@@ -57,6 +62,38 @@ def calculate_couverture_stock(stock_actuel: int, ventes_moyennes_jour: float) -
     return int(stock_actuel / ventes_moyennes_jour)
 
 
+def ageing_buckets(articles: List[Dict], seuils: Sequence[int] = TRANCHES_ANCIENNETE) -> List[Dict]:
+    """
+    Répartir le stock dormant par ancienneté de la dernière sortie
+
+    Args:
+        articles: dicts avec jours_sans_sortie et valeur_immobilisee
+        seuils: bornes basses des tranches, croissantes (30, 60, 90, 180 → 30-59, ..., 180+)
+
+    Returns:
+        Une entrée par tranche (y compris vide): tranche, nombre_articles, valeur_immobilisee
+    """
+    bornes = [0, *seuils] if seuils[0] > 0 else list(seuils)
+    tranches = [
+        {
+            "tranche": f"{debut}-{fin - 1}" if fin is not None else f"{debut}+",
+            "jours_min": debut,
+            "nombre_articles": 0,
+            "valeur_immobilisee": 0.0
+        }
+        for debut, fin in zip(bornes, [*bornes[1:], None])
+    ]
+    for article in articles:
+        tranche = tranches[bisect_right(bornes, article["jours_sans_sortie"]) - 1]
+        tranche["nombre_articles"] += 1
+        tranche["valeur_immobilisee"] += article["valeur_immobilisee"]
+
+    for tranche in tranches:
+        tranche["valeur_immobilisee"] = round(tranche["valeur_immobilisee"], 2)
+    # Tranche sous le premier seuil: seulement si elle n'est pas vide
+    return [t for t in tranches if t["jours_min"] in seuils or t["nombre_articles"]]
+
+
 def convert_currency(montant: float, devise_source: str, devise_cible: str) -> float:
     """Convertir entre devises (taux fixes pour MVP)"""
     taux = {
@@ -88,3 +125,18 @@ def calculate_economic_order_quantity(
     
     eoq = math.sqrt((2 * demande_annuelle * cout_commande) / cout_stockage)
     return int(eoq)
+
+
+def economic_order_quantities(
+    demandes_annuelles: np.ndarray,
+    cout_commande: float,
+    couts_stockage: np.ndarray
+) -> np.ndarray:
+    """EOQ vectorisée (même formule que calculate_economic_order_quantity), 0 si coût de stockage nul"""
+    demandes_annuelles = np.asarray(demandes_annuelles, dtype=np.float64)
+    couts_stockage = np.asarray(couts_stockage, dtype=np.float64)
+    eoq = np.sqrt(np.divide(
+        2 * demandes_annuelles * cout_commande, couts_stockage,
+        out=np.zeros_like(demandes_annuelles), where=couts_stockage > 0
+    ))
+    return np.floor(eoq).astype(np.int64)
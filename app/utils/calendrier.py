@@ -0,0 +1,68 @@
+"""
+Index calendaire des jours fériés et périodes spéciales (Ramadan, Aïd, ...)
+
+Chaque jour porte un facteur d'impact sur les ventes (1.0 = normal, 1.5 = +50%).
+Les entrées qui se chevauchent se multiplient (un jour national pendant le
+Ramadan, un jour férié propre à l'entreprise en plus d'un jour national).
+L'index est un dict ordinal → facteur: une recherche par jour est en O(1).
+"""
+from datetime import date
+from typing import Dict, Iterable, Optional
+import numpy as np
+from app.utils.forecasting import as_date
+
+
+class CalendrierImpact:
+    """Facteurs d'impact journaliers d'une entreprise"""
+
+    def __init__(self, facteurs: Optional[Dict[int, float]] = None):
+        self._facteurs = facteurs or {}
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict]) -> "CalendrierImpact":
+        """
+        Construire l'index à partir d'entrées {date, date_fin, impact_estime}
+
+        `date_fin` (incluse) est optionnelle: sans elle l'entrée couvre un seul jour.
+        Les impacts absents ou non positifs sont ignorés.
+        """
+        facteurs: Dict[int, float] = {}
+        for entry in entries:
+            impact = entry.get("impact_estime")
+            if not impact or impact <= 0 or impact == 1.0:
+                continue
+            debut = as_date(entry["date"]).toordinal()
+            fin = as_date(entry["date_fin"]).toordinal() if entry.get("date_fin") else debut
+            for jour in range(debut, fin + 1):
+                facteurs[jour] = facteurs.get(jour, 1.0) * impact
+        return cls(facteurs)
+
+    def facteur(self, jour: date) -> float:
+        return self._facteurs.get(as_date(jour).toordinal(), 1.0)
+
+    def facteurs(self, date_debut: date, nb_jours: int) -> np.ndarray:
+        """Vecteur des facteurs de `nb_jours` jours consécutifs à partir de `date_debut`"""
+        debut = as_date(date_debut).toordinal()
+        return np.array([self._facteurs.get(debut + i, 1.0) for i in range(nb_jours)], dtype=np.float64)
+
+    def to_dict(self) -> Dict[str, float]:
+        """Forme sérialisable (cache JSON)"""
+        return {date.fromordinal(jour).isoformat(): facteur for jour, facteur in self._facteurs.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, float]) -> "CalendrierImpact":
+        return cls({date.fromisoformat(jour).toordinal(): facteur for jour, facteur in data.items()})
+
+    def __len__(self):
+        return len(self._facteurs)
+
+
+def deseasonalize(quantites: np.ndarray, facteurs: np.ndarray) -> np.ndarray:
+    """Ramener l'historique (séries × jours) à une demande « jour normal »"""
+    return quantites / facteurs[None, :]
+
+
+def apply_impact(previsions: np.ndarray, facteurs: np.ndarray) -> np.ndarray:
+    """Appliquer les facteurs des jours prévus à la demande journalière (séries × horizon)"""
+    return previsions * facteurs[None, :]
+
@@ -0,0 +1,111 @@
+"""
+Snapshot du tableau de bord d'un magasin, maintenu incrémentalement
+
+Le snapshot garde les compteurs (articles actifs, stock faible, ruptures), la
+valeur du stock et les articles en stock faible les plus critiques dans un
+tampon borné. Un mouvement de stock (stock avant → après) ajuste ces valeurs
+par différence, sans relire le magasin.
+
+Tampon: les `TAILLE_TAMPON` articles faibles de plus petit rang (déficit
+stock - stock_min, puis code). Tant qu'il contient tous les articles faibles
+(`complet`), tout article qui devient faible y entre; sinon seuls ceux qui
+se classent avant son dernier élément y entrent. S'il descend sous
+`TOP_N` sans être complet, il doit être rechargé depuis la base.
+
+`construit_le` date la lecture de la base: un événement publié avant y est
+déjà compté et ne doit pas être réappliqué.
+"""
+from typing import Dict, List, Sequence
+from datetime import datetime
+import heapq
+
+TOP_N = 10
+TAILLE_TAMPON = 3 * TOP_N
+
+
+def est_faible(stock: int, stock_min: int) -> bool:
+    return stock <= stock_min
+
+
+def est_rupture(stock: int) -> bool:
+    return stock == 0
+
+
+def rang(entree: Sequence) -> tuple:
+    """Ordre du tampon: plus gros déficit d'abord, puis code"""
+    return (entree[3] - entree[4], entree[1])
+
+
+def top_entry(article: Dict) -> list:
+    """Entrée du tampon: [id, code, designation, stock_actuel, stock_min]"""
+    return [article["id"], article["code"], article["designation"], article["stock_actuel"], article["stock_min"]]
+
+
+def build_snapshot(resume: Dict, faibles: List[Dict], construit_le: datetime) -> Dict:
+    """
+    Construire un snapshot depuis l'agrégat du magasin et ses articles faibles les plus critiques
+
+    Args:
+        resume: {total_articles, valeur_achat, faibles, ruptures}
+        faibles: au plus TAILLE_TAMPON articles faibles, dans l'ordre de `rang`
+        construit_le: instant (aware) pris avant la lecture de la base
+    """
+    return {
+        "construit_le": construit_le.isoformat(),
+        "total_articles": resume["total_articles"],
+        "valeur": float(resume["valeur_achat"] or 0),
+        "faibles": resume["faibles"],
+        "ruptures": resume["ruptures"],
+        "top": [top_entry(a) for a in faibles][:TAILLE_TAMPON],
+    }
+
+
+def deja_compte(snapshot: Dict, publie_le: str) -> bool:
+    """Vrai si un événement publié à `publie_le` (ISO, aware) est antérieur à la lecture du snapshot"""
+    construit_le = snapshot.get("construit_le")
+    return construit_le is not None and datetime.fromisoformat(publie_le) <= datetime.fromisoformat(construit_le)
+
+
+def apply_stock_changes(snapshot: Dict, changements: List[Dict]) -> bool:
+    """
+    Appliquer des changements de stock au snapshot (en place)
+
+    Args:
+        changements: {id, code, designation, stock_min, prix_achat, stock_avant, stock_apres}
+            d'articles actifs; stock_apres est aussi la valeur affichée dans le tampon
+
+    Returns:
+        True si le tampon doit être rechargé depuis la base
+    """
+    complet = len(snapshot["top"]) >= snapshot["faibles"]
+    touches = {c["id"] for c in changements}
+    top = [e for e in snapshot["top"] if e[0] not in touches]
+    limite = rang(snapshot["top"][-1]) if snapshot["top"] and not complet else None
+
+    for c in changements:
+        avant, apres, stock_min = c["stock_avant"], c["stock_apres"], c["stock_min"]
+        snapshot["valeur"] += (apres - avant) * (c["prix_achat"] or 0)
+        snapshot["faibles"] += est_faible(apres, stock_min) - est_faible(avant, stock_min)
+        snapshot["ruptures"] += est_rupture(apres) - est_rupture(avant)
+
+        if est_faible(apres, stock_min):
+            entree = top_entry({**c, "stock_actuel": apres})
+            if limite is None or rang(entree) <= limite:
+                top.append(entree)
+
+    snapshot["top"] = heapq.nsmallest(TAILLE_TAMPON, top, key=rang)
+    return len(snapshot["top"]) < min(TOP_N, snapshot["faibles"])
+
+
+def to_stats(snapshot: Dict) -> Dict:
+    """Réponse du tableau de bord (schéma DashboardStats)"""
+    return {
+        "valeur_stock_total_dt": round(snapshot["valeur"], 2),
+        "total_articles": snapshot["total_articles"],
+        "articles_faibles_count": snapshot["faibles"],
+        "articles_rupture_count": snapshot["ruptures"],
+        "articles_faibles": [
+            {"id": e[0], "code": e[1], "designation": e[2], "stock_actuel": e[3], "stock_min": e[4]}
+            for e in snapshot["top"][:TOP_N]
+        ],
+    }
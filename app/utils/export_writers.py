@@ -0,0 +1,317 @@
+"""
+Écriture des exports page par page, à mémoire bornée
+
+Les lignes arrivent par pages (curseur keyset côté base) et sont écrites au
+fil de l'eau:
+- CSV: chaque page est encodée (et compressée en gzip si demandé) et envoyée
+  directement dans la réponse
+- XLSX: mode write-only d'openpyxl, dans un fichier temporaire envoyé par blocs
+- Parquet: un row group par page (pyarrow, dépendance optionnelle)
+"""
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+import asyncio
+import csv
+import io
+import os
+import tempfile
+import zlib
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+TAILLE_BLOC = 64 * 1024
+
+FORMATS = ("xlsx", "csv", "parquet")
+
+MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+    "pdf": "application/pdf",
+}
+
+# (en-tête, type de la colonne: string, int, float, timestamp)
+Colonnes = List[Tuple[str, str]]
+
+COLONNES_MOUVEMENTS: Colonnes = [
+    ("Date", "timestamp"),
+    ("Type", "string"),
+    ("Article", "string"),
+    ("Code", "string"),
+    ("Quantité", "int"),
+    ("Prix Unitaire", "float"),
+    ("Valeur Totale", "float"),
+    ("Motif", "string"),
+]
+
+COLONNES_STOCK: Colonnes = [
+    ("Code", "string"),
+    ("Désignation", "string"),
+    ("Stock Actuel", "int"),
+    ("Stock Min", "int"),
+    ("Prix Achat", "float"),
+    ("Valeur", "float"),
+]
+
+COLONNES_VALORISATION: Colonnes = [
+    ("Code Article", "string"),
+    ("Désignation", "string"),
+    ("Catégorie", "string"),
+    ("Quantité en Stock", "int"),
+    ("Prix Achat HT (DT)", "float"),
+    ("Valeur Stock HT (DT)", "float"),
+    ("Taux TVA", "float"),
+    ("TVA (DT)", "float"),
+    ("Valeur TTC (DT)", "float"),
+]
+
+
+class FormatIndisponibleError(RuntimeError):
+    """Format d'export dont la dépendance optionnelle n'est pas installée"""
+
+
+def as_datetime(value) -> Optional[datetime]:
+    """Normaliser un horodatage renvoyé par une requête brute (datetime ou ISO)"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def mouvement_values(row: Dict, brut: bool = False) -> list:
+    """
+    Valeurs d'une ligne de mouvement dans l'ordre de COLONNES_MOUVEMENTS
+
+    Args:
+        brut: garder la date en datetime (CSV, Parquet); sinon texte jj/mm/aaaa hh:mm (Excel)
+    """
+    date_mouvement = as_datetime(row["date_mouvement"])
+    if not brut:
+        date_mouvement = date_mouvement.strftime("%d/%m/%Y %H:%M") if date_mouvement else ""
+    return [
+        date_mouvement,
+        row["type"],
+        row.get("designation") or "",
+        row.get("code") or "",
+        row["quantite"],
+        row.get("prix_unitaire") or 0,
+        row.get("valeur_totale") or 0,
+        row.get("motif") or "",
+    ]
+
+
+class XlsxStreamWriter:
+    """Classeur write-only: mémoire constante quel que soit le nombre de lignes"""
+
+    def __init__(self, titre: str, entetes: Sequence[str], largeurs: Optional[Sequence[int]] = None):
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(titre)
+        if largeurs:
+            # Les largeurs doivent être fixées avant la première ligne en mode write-only
+            for index, largeur in enumerate(largeurs, start=1):
+                self._sheet.column_dimensions[get_column_letter(index)].width = largeur
+        self._sheet.append(list(entetes))
+        self.lignes = 0
+
+    def append_rows(self, rows: List[list]):
+        """Écrire une page de lignes (déjà ordonnées comme les en-têtes)"""
+        for row in rows:
+            self._sheet.append(row)
+        self.lignes += len(rows)
+
+    def close(self) -> str:
+        """Finaliser le classeur dans un fichier temporaire et renvoyer son chemin"""
+        fd, path = tempfile.mkstemp(suffix=".xlsx", prefix="export_")
+        os.close(fd)
+        self._workbook.save(path)
+        return path
+
+
+class CsvStreamEncoder:
+    """
+    Encodeur CSV incrémental: chaque page devient un bloc d'octets prêt à envoyer
+
+    Séparateur `;` et BOM UTF-8 pour l'ouverture directe dans Excel en
+    paramètres régionaux français; dates au format ISO pour les outils BI.
+    """
+
+    def __init__(self, entetes: Sequence[str], gzip: bool = False, separateur: str = ";"):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, delimiter=separateur, lineterminator="\n")
+        # wbits=31: en-tête et somme de contrôle gzip (fichier .gz standard)
+        self._compresseur = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+        self._entetes = list(entetes)
+        self.lignes = 0
+
+    def header(self) -> bytes:
+        self._writer.writerow(self._entetes)
+        return self._sortie(prefixe="\ufeff")
+
+    def encode(self, rows: List[list]) -> bytes:
+        self._writer.writerows(
+            [[v.isoformat(sep=" ") if isinstance(v, datetime) else v for v in row] for row in rows]
+        )
+        self.lignes += len(rows)
+        return self._sortie()
+
+    def finish(self) -> bytes:
+        return self._compresseur.flush() if self._compresseur else b""
+
+    def _sortie(self, prefixe: str = "") -> bytes:
+        data = (prefixe + self._buffer.getvalue()).encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return self._compresseur.compress(data) if self._compresseur else data
+
+
+def require_pyarrow():
+    """Importer pyarrow à la demande (seul l'export Parquet en a besoin)"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise FormatIndisponibleError("Export Parquet indisponible: installer pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+class ParquetStreamWriter:
+    """Fichier Parquet écrit par row groups: une page en mémoire à la fois"""
+
+    def __init__(self, colonnes: Colonnes, compression: str = "snappy"):
+        pa, pq = require_pyarrow()
+        types = {
+            "string": pa.string(),
+            "int": pa.int64(),
+            "float": pa.float64(),
+            # Dates de la base en UTC (une date naïve est lue comme UTC)
+            "timestamp": pa.timestamp("ms", tz="UTC"),
+        }
+        self._pa = pa
+        self._schema = pa.schema([(nom, types[type_colonne]) for nom, type_colonne in colonnes])
+        fd, self.path = tempfile.mkstemp(suffix=".parquet", prefix="export_")
+        os.close(fd)
+        self._writer = pq.ParquetWriter(self.path, self._schema, compression=compression)
+        self.lignes = 0
+
+    def append_rows(self, rows: List[list]):
+        if not rows:
+            return
+        colonnes = list(zip(*rows))
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(valeurs, type=champ.type) for valeurs, champ in zip(colonnes, self._schema)],
+            schema=self._schema
+        ))
+        self.lignes += len(rows)
+
+    def close(self) -> str:
+        self._writer.close()
+        return self.path
+
+
+def iter_file(path: str, taille_bloc: int = TAILLE_BLOC, supprimer: bool = True) -> Iterator[bytes]:
+    """Lire un fichier par blocs (corps de StreamingResponse), puis le supprimer"""
+    try:
+        with open(path, "rb") as f:
+            while bloc := f.read(taille_bloc):
+                yield bloc
+    finally:
+        if supprimer:
+            os.remove(path)
+
+
+def parse_byte_range(header: Optional[str], taille: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpréter un en-tête Range `bytes=debut-fin` (une seule plage)
+
+    Returns:
+        (debut, fin) inclusifs, None sans en-tête ou si l'en-tête est ignoré
+        (unité inconnue, plages multiples)
+
+    Raises:
+        ValueError: plage non satisfaisable (réponse 416)
+    """
+    if not header:
+        return None
+    unite, _, plage = header.partition("=")
+    if unite.strip() != "bytes" or "," in plage:
+        return None
+    debut, _, fin = plage.strip().partition("-")
+    try:
+        if debut == "":
+            # bytes=-N: les N derniers octets
+            longueur = int(fin)
+            if longueur <= 0:
+                raise ValueError
+            return max(taille - longueur, 0), taille - 1
+        debut = int(debut)
+        fin = int(fin) if fin else taille - 1
+    except ValueError:
+        raise ValueError(f"Plage invalide: {header}")
+    if debut >= taille or fin < debut:
+        raise ValueError(f"Plage invalide: {header}")
+    return debut, min(fin, taille - 1)
+
+
+def iter_file_range(path: str, debut: int, fin: int, taille_bloc: int = TAILLE_BLOC) -> Iterator[bytes]:
+    """Lire les octets [debut, fin] d'un fichier par blocs"""
+    restant = fin - debut + 1
+    with open(path, "rb") as f:
+        f.seek(debut)
+        while restant > 0:
+            bloc = f.read(min(taille_bloc, restant))
+            if not bloc:
+                break
+            restant -= len(bloc)
+            yield bloc
+
+
+async def iter_csv(colonnes: Colonnes, pages: AsyncIterable[List[list]], gzip: bool = False) -> AsyncIterator[bytes]:
+    """Corps de réponse CSV: les pages sont lues au rythme de l'envoi"""
+    encodeur = CsvStreamEncoder([entete for entete, _ in colonnes], gzip=gzip)
+    yield encodeur.header()
+    async for rows in pages:
+        bloc = await asyncio.to_thread(encodeur.encode, rows)
+        if bloc:
+            yield bloc
+    yield encodeur.finish()
+
+
+async def export_pages(
+    format: str,
+    titre: str,
+    colonnes: Colonnes,
+    pages: AsyncIterable[List[list]],
+    gzip: bool = False
+) -> Tuple[object, str, str]:
+    """
+    Produire un export dans le format demandé à partir de pages de lignes
+
+    Returns:
+        (corps itérable pour StreamingResponse, media type, extension du fichier)
+
+    Raises:
+        ValueError: format inconnu
+        FormatIndisponibleError: dépendance optionnelle manquante (Parquet)
+    """
+    if format == "csv":
+        extension = "csv.gz" if gzip else "csv"
+        return iter_csv(colonnes, pages, gzip), MEDIA_TYPES[extension], extension
+
+    if format == "xlsx":
+        writer = XlsxStreamWriter(titre, [entete for entete, _ in colonnes])
+    elif format == "parquet":
+        writer = ParquetStreamWriter(colonnes)
+    else:
+        raise ValueError(f"Format d'export inconnu: {format}")
+
+    # openpyxl / pyarrow sont synchrones: chaque page est écrite dans un thread,
+    # la boucle d'événements continue de servir les autres requêtes
+    async for rows in pages:
+        await asyncio.to_thread(writer.append_rows, rows)
+    path = await asyncio.to_thread(writer.close)
+    return iter_file(path), MEDIA_TYPES[format], format
+
+
+async def single_page(rows: List[list]) -> AsyncIterator[List[list]]:
+    """Présenter une liste déjà chargée comme une source de pages"""
+    yield rows
@@ -0,0 +1,200 @@
+"""
+Moteur de prévision: modèles enregistrés et sélection automatique par article
+
+Chaque modèle prend une matrice de demande (séries × jours, colonne la plus
+récente en dernier) et renvoie la demande journalière prévue (séries × horizon).
+Les modèles sont ajustés en batch: une seule boucle sur le temps, vectorisée
+sur toutes les séries qui leur sont attribuées.
+"""
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from app.utils.forecasting import weighted_moving_average
+
+SAISON_JOURS = 7              # saisonnalité hebdomadaire
+SEUIL_ADI = 1.32              # intervalle moyen entre ventes au-delà duquel la demande est intermittente
+SEUIL_SAISONNALITE = 0.3      # part de variance expliquée par le jour de la semaine
+
+
+class ForecastModel:
+    """Interface d'un modèle de prévision"""
+
+    nom: str = ""
+    version: str = "1.0"
+
+    def forecast(self, quantites: np.ndarray, horizon: int) -> np.ndarray:
+        """Demande journalière prévue (séries × horizon)"""
+        raise NotImplementedError
+
+
+MODELES: Dict[str, ForecastModel] = {}
+
+
+def register_model(cls):
+    """Enregistrer un modèle dans le registre (décorateur de classe)"""
+    MODELES[cls.nom] = cls()
+    return cls
+
+
+def get_model(nom: str) -> ForecastModel:
+    if nom not in MODELES:
+        raise ValueError(f"Modèle de prévision inconnu: {nom}")
+    return MODELES[nom]
+
+
+@register_model
+class WeightedMovingAverage(ForecastModel):
+    """Moyenne mobile pondérée (poids linéaires 0.5 → 1.0), demande constante sur l'horizon"""
+
+    nom = "weighted_moving_average"
+    version = "1.1"
+
+    def forecast(self, quantites: np.ndarray, horizon: int) -> np.ndarray:
+        demande = weighted_moving_average(quantites)
+        return np.repeat(demande[:, None], horizon, axis=1)
+
+
+@register_model
+class HoltWinters(ForecastModel):
+    """Holt-Winters additif, tendance amortie et saisonnalité hebdomadaire"""
+
+    nom = "holt_winters"
+    version = "1.0"
+
+    def __init__(self, alpha: float = 0.3, beta: float = 0.05, gamma: float = 0.2, phi: float = 0.9):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.phi = phi
+
+    def forecast(self, quantites: np.ndarray, horizon: int) -> np.ndarray:
+        nb_jours = quantites.shape[1]
+        if nb_jours < 2 * SAISON_JOURS:
+            return WeightedMovingAverage().forecast(quantites, horizon)
+
+        # Initialisation sur les deux premières semaines
+        semaine_1 = quantites[:, :SAISON_JOURS]
+        semaine_2 = quantites[:, SAISON_JOURS:2 * SAISON_JOURS]
+        niveau = semaine_1.mean(axis=1)
+        tendance = (semaine_2.mean(axis=1) - niveau) / SAISON_JOURS
+        saisons = semaine_1 - niveau[:, None]
+
+        for t in range(nb_jours):
+            s = t % SAISON_JOURS
+            y = quantites[:, t]
+            niveau_precedent = niveau
+            niveau = self.alpha * (y - saisons[:, s]) + (1 - self.alpha) * (niveau + self.phi * tendance)
+            tendance = self.beta * (niveau - niveau_precedent) + (1 - self.beta) * self.phi * tendance
+            saisons[:, s] = self.gamma * (y - niveau) + (1 - self.gamma) * saisons[:, s]
+
+        # Tendance amortie cumulée: phi + phi² + ... + phi^h
+        pas = np.arange(1, horizon + 1)
+        amortissement = np.cumsum(self.phi ** pas)
+        indices = (nb_jours + pas - 1) % SAISON_JOURS
+        previsions = niveau[:, None] + tendance[:, None] * amortissement + saisons[:, indices]
+        return np.clip(previsions, 0, None)
+
+
+@register_model
+class Croston(ForecastModel):
+    """Croston (variante SBA) pour la demande intermittente: taille moyenne / intervalle moyen"""
+
+    nom = "croston"
+    version = "1.0"
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+
+    def forecast(self, quantites: np.ndarray, horizon: int) -> np.ndarray:
+        nb_series, nb_jours = quantites.shape
+        jours_vendus = (quantites > 0).sum(axis=1)
+        vendu = jours_vendus > 0
+
+        # Initialisation sur tout l'historique: taille moyenne des ventes et intervalle moyen
+        taille = np.divide(quantites.sum(axis=1), jours_vendus, out=np.zeros(nb_series), where=vendu)
+        intervalle = np.divide(nb_jours, jours_vendus, out=np.ones(nb_series), where=vendu)
+        depuis = np.zeros(nb_series)
+        initialise = np.zeros(nb_series, dtype=bool)
+
+        for y in quantites.T:
+            depuis += 1
+            vente = y > 0
+            suivante = vente & initialise
+
+            taille[vente] += self.alpha * (y[vente] - taille[vente])
+            intervalle[suivante] += self.alpha * (depuis[suivante] - intervalle[suivante])
+
+            initialise |= vente
+            depuis[vente] = 0
+
+        demande = np.where(vendu, (1 - self.alpha / 2) * taille / intervalle, 0.0)
+        return np.repeat(demande[:, None], horizon, axis=1)
+
+
+def select_models(quantites: np.ndarray, candidats: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Choisir un modèle par série avec une règle peu coûteuse
+
+    - intervalle moyen entre ventes (ADI) > 1.32 → croston
+    - au moins deux semaines et profil hebdomadaire marqué → holt_winters
+    - sinon → weighted_moving_average
+    """
+    candidats = set(candidats or MODELES)
+    nb_series, nb_jours = quantites.shape
+
+    jours_vendus = (quantites > 0).sum(axis=1)
+    adi = np.divide(nb_jours, jours_vendus, out=np.full(nb_series, np.inf), where=jours_vendus > 0)
+
+    saisonnalite = np.zeros(nb_series)
+    if nb_jours >= 2 * SAISON_JOURS:
+        # Profil moyen par jour de la semaine, aligné sur la fin de l'historique
+        debut = nb_jours % SAISON_JOURS
+        semaines = quantites[:, debut:].reshape(nb_series, -1, SAISON_JOURS)
+        variance = quantites.var(axis=1)
+        saisonnalite = np.divide(
+            semaines.mean(axis=1).var(axis=1), variance,
+            out=np.zeros(nb_series), where=variance > 0
+        )
+
+    choix = []
+    for i in range(nb_series):
+        if adi[i] > SEUIL_ADI and "croston" in candidats:
+            choix.append("croston")
+        elif saisonnalite[i] > SEUIL_SAISONNALITE and "holt_winters" in candidats:
+            choix.append("holt_winters")
+        else:
+            choix.append("weighted_moving_average")
+    return choix
+
+
+def forecast_series(
+    quantites: np.ndarray,
+    horizon: int,
+    algorithme: Optional[str] = None,
+    candidats: Optional[Iterable[str]] = None
+) -> Dict:
+    """
+    Prévoir toutes les séries, chaque modèle étant ajusté une fois sur son groupe
+
+    Args:
+        quantites: matrice de demande (séries × jours)
+        horizon: nombre de jours prévus
+        algorithme: forcer un modèle pour toutes les séries (défaut: sélection automatique)
+        candidats: restreindre la sélection automatique à ces modèles
+
+    Returns:
+        Dict {previsions (séries × horizon), algorithmes, versions}
+    """
+    quantites = np.atleast_2d(np.asarray(quantites, dtype=np.float64))
+    nb_series = quantites.shape[0]
+    algorithmes = [algorithme] * nb_series if algorithme else select_models(quantites, candidats)
+
+    previsions = np.zeros((nb_series, horizon))
+    for nom in set(algorithmes):
+        lignes = [i for i, a in enumerate(algorithmes) if a == nom]
+        previsions[lignes] = get_model(nom).forecast(quantites[lignes], horizon)
+
+    return {
+        "previsions": previsions,
+        "algorithmes": algorithmes,
+        "versions": [MODELES[nom].version for nom in algorithmes]
+    }
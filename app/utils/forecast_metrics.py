@@ -0,0 +1,86 @@
+"""
+Métriques de précision des prévisions, vectorisées sur plusieurs séries
+
+Toutes les fonctions prennent une matrice d'historiques (séries × points) et
+un vecteur d'une prévision par série, et renvoient un vecteur par métrique.
+Utilisées par le forecaster batch, le chemin article par article et le backtest.
+"""
+from typing import Dict, List
+import numpy as np
+
+
+def _prepare(historiques, previsions):
+    historiques = np.atleast_2d(np.asarray(historiques, dtype=np.float64))
+    previsions = np.asarray(previsions, dtype=np.float64).reshape(-1)
+    return historiques, previsions
+
+
+def mape(historiques: np.ndarray, previsions: np.ndarray) -> np.ndarray:
+    """MAPE (%) par série, calculé uniquement sur les points non nuls"""
+    historiques, previsions = _prepare(historiques, previsions)
+    erreurs = np.abs(historiques - previsions[:, None])
+    positifs = historiques > 0
+    ratios = np.divide(erreurs, historiques, out=np.zeros_like(erreurs), where=positifs)
+    nb_positifs = positifs.sum(axis=1)
+    return np.divide(ratios.sum(axis=1), nb_positifs, out=np.zeros(len(historiques)), where=nb_positifs > 0) * 100
+
+
+def wmape(historiques: np.ndarray, previsions: np.ndarray) -> np.ndarray:
+    """WMAPE (%) par série: somme des erreurs absolues / somme des ventes"""
+    historiques, previsions = _prepare(historiques, previsions)
+    erreurs = np.abs(historiques - previsions[:, None]).sum(axis=1)
+    totaux = historiques.sum(axis=1)
+    return np.divide(erreurs, totaux, out=np.zeros(len(historiques)), where=totaux > 0) * 100
+
+
+def bias(historiques: np.ndarray, previsions: np.ndarray) -> np.ndarray:
+    """Biais (%) par série: > 0 = sur-prévision, < 0 = sous-prévision"""
+    historiques, previsions = _prepare(historiques, previsions)
+    ecarts = (previsions[:, None] - historiques).sum(axis=1)
+    totaux = historiques.sum(axis=1)
+    return np.divide(ecarts, totaux, out=np.zeros(len(historiques)), where=totaux > 0) * 100
+
+
+def coverage(historiques: np.ndarray, previsions: np.ndarray) -> np.ndarray:
+    """Couverture (%) par série: part des points où la prévision couvre la demande réelle"""
+    historiques, previsions = _prepare(historiques, previsions)
+    if historiques.shape[1] == 0:
+        return np.zeros(len(historiques))
+    return (previsions[:, None] >= historiques).mean(axis=1) * 100
+
+
+def rmse(historiques: np.ndarray, previsions: np.ndarray) -> np.ndarray:
+    """RMSE par série, dans l'unité de l'article"""
+    historiques, previsions = _prepare(historiques, previsions)
+    if historiques.shape[1] == 0:
+        return np.zeros(len(historiques))
+    return np.sqrt(((historiques - previsions[:, None]) ** 2).mean(axis=1))
+
+
+def compute_metrics(historiques: np.ndarray, previsions: np.ndarray) -> Dict[str, np.ndarray]:
+    """Calculer toutes les métriques pour toutes les séries en une fois"""
+    historiques, previsions = _prepare(historiques, previsions)
+    return {
+        "mape": mape(historiques, previsions),
+        "wmape": wmape(historiques, previsions),
+        "bias": bias(historiques, previsions),
+        "coverage": coverage(historiques, previsions),
+        "rmse": rmse(historiques, previsions),
+        "nb_points": (historiques > 0).sum(axis=1)
+    }
+
+
+def metrics_as_dicts(metriques: Dict[str, np.ndarray]) -> List[Dict]:
+    """Convertir les vecteurs de métriques en un dict JSON par série (champ Prevision.metriques)"""
+    nb_series = len(metriques["mape"])
+    return [
+        {
+            "mape": round(float(metriques["mape"][i]), 2),
+            "wmape": round(float(metriques["wmape"][i]), 2),
+            "bias": round(float(metriques["bias"][i]), 2),
+            "coverage": round(float(metriques["coverage"][i]), 2),
+            "rmse": round(float(metriques["rmse"][i]), 3),
+            "nb_points": int(metriques["nb_points"][i])
+        }
+        for i in range(nb_series)
+    ]
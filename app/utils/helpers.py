@@ -1,5 +1,5 @@
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Tuple
 
 def calculate_stock_value(articles: List[Dict]) -> float:
     """
@@ -15,6 +15,21 @@ def calculate_marge(prix_achat: float, prix_vente: float) -> float:
         return 0
     return ((prix_vente - prix_achat) / prix_achat) * 100
 
+def as_utc(valeur: datetime) -> datetime:
+    """
+    Date aware en UTC (une date naïve est supposée déjà en UTC, comme les colonnes DateTime)
+    """
+    if valeur.tzinfo is None:
+        return valeur.replace(tzinfo=timezone.utc)
+    return valeur.astimezone(timezone.utc)
+
+def utc_today() -> date:
+    """
+    Jour courant en UTC: convention de tous les jours de vente (ventes_journalieres.jour,
+    fenêtres de prévision, stock dormant), ne jamais utiliser CURRENT_DATE ni date.today()
+    """
+    return datetime.now(timezone.utc).date()
+
 def get_week_range(date: datetime = None) -> tuple:
     """
     Obtenir le début et la fin de la semaine
@@ -27,12 +42,35 @@ def get_week_range(date: datetime = None) -> tuple:
     
     return start, end
 
+def get_month_ranges(debut: date, fin: date) -> List[Tuple[date, date]]:
+    """
+    Découper [debut, fin] en mois calendaires: [(premier jour, premier jour exclu)]
+    """
+    tranches = []
+    courant = debut
+    while courant <= fin:
+        suivant = date(courant.year + courant.month // 12, courant.month % 12 + 1, 1)
+        tranches.append((courant, suivant))
+        courant = suivant
+    return tranches
+
 def format_currency_dt(amount: float) -> str:
     """
     Formater un montant en dinars tunisiens
     """
     return f"{amount:.3f} DT"
 
+PREFIXES_DOCUMENTS = {
+    "BON_COMMANDE": "BC",
+    "TRANSFERT": "TRF",
+}
+
+def format_reference(type_document: str, annee: int, numero: int) -> str:
+    """
+    Formater une référence de document (BC-2025-0042)
+    """
+    return f"{PREFIXES_DOCUMENTS[type_document]}-{annee}-{numero:04d}"
+
 def is_jour_ferie(date: datetime, jours_feries: List[datetime]) -> bool:
     """
     Vérifier si une date est un jour férié
@@ -0,0 +1,86 @@
+"""
+Pagination par curseur (keyset) des listes
+
+Une page est lue après la dernière ligne de la précédente, sur l'ordre
+(clé de tri, id): le coût ne dépend pas de la profondeur de la page, à
+l'inverse de skip/take qui relit et jette toutes les lignes précédentes.
+Le curseur est opaque pour le client (base64 de la clé et de l'id de la
+dernière ligne) et renvoyé dans l'en-tête X-Next-Cursor tant qu'il reste
+des lignes.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+from app.core.exceptions import InvalidCursorException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(valeur: Any, dernier_id: str) -> str:
+    """Curseur après une ligne (valeur de la clé de tri, id)"""
+    if isinstance(valeur, datetime):
+        brut = ["dt", valeur.isoformat(), dernier_id]
+    else:
+        brut = ["v", valeur, dernier_id]
+    return base64.urlsafe_b64encode(json.dumps(brut, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """
+    (valeur de la clé de tri, id) d'un curseur
+
+    Raises:
+        InvalidCursorException: curseur illisible (400)
+    """
+    try:
+        brut = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        type_valeur, valeur, dernier_id = brut
+        if type_valeur == "dt":
+            valeur = datetime.fromisoformat(valeur)
+        elif type_valeur != "v":
+            raise ValueError(type_valeur)
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
+    return valeur, dernier_id
+
+
+def after_cursor(cle: str, sens: str, valeur: Any, dernier_id: str) -> Dict:
+    """Filtre Prisma des lignes situées après (valeur, id) dans l'ordre (cle, id) `sens`"""
+    operateur = "lt" if sens == "desc" else "gt"
+    return {"OR": [
+        {cle: {operateur: valeur}},
+        {cle: valeur, "id": {operateur: dernier_id}},
+    ]}
+
+
+async def keyset_page(
+    actions,
+    where: Dict,
+    cle: str,
+    sens: str = "asc",
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    **options
+) -> Tuple[List, Optional[str]]:
+    """
+    Lire une page de `limit` lignes triées par (cle, id)
+
+    Args:
+        actions: client Prisma d'un modèle (ex: prisma.article)
+        cle: champ de tri non nul (un index (filtre, cle, id) rend la lecture directe)
+        cursor: curseur renvoyé par la page précédente
+        options: passés à find_many (include, skip des anciens clients)
+
+    Returns:
+        (lignes, curseur de la page suivante ou None)
+    """
+    if cursor:
+        apres = after_cursor(cle, sens, *decode_cursor(cursor))
+        where = {"AND": [where, apres]} if where else apres
+    # Une ligne de plus pour savoir s'il reste une page
+    lignes = await actions.find_many(where=where, order=[{cle: sens}, {"id": sens}], take=limit + 1, **options)
+    if len(lignes) <= limit:
+        return lignes, None
+    derniere = lignes[limit - 1]
+    return lignes[:limit], encode_cursor(getattr(derniere, cle), derniere.id)
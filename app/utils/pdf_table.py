@@ -0,0 +1,140 @@
+"""
+Rapports PDF tabulaires sans dépendance externe
+
+Génère un PDF 1.4 en A4 paysage avec les polices standard Courier / Courier-Bold
+(présentes dans tout lecteur PDF, chasse fixe: les colonnes s'alignent sans
+métrique de police). Texte encodé en WinAnsi (cp1252): accents français et
+symboles courants.
+"""
+from datetime import date, datetime
+from typing import List, Optional, Sequence
+import zlib
+
+LARGEUR_PAGE = 842
+HAUTEUR_PAGE = 595
+MARGE = 36
+TAILLE_POLICE = 8
+INTERLIGNE = 11
+LARGEUR_CARACTERE = 0.6  # Courier: 600/1000 em
+LARGEUR_COLONNE_MAX = 40
+
+
+def format_cell(value) -> str:
+    """Représentation d'une valeur de cellule (montants au millime)"""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:,.3f}".replace(",", " ")
+    if isinstance(value, datetime):
+        return value.strftime("%d/%m/%Y %H:%M")
+    if isinstance(value, date):
+        return value.strftime("%d/%m/%Y")
+    return str(value)
+
+
+def _escape(texte: str) -> bytes:
+    data = texte.encode("cp1252", errors="replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class PdfTableDocument:
+    """Document composé de tableaux successifs, paginé automatiquement"""
+
+    def __init__(self, titre: str, sous_titre: str = ""):
+        self.titre = titre
+        self.sous_titre = sous_titre
+        self._lignes: List[tuple] = []  # (texte, gras)
+        self.caracteres_par_ligne = int((LARGEUR_PAGE - 2 * MARGE) / (TAILLE_POLICE * LARGEUR_CARACTERE))
+
+    def add_table(self, titre: str, entetes: Sequence[str], lignes: Sequence[Sequence], gras: Optional[Sequence[int]] = None):
+        """
+        Ajouter un tableau
+
+        Args:
+            gras: indices des lignes à mettre en gras (sous-totaux, total)
+        """
+        textes = [[format_cell(v) for v in ligne] for ligne in lignes]
+        numeriques = [
+            all(isinstance(ligne[i], (int, float)) or ligne[i] in (None, "") for ligne in lignes) and bool(lignes)
+            for i in range(len(entetes))
+        ]
+        largeurs = [
+            min(max([len(entete)] + [len(t[i]) for t in textes]), LARGEUR_COLONNE_MAX)
+            for i, entete in enumerate(entetes)
+        ]
+
+        def _ligne(cellules) -> str:
+            morceaux = []
+            for texte, largeur, numerique in zip(cellules, largeurs, numeriques):
+                if len(texte) > largeur:
+                    texte = texte[:largeur - 1] + "…"
+                morceaux.append(texte.rjust(largeur) if numerique else texte.ljust(largeur))
+            return "  ".join(morceaux)[:self.caracteres_par_ligne]
+
+        gras = set(gras or [])
+        if self._lignes:
+            self._lignes.append(("", False))
+        self._lignes.append((titre, True))
+        self._lignes.append((_ligne(list(entetes)), True))
+        self._lignes.append(("-" * min(sum(largeurs) + 2 * (len(largeurs) - 1), self.caracteres_par_ligne), False))
+        self._lignes.extend((_ligne(t), i in gras) for i, t in enumerate(textes))
+
+    def to_bytes(self) -> bytes:
+        lignes_par_page = int((HAUTEUR_PAGE - 2 * MARGE - 3 * INTERLIGNE) / INTERLIGNE)
+        pages = [self._lignes[i:i + lignes_par_page] for i in range(0, len(self._lignes), lignes_par_page)] or [[]]
+
+        objets: List[bytes] = []  # objet n = objets[n - 1]
+        objets.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+        objets.append(b"")  # Pages, rempli quand les pages sont connues
+        objets.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>")
+        objets.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>")
+
+        kids = []
+        for numero, lignes in enumerate(pages, start=1):
+            contenu = zlib.compress(self._contenu_page(lignes, numero, len(pages)))
+            objets.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(contenu) + contenu + b"\nendstream")
+            flux = len(objets)
+            objets.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                % (LARGEUR_PAGE, HAUTEUR_PAGE, flux)
+            )
+            kids.append(len(objets))
+        objets[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+        )
+
+        sortie = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        positions = []
+        for numero, objet in enumerate(objets, start=1):
+            positions.append(len(sortie))
+            sortie += b"%d 0 obj\n" % numero + objet + b"\nendobj\n"
+        xref = len(sortie)
+        sortie += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objets) + 1)
+        sortie += b"".join(b"%010d 00000 n \n" % position for position in positions)
+        sortie += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objets) + 1, xref)
+        return bytes(sortie)
+
+    def _contenu_page(self, lignes: List[tuple], numero: int, total: int) -> bytes:
+        y = HAUTEUR_PAGE - MARGE
+        commandes = [
+            b"BT /F2 12 Tf %d %d Td (%s) Tj ET" % (MARGE, y, _escape(self.titre)),
+            b"BT /F1 %d Tf %d %d Td (%s) Tj ET" % (
+                TAILLE_POLICE, MARGE, y - 14, _escape(f"{self.sous_titre}    Page {numero}/{total}".strip())
+            ),
+        ]
+        y -= 3 * INTERLIGNE + 4
+        for texte, gras in lignes:
+            if texte:
+                commandes.append(b"BT /%s %d Tf %d %d Td (%s) Tj ET" % (
+                    b"F2" if gras else b"F1", TAILLE_POLICE, MARGE, y, _escape(texte)
+                ))
+            y -= INTERLIGNE
+        return b"\n".join(commandes)
+
+
+def render_table_pdf(titre: str, entetes: Sequence[str], lignes: Sequence[Sequence], sous_titre: str = "") -> bytes:
+    """Raccourci: document d'un seul tableau"""
+    document = PdfTableDocument(titre, sous_titre)
+    document.add_table(titre, entetes, lignes)
+    return document.to_bytes()
@@ -0,0 +1,98 @@
+"""
+Planification du réapprovisionnement, vectorisée sur tous les articles
+
+Pour chaque article: demande journalière prévue d, délai fournisseur L et
+stock de sécurité SS donnent le point de commande ROP = d × L + SS. Un article
+est à commander quand son stock est au plus ROP; la quantité est l'EOQ,
+relevée pour revenir au-dessus du ROP et plafonnée au stock max. Le plafond
+l'emporte: un article dont le ROP dépasse le stock max est signalé
+(rop_superieur_stock_max) pour corriger son paramétrage.
+"""
+from typing import Dict, List
+import numpy as np
+from app.utils.calculators import economic_order_quantities
+
+DELAI_DEFAUT_JOURS = 7        # fournisseur sans délai renseigné
+COUT_COMMANDE = 20.0          # coût fixe d'une commande (TND)
+TAUX_STOCKAGE_ANNUEL = 0.25   # coût de possession annuel, en part du prix d'achat
+
+
+def plan_reorders(
+    articles: List[Dict],
+    cout_commande: float = COUT_COMMANDE,
+    taux_stockage: float = TAUX_STOCKAGE_ANNUEL
+) -> List[Dict]:
+    """
+    Calculer points de commande et quantités pour une liste d'articles
+
+    Args:
+        articles: projections {article_id, stock_actuel, stock_min, stock_max,
+            stock_securite, prix_achat, demande_jour, delai_livraison}
+
+    Returns:
+        Les articles à commander, enrichis de point_commande, quantite_a_commander,
+        couverture_jours, priorite et rop_superieur_stock_max, triés par
+        priorité puis couverture
+    """
+    if not articles:
+        return []
+
+    def colonne(nom, defaut=0.0):
+        return np.array([a.get(nom) if a.get(nom) is not None else defaut for a in articles], dtype=np.float64)
+
+    stock = colonne("stock_actuel")
+    stock_min = colonne("stock_min")
+    stock_max = colonne("stock_max")
+    securite = colonne("stock_securite")
+    prix = colonne("prix_achat")
+    demande = colonne("demande_jour")
+    delai = colonne("delai_livraison", DELAI_DEFAUT_JOURS)
+
+    point_commande = np.ceil(demande * delai + securite)
+    eoq = economic_order_quantities(demande * 365, cout_commande, prix * taux_stockage)
+
+    besoin = np.maximum(point_commande - stock, 0)
+    quantite = np.maximum(eoq, besoin)
+    plafond = np.where(stock_max > 0, np.maximum(stock_max - stock, 0), np.inf)
+    quantite = np.minimum(quantite, plafond)
+    rop_trop_haut = (stock_max > 0) & (point_commande > stock_max)
+
+    a_commander = (stock <= point_commande) & (quantite > 0)
+    couverture = np.divide(stock, demande, out=np.full(len(articles), np.inf), where=demande > 0)
+    haute = (stock <= stock_min) | (couverture < delai)
+
+    suggestions = []
+    for i in np.flatnonzero(a_commander):
+        suggestions.append({
+            **articles[i],
+            "delai_livraison": int(delai[i]),
+            "point_commande": int(point_commande[i]),
+            "quantite_a_commander": int(np.ceil(quantite[i])),
+            "couverture_jours": None if np.isinf(couverture[i]) else round(float(couverture[i]), 1),
+            "priorite": "HAUTE" if haute[i] else "NORMALE",
+            "rop_superieur_stock_max": bool(rop_trop_haut[i])
+        })
+
+    suggestions.sort(key=lambda s: (
+        s["priorite"] != "HAUTE",
+        s["couverture_jours"] if s["couverture_jours"] is not None else float("inf")
+    ))
+    return suggestions
+
+
+def group_by_fournisseur(suggestions: List[Dict]) -> Dict:
+    """Regrouper les suggestions par fournisseur (clé None = fournisseur inconnu)"""
+    groupes: Dict = {}
+    for suggestion in suggestions:
+        groupe = groupes.setdefault(suggestion.get("fournisseur_id"), {
+            "fournisseur_id": suggestion.get("fournisseur_id"),
+            "fournisseur": suggestion.get("fournisseur"),
+            "delai_livraison": suggestion["delai_livraison"],
+            "lignes": [],
+            "montant_total": 0.0
+        })
+        groupe["lignes"].append(suggestion)
+        groupe["montant_total"] = round(
+            groupe["montant_total"] + suggestion["quantite_a_commander"] * (suggestion.get("prix_achat") or 0), 3
+        )
+    return groupes
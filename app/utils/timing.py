@@ -0,0 +1,31 @@
+"""
+Chronométrage des traitements batch (crons, moteurs d'alertes, exports)
+"""
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict
+
+
+class PhaseTimer:
+    """Mesurer le temps passé dans chaque phase d'un traitement"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, nom: str):
+        debut = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[nom] = self.phases.get(nom, 0.0) + (perf_counter() - debut)
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def as_dict(self) -> Dict[str, float]:
+        """Durées par phase en millisecondes"""
+        durees = {nom: round(duree * 1000, 2) for nom, duree in self.phases.items()}
+        durees["total"] = round(self.total * 1000, 2)
+        return durees
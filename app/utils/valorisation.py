@@ -0,0 +1,120 @@
+"""
+Valorisation du stock (format comptabilité tunisienne)
+
+Les colonnes HT / TVA / TTC, les totaux et les sous-totaux sont calculés par
+opérations pandas sur colonnes entières: une seule extraction des articles,
+puis aucun parcours ligne à ligne.
+"""
+from typing import Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+TVA_DEFAUT = 0.19
+
+# Regroupements possibles pour les sous-totaux
+GROUPES = ("categorie", "tva_taux")
+
+ENTETES = {
+    "code": "Code Article",
+    "designation": "Désignation",
+    "categorie": "Catégorie",
+    "stock_actuel": "Quantité en Stock",
+    "prix_achat": "Prix Achat HT (DT)",
+    "valeur_ht": "Valeur Stock HT (DT)",
+    "tva_taux": "Taux TVA",
+    "tva": "TVA (DT)",
+    "valeur_ttc": "Valeur TTC (DT)",
+}
+
+MONTANTS = ["valeur_ht", "tva", "valeur_ttc"]
+SOMMES = ["stock_actuel"] + MONTANTS
+
+
+def valorisation_frame(articles: Iterable) -> pd.DataFrame:
+    """
+    Une ligne par article avec les montants HT, TVA et TTC (non arrondis)
+
+    Args:
+        articles: objets ou dicts exposant code, designation, categorie,
+            stock_actuel, prix_achat, tva_taux
+    """
+    champs = ("code", "designation", "categorie", "stock_actuel", "prix_achat", "tva_taux")
+    lignes = [
+        tuple(a.get(c) for c in champs) if isinstance(a, dict) else tuple(getattr(a, c, None) for c in champs)
+        for a in articles
+    ]
+    df = pd.DataFrame.from_records(lignes, columns=champs)
+
+    df["categorie"] = df["categorie"].fillna("Sans catégorie")
+    df["stock_actuel"] = df["stock_actuel"].fillna(0).astype(np.int64)
+    df["prix_achat"] = df["prix_achat"].astype(np.float64).fillna(0.0)
+    df["tva_taux"] = df["tva_taux"].astype(np.float64).fillna(TVA_DEFAUT)
+
+    df["valeur_ht"] = df["stock_actuel"] * df["prix_achat"]
+    df["tva"] = df["valeur_ht"] * df["tva_taux"]
+    df["valeur_ttc"] = df["valeur_ht"] + df["tva"]
+    return df
+
+
+def build_valorisation(articles: Iterable, grouper_par: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Tableau de valorisation prêt à exporter: détail, sous-totaux éventuels, total
+
+    Args:
+        grouper_par: colonnes de GROUPES; chaque groupe est suivi de sa ligne
+            "Sous-total" (détail trié par groupe puis par code)
+
+    Returns:
+        DataFrame aux en-têtes comptables, montants arrondis au millime
+    """
+    grouper_par = list(grouper_par or [])
+    inconnus = set(grouper_par) - set(GROUPES)
+    if inconnus:
+        raise ValueError(f"Regroupement inconnu: {', '.join(sorted(inconnus))}")
+
+    df = valorisation_frame(articles)
+    df["_ordre"] = 0
+    morceaux = [df]
+
+    if grouper_par and len(df):
+        sous_totaux = df.groupby(grouper_par, sort=False)[SOMMES].sum().reset_index()
+        libelles = [
+            _libelle_groupe(colonne, sous_totaux[colonne]) for colonne in grouper_par
+        ]
+        sous_totaux["code"] = "Sous-total"
+        sous_totaux["designation"] = libelles[0].str.cat(libelles[1:], sep=" / ") if len(libelles) > 1 else libelles[0]
+        sous_totaux["_ordre"] = 1
+        morceaux.append(sous_totaux)
+
+    tableau = pd.concat(morceaux, ignore_index=True)
+    tableau = tableau.sort_values(grouper_par + ["_ordre", "code"], kind="mergesort", ignore_index=True)
+
+    total = df[SOMMES].sum()
+    ligne_total = pd.DataFrame([{**total.to_dict(), "code": "TOTAL", "designation": ""}])
+    tableau = pd.concat([tableau, ligne_total], ignore_index=True)
+
+    est_detail = tableau["_ordre"].eq(0)
+    tableau[MONTANTS + ["prix_achat"]] = tableau[MONTANTS + ["prix_achat"]].round(3)
+    tableau["stock_actuel"] = tableau["stock_actuel"].astype(np.int64)
+    # Prix, catégorie et taux n'ont de sens que sur les lignes de détail (sauf regroupement)
+    tableau["prix_achat"] = tableau["prix_achat"].where(est_detail, "")
+    taux = (tableau["tva_taux"] * 100).round(2).astype(str) + "%"
+    tableau["tva_taux"] = taux.where(tableau["tva_taux"].notna(), "")
+    tableau["categorie"] = tableau["categorie"].fillna("")
+
+    return tableau[list(ENTETES)].rename(columns=ENTETES)
+
+
+def column_widths(df: pd.DataFrame, marge: int = 2, maximum: int = 60) -> List[int]:
+    """Largeur de chaque colonne: plus longue valeur ou en-tête (longueurs calculées par colonne)"""
+    longueurs = [
+        max(len(str(colonne)), int(df[colonne].astype(str).str.len().max()) if len(df) else 0)
+        for colonne in df.columns
+    ]
+    return [min(longueur + marge, maximum) for longueur in longueurs]
+
+
+def _libelle_groupe(colonne: str, valeurs: pd.Series) -> pd.Series:
+    if colonne == "tva_taux":
+        return "TVA " + (valeurs * 100).round(2).astype(str) + "%"
+    return valeurs.astype(str)
@@ -0,0 +1,82 @@
+"""
+Benchmark: durée de génération et taille des exports de mouvements par format
+
+Les mouvements sont synthétiques et fournis par pages de 5000 lignes, comme le
+curseur keyset de l'export réel: seul le coût d'écriture est mesuré.
+Parquet est ignoré si pyarrow n'est pas installé.
+
+Usage:
+    python -m benchmarks.bench_exports [--lignes 1000000] [--formats csv,csv.gz,parquet,xlsx]
+"""
+import argparse
+import asyncio
+import inspect
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+from app.utils.export_writers import (
+    COLONNES_MOUVEMENTS, FormatIndisponibleError, export_pages, mouvement_values
+)
+
+TAILLE_PAGE = 5000
+TYPES = ["ENTREE", "SORTIE", "SORTIE", "SORTIE", "RETOUR", "AJUSTEMENT"]
+
+
+async def _pages(lignes: int, seed: int):
+    rng = random.Random(seed)
+    debut = datetime(2025, 1, 1)
+    for offset in range(0, lignes, TAILLE_PAGE):
+        page = []
+        for i in range(offset, min(offset + TAILLE_PAGE, lignes)):
+            quantite = rng.randint(1, 20)
+            prix = round(rng.uniform(0.5, 80), 3)
+            page.append(mouvement_values({
+                "date_mouvement": debut + timedelta(seconds=30 * i),
+                "type": rng.choice(TYPES),
+                "designation": f"Article {i % 4000}",
+                "code": f"ART{i % 4000:05d}",
+                "quantite": quantite,
+                "prix_unitaire": prix,
+                "valeur_totale": round(quantite * prix, 3),
+                "motif": "Vente caisse" if i % 3 else None,
+            }, brut=True))
+        yield page
+
+
+async def _mesurer(format: str, lignes: int, seed: int):
+    gzip = format == "csv.gz"
+    debut = perf_counter()
+    body, _, _ = await export_pages(format.split(".")[0], "Mouvements", COLONNES_MOUVEMENTS, _pages(lignes, seed), gzip)
+    taille = 0
+    if inspect.isasyncgen(body):
+        async for bloc in body:
+            taille += len(bloc)
+    else:
+        for bloc in body:
+            taille += len(bloc)
+    return perf_counter() - debut, taille
+
+
+async def main_async(lignes: int, formats, seed: int):
+    print(f"{lignes} mouvements, pages de {TAILLE_PAGE}")
+    print(f"  {'format':<10} {'durée':>10} {'taille':>12} {'lignes/s':>12}")
+    for format in formats:
+        try:
+            duree, taille = await _mesurer(format, lignes, seed)
+        except FormatIndisponibleError as e:
+            print(f"  {format:<10} ignoré ({e})")
+            continue
+        print(f"  {format:<10} {duree:9.2f}s {taille / 1e6:10.1f}MB {lignes / duree:12.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lignes", type=int, default=1_000_000)
+    parser.add_argument("--formats", default="csv,csv.gz,parquet,xlsx")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args.lignes, args.formats.split(","), args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark: métriques de prévision vectorisées vs calcul article par article
+
+Usage:
+    python -m benchmarks.bench_forecast_metrics [--series 40000] [--points 57]
+"""
+import argparse
+from time import perf_counter
+import numpy as np
+from app.utils.forecast_metrics import compute_metrics, mape, wmape
+
+
+def legacy_metrics(historique, prevision):
+    """Ancien AIForecastService._calculate_metrics (listes Python, une série)"""
+    mape_value = np.mean([abs((h - prevision) / h) for h in historique if h > 0]) * 100
+    total_actual = sum(historique)
+    total_error = sum([abs(h - prevision) for h in historique])
+    wmape_value = (total_error / total_actual * 100) if total_actual > 0 else 0
+    return {"mape": mape_value, "wmape": wmape_value}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=40000)
+    parser.add_argument("--points", type=int, default=57)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    historiques = rng.poisson(6, size=(args.series, args.points)).astype(np.float64) + 1
+    previsions = historiques.mean(axis=1)
+
+    debut = perf_counter()
+    legacy = [legacy_metrics(list(h), p) for h, p in zip(historiques, previsions)]
+    duree_legacy = perf_counter() - debut
+
+    debut = perf_counter()
+    metriques = compute_metrics(historiques, previsions)
+    duree_vectorise = perf_counter() - debut
+
+    np.testing.assert_allclose([m["mape"] for m in legacy], mape(historiques, previsions))
+    np.testing.assert_allclose([m["wmape"] for m in legacy], wmape(historiques, previsions))
+
+    print(f"{args.series} séries × {args.points} points")
+    print(f"  article par article (mape+wmape)      : {duree_legacy * 1000:10.1f} ms")
+    print(f"  vectorisé (mape+wmape+bias+cov+rmse)  : {duree_vectorise * 1000:10.1f} ms")
+    print(f"  accélération                          : {duree_legacy / duree_vectorise:10.1f}x")
+    print(f"  métriques calculées                   : {', '.join(metriques)}")
+
+
+if __name__ == "__main__":
+    main()
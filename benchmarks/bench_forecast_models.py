@@ -0,0 +1,33 @@
+"""
+Benchmark: précision et vitesse des modèles de prévision sur données synthétiques
+
+Usage:
+    python -m benchmarks.bench_forecast_models [--series 3000] [--jours 112] [--horizon 7] [--seed 0]
+"""
+import argparse
+from app.utils.backtest import backtest_models, synthetic_demand
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=3000)
+    parser.add_argument("--jours", type=int, default=112)
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    quantites = synthetic_demand(args.series, args.jours, args.seed)
+    rapport = backtest_models(quantites, horizon=args.horizon)
+
+    origines = next(iter(rapport.values()))["nb_origines"]
+    print(f"{args.series} séries × {args.jours} jours, horizon {args.horizon} j, {origines} origines")
+    print(f"  {'modèle':<24} {'MAPE':>8} {'WMAPE':>8} {'biais':>8} {'durée':>10} {'µs/série':>10}")
+    for modele, r in rapport.items():
+        print(
+            f"  {modele:<24} {r['mape']:7.2f}% {r['wmape']:7.2f}% {r['bias']:7.2f}% "
+            f"{r['duree_ms']:8.1f}ms {r['ms_par_serie'] * 1000 / origines:10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
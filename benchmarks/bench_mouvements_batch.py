@@ -0,0 +1,77 @@
+"""
+Benchmark: ingestion de mouvements un par un vs en lot (base PostgreSQL requise)
+
+Crée une entreprise, un magasin et des articles de test dans la base de
+DATABASE_URL, mesure les deux chemins puis supprime les données.
+
+Usage:
+    python -m benchmarks.bench_mouvements_batch [--mouvements 2000] [--articles 50]
+"""
+import argparse
+import asyncio
+import random
+from time import perf_counter
+from uuid import uuid4
+from app.core.database import prisma, connect_db, disconnect_db
+from app.schemas.mouvement import MouvementStockCreate
+from app.services.mouvement_service import MouvementService
+
+
+def _mouvements(articles, magasin_id, nombre, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "type": rng.choice(["sortie", "sortie", "sortie", "retour"]),
+            "quantite": rng.randint(1, 3),
+            "article_id": rng.choice(articles).id,
+            "magasin_id": magasin_id
+        }
+        for _ in range(nombre)
+    ]
+
+
+async def run(nb_mouvements: int, nb_articles: int):
+    await connect_db()
+    suffixe = uuid4().hex[:8]
+    entreprise = await prisma.entreprise.create(data={"nom": f"Benchmark {suffixe}"})
+    try:
+        magasin = await prisma.magasin.create(
+            data={"nom": "Benchmark", "code": f"BENCH-{suffixe}", "entreprise_id": entreprise.id}
+        )
+        await prisma.article.create_many(data=[
+            {"code": f"B{i:04d}", "designation": f"Article {i}", "stock_actuel": 100000, "magasin_id": magasin.id}
+            for i in range(nb_articles)
+        ])
+        articles = await prisma.article.find_many(where={"magasin_id": magasin.id})
+
+        unitaires = _mouvements(articles, magasin.id, nb_mouvements, seed=1)
+        debut = perf_counter()
+        for mouvement in unitaires:
+            await MouvementService.create_mouvement(MouvementStockCreate(**mouvement))
+        duree_unitaire = perf_counter() - debut
+
+        lot = _mouvements(articles, magasin.id, nb_mouvements, seed=2)
+        debut = perf_counter()
+        resultat = await MouvementService.create_mouvements_batch(lot)
+        duree_lot = perf_counter() - debut
+        assert resultat["crees"] == nb_mouvements
+
+        print(f"{nb_mouvements} mouvements sur {nb_articles} articles")
+        print(f"  un par un : {duree_unitaire * 1000:10.1f} ms  ({nb_mouvements / duree_unitaire:8.0f} mvt/s)")
+        print(f"  en lot    : {duree_lot * 1000:10.1f} ms  ({nb_mouvements / duree_lot:8.0f} mvt/s)")
+        print(f"  accélération: {duree_unitaire / duree_lot:.1f}x")
+    finally:
+        await prisma.entreprise.delete(where={"id": entreprise.id})
+        await disconnect_db()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mouvements", type=int, default=2000)
+    parser.add_argument("--articles", type=int, default=50)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.mouvements, args.articles))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: page 1 vs page profonde des mouvements, en offset (skip/take) et en keyset (base PostgreSQL requise)
+
+Crée une entreprise, un magasin, des articles et des mouvements de test dans
+la base de DATABASE_URL, mesure GET /mouvements/magasin/{id} (service) pour la
+première page et pour la page `--page` avec les deux paginations, puis supprime
+les données. Le curseur de la page profonde est calculé hors mesure.
+
+Usage:
+    python -m benchmarks.bench_pagination [--page 1000] [--limit 100] [--repetitions 5]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+from datetime import datetime, timedelta
+from time import perf_counter
+from uuid import uuid4
+from app.core.database import prisma, connect_db, disconnect_db
+from app.services.mouvement_service import MouvementService
+from app.utils.pagination import encode_cursor
+
+TAILLE_LOT = 5000
+
+
+async def _inserer_mouvements(articles, magasin_id, nombre, seed):
+    rng = random.Random(seed)
+    debut = datetime.now() - timedelta(days=365)
+    for offset in range(0, nombre, TAILLE_LOT):
+        await prisma.mouvementstock.create_many(data=[
+            {
+                "type": rng.choice(["SORTIE", "SORTIE", "SORTIE", "ENTREE"]),
+                "quantite": rng.randint(1, 5),
+                "date_mouvement": debut + timedelta(seconds=20 * i),
+                "article_id": rng.choice(articles).id,
+                "magasin_id": magasin_id
+            }
+            for i in range(offset, min(offset + TAILLE_LOT, nombre))
+        ])
+
+
+async def _mediane_ms(repetitions, appel):
+    durees = []
+    for _ in range(repetitions):
+        debut = perf_counter()
+        lignes, _ = await appel()
+        durees.append((perf_counter() - debut) * 1000)
+    return statistics.median(durees), len(lignes)
+
+
+async def run(page: int, limit: int, nb_articles: int, repetitions: int):
+    await connect_db()
+    suffixe = uuid4().hex[:8]
+    entreprise = await prisma.entreprise.create(data={"nom": f"Benchmark {suffixe}"})
+    try:
+        magasin = await prisma.magasin.create(
+            data={"nom": "Benchmark", "code": f"BENCH-{suffixe}", "entreprise_id": entreprise.id}
+        )
+        await prisma.article.create_many(data=[
+            {"code": f"B{i:04d}", "designation": f"Article {i}", "magasin_id": magasin.id}
+            for i in range(nb_articles)
+        ])
+        articles = await prisma.article.find_many(where={"magasin_id": magasin.id})
+
+        nb_mouvements = page * limit + limit
+        debut = perf_counter()
+        await _inserer_mouvements(articles, magasin.id, nb_mouvements, seed=1)
+        print(f"{nb_mouvements} mouvements insérés en {perf_counter() - debut:.1f} s")
+        await prisma.execute_raw("ANALYZE mouvements_stock")
+
+        # Dernière ligne de la page précédente: curseur de la page profonde
+        precedente = await prisma.mouvementstock.find_many(
+            where={"magasin_id": magasin.id},
+            order=[{"date_mouvement": "desc"}, {"id": "desc"}],
+            skip=(page - 1) * limit - 1,
+            take=1
+        )
+        cursor = encode_cursor(precedente[0].date_mouvement, precedente[0].id)
+
+        cas = {
+            "offset  page 1": lambda: MouvementService.get_mouvements_by_magasin(magasin.id, limit=limit),
+            f"offset  page {page}": lambda: MouvementService.get_mouvements_by_magasin(
+                magasin.id, skip=(page - 1) * limit, limit=limit
+            ),
+            "keyset  page 1": lambda: MouvementService.get_mouvements_by_magasin(magasin.id, limit=limit),
+            f"keyset  page {page}": lambda: MouvementService.get_mouvements_by_magasin(
+                magasin.id, limit=limit, cursor=cursor
+            ),
+        }
+        print(f"Pages de {limit} lignes, médiane sur {repetitions} appels")
+        for nom, appel in cas.items():
+            duree_ms, lignes = await _mediane_ms(repetitions, appel)
+            print(f"  {nom:<20}: {duree_ms:10.1f} ms  ({lignes} lignes)")
+    finally:
+        await prisma.entreprise.delete(where={"id": entreprise.id})
+        await disconnect_db()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.page, args.limit, args.articles, args.repetitions))
+
+
+if __name__ == "__main__":
+    main()
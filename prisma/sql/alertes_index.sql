@@ -0,0 +1,21 @@
+-- Une seule alerte ouverte par article et type suivi (TYPES_SUIVIS de app/utils/alert_rules.py)
+--
+-- Index unique partiel, que Prisma ne sait pas déclarer: appliqué après
+-- `prisma db push` par `make migrate`. Le fichier est idempotent et doit être
+-- rejoué après chaque push.
+
+-- Doublons ouverts hérités: seule la plus récente reste ouverte
+UPDATE alertes a
+SET est_resolue = true, date_resolution = NOW()
+WHERE NOT a.est_resolue
+  AND a.article_id IS NOT NULL
+  AND a.type IN ('RUPTURE', 'SEUIL_BAS', 'PEREMPTION')
+  AND EXISTS (
+    SELECT 1 FROM alertes b
+    WHERE b.article_id = a.article_id AND b.type = a.type AND NOT b.est_resolue
+      AND (b.date_alerte, b.id) > (a.date_alerte, a.id)
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS alertes_ouvertes_uniq
+    ON alertes (article_id, type)
+    WHERE NOT est_resolue AND article_id IS NOT NULL AND type IN ('RUPTURE', 'SEUIL_BAS', 'PEREMPTION');
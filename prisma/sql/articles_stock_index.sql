@@ -0,0 +1,18 @@
+-- Index partiels des requêtes de stock (app/services/stock_query_service.py)
+--
+-- Prisma ne sait pas déclarer d'index partiel ni d'index sur expression:
+-- ils sont appliqués après `prisma db push` par `make migrate`. Le fichier
+-- est idempotent, et db push supprimant les index absents du schéma, il doit
+-- être rejoué après chaque push.
+
+-- Totaux du stock actif (RESUME_SQL): index-only scan, sans lire la table
+CREATE INDEX IF NOT EXISTS articles_actifs_stock_idx
+    ON articles (magasin_id)
+    INCLUDE (stock_actuel, stock_min, prix_achat, prix_vente)
+    WHERE is_active;
+
+-- Articles en stock faible (FAIBLES_SQL): ne contient que les articles
+-- concernés, déjà dans l'ordre de la requête
+CREATE INDEX IF NOT EXISTS articles_faibles_idx
+    ON articles (magasin_id, (stock_actuel - stock_min), code)
+    WHERE is_active AND stock_actuel <= stock_min;
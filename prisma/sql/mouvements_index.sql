@@ -0,0 +1,13 @@
+-- Index partiels des mouvements de stock
+--
+-- Appliqués après `prisma db push` par `make migrate` (Prisma ne sait pas
+-- déclarer d'index partiel). Le fichier est idempotent et doit être rejoué
+-- après chaque push.
+
+-- Dernière entrée fournisseur d'un article (ARTICLES_REAPPRO_SQL,
+-- app/services/reorder_service.py): seuls les mouvements avec fournisseur,
+-- du plus récent au plus ancien
+CREATE INDEX IF NOT EXISTS mouvements_fournisseur_idx
+    ON mouvements_stock (article_id, date_mouvement DESC)
+    INCLUDE (fournisseur_id)
+    WHERE fournisseur_id IS NOT NULL;
@@ -0,0 +1,16 @@
+-- Entreprise des transferts existants (TransfertStock.entreprise_id)
+--
+-- Exécuté par `make migrate` AVANT `prisma db push`: la colonne est ajoutée
+-- nullable et remplie depuis le magasin d'origine, puis db push la rend
+-- obligatoire et pose la contrainte unique (entreprise_id, reference).
+-- Idempotent; sans effet sur une base neuve (table absente).
+DO $$
+BEGIN
+    IF to_regclass('transferts_stock') IS NOT NULL THEN
+        ALTER TABLE transferts_stock ADD COLUMN IF NOT EXISTS entreprise_id TEXT;
+        UPDATE transferts_stock t
+        SET entreprise_id = m.entreprise_id
+        FROM magasins m
+        WHERE m.id = t.magasin_origine_id AND t.entreprise_id IS NULL;
+    END IF;
+END $$;
@@ -154,6 +154,7 @@ async def seed_database():
     # Créer des jours fériés tunisiens 2025
     jours_feries = [
         {"date": "2025-01-01", "nom": "Nouvel An", "impact_estime": 1.2},
+        {"date": "2025-03-01", "date_fin": "2025-03-29", "nom": "Ramadan (estimé)", "type": "RELIGIEUSE", "impact_estime": 1.3},
         {"date": "2025-03-20", "nom": "Fête de l'Indépendance", "impact_estime": 1.3},
         {"date": "2025-03-30", "nom": "Aïd el-Fitr (estimé)", "impact_estime": 2.0},
         {"date": "2025-04-09", "nom": "Journée des Martyrs", "impact_estime": 1.1},
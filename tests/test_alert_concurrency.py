@@ -0,0 +1,49 @@
+"""
+Test de concurrence du moteur d'alertes sur une vraie base PostgreSQL
+
+Nécessite un client Prisma généré et STOCKFLOW_TEST_DATABASE=1 (la base de
+DATABASE_URL reçoit des données de test, supprimées en fin de test), avec
+prisma/sql/alertes_index.sql appliqué.
+"""
+import asyncio
+import os
+from uuid import uuid4
+import pytest
+
+if os.environ.get("STOCKFLOW_TEST_DATABASE") != "1":
+    pytest.skip("STOCKFLOW_TEST_DATABASE=1 requis (base PostgreSQL de test)", allow_module_level=True)
+
+from app.core.database import prisma, connect_db, disconnect_db
+from app.services.alert_engine import AlertEngine
+
+
+async def test_evaluations_concurrentes_une_seule_alerte():
+    """Test: scans et évaluations incrémentales simultanés n'ouvrent qu'une alerte par article et type"""
+    await connect_db()
+    suffixe = uuid4().hex[:8]
+    entreprise = await prisma.entreprise.create(data={"nom": f"Test alertes {suffixe}"})
+    try:
+        magasin = await prisma.magasin.create(
+            data={"nom": "Magasin test", "code": f"TST-{suffixe}", "entreprise_id": entreprise.id}
+        )
+        article = await prisma.article.create(
+            data={"code": "A1", "designation": "Article test", "stock_actuel": 0, "stock_min": 5, "magasin_id": magasin.id}
+        )
+
+        # Instances distinctes: rien n'est partagé en mémoire, comme entre deux processus
+        await asyncio.gather(
+            *(AlertEngine().evaluate_articles(magasin.id, [article.id]) for _ in range(10)),
+            *(AlertEngine().run(magasin.id) for _ in range(2))
+        )
+
+        ouvertes = await prisma.alerte.find_many(
+            where={"article_id": article.id, "est_resolue": False, "type": "RUPTURE"}
+        )
+        assert len(ouvertes) == 1
+
+        await prisma.article.update(where={"id": article.id}, data={"stock_actuel": 50})
+        await asyncio.gather(*(AlertEngine().evaluate_articles(magasin.id, [article.id]) for _ in range(5)))
+        assert await prisma.alerte.count(where={"article_id": article.id, "est_resolue": False}) == 0
+    finally:
+        await prisma.entreprise.delete(where={"id": entreprise.id})
+        await disconnect_db()
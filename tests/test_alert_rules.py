@@ -0,0 +1,96 @@
+from app.utils.alert_rules import classify_article, classify_articles, diff_alert_states
+
+
+def _article(**kwargs):
+    article = {
+        "id": "article-1",
+        "designation": "Lait Délice 1L",
+        "stock_actuel": 20,
+        "stock_min": 10,
+        "jours_peremption": None
+    }
+    article.update(kwargs)
+    return article
+
+
+def test_classify_rupture():
+    """Test d'une rupture de stock (prioritaire sur le seuil bas)"""
+    alertes = classify_article(_article(stock_actuel=0))
+    assert [a["type"] for a in alertes] == ["RUPTURE"]
+    assert alertes[0]["niveau"] == "CRITIQUE"
+
+
+def test_classify_seuil_bas_et_peremption():
+    """Test d'un article en stock faible et proche de la péremption"""
+    alertes = classify_article(_article(stock_actuel=5, jours_peremption=3))
+    assert [a["type"] for a in alertes] == ["SEUIL_BAS", "PEREMPTION"]
+    assert alertes[1]["niveau"] == "ELEVE"
+
+
+def test_classify_article_sain():
+    """Test d'un article sans alerte"""
+    assert classify_article(_article(jours_peremption=45)) == []
+    assert classify_article(_article(jours_peremption=0)) == []
+
+
+def test_classify_articles_compteurs():
+    """Test de la classification d'un magasin en une passe"""
+    articles = [
+        _article(id="a1", stock_actuel=0),
+        _article(id="a2", stock_actuel=3),
+        _article(id="a3", jours_peremption=15),
+        _article(id="a4")
+    ]
+    resultat = classify_articles(articles, "magasin-1")
+
+    assert resultat["compteurs"] == {"RUPTURE": 1, "SEUIL_BAS": 1, "PEREMPTION": 1}
+    assert len(resultat["alertes"]) == 3
+    assert all(a["magasin_id"] == "magasin-1" for a in resultat["alertes"])
+    assert resultat["alertes"][2]["niveau"] == "MOYEN"
+
+
+def test_diff_transitions():
+    """Test du diff d'état: création, escalade et résolution"""
+    etat = {
+        "a1:PEREMPTION": ["alerte-1", "MOYEN"],
+        "a2:SEUIL_BAS": ["alerte-2", "ELEVE"],
+        "a3:RUPTURE": ["alerte-3", "CRITIQUE"]
+    }
+    courantes = classify_articles([
+        _article(id="a1", jours_peremption=3),
+        _article(id="a2", stock_actuel=4),
+        _article(id="a4", stock_actuel=0)
+    ], "magasin-1")["alertes"]
+
+    diff = diff_alert_states(etat, courantes)
+
+    assert [a["article_id"] for a in diff["a_creer"]] == ["a4"]
+    assert diff["a_escalader"] == [{
+        "id": "alerte-1", "niveau": "ELEVE", "message": "Péremption proche: Lait Délice 1L (dans 3 jours)"
+    }]
+    assert diff["a_resoudre"] == ["alerte-3"]
+    assert diff["etat"]["a2:SEUIL_BAS"] == ["alerte-2", "ELEVE"]
+    assert diff["etat"]["a1:PEREMPTION"] == ["alerte-1", "ELEVE"]
+    assert "a3:RUPTURE" not in diff["etat"]
+
+
+def test_diff_sans_changement():
+    """Test de l'idempotence: un second passage n'écrit rien"""
+    courantes = classify_articles([_article(id="a1", stock_actuel=0)], "magasin-1")["alertes"]
+    premier = diff_alert_states({}, courantes)
+    second = diff_alert_states(premier["etat"], classify_articles(
+        [_article(id="a1", stock_actuel=0)], "magasin-1"
+    )["alertes"])
+
+    assert len(premier["a_creer"]) == 1
+    assert second["a_creer"] == second["a_escalader"] == second["a_resoudre"] == []
+    assert second["etat"] == premier["etat"]
+
+
+def test_diff_perimetre():
+    """Test d'un diff limité à un article: les autres clés sont conservées"""
+    etat = {"a1:SEUIL_BAS": ["alerte-1", "ELEVE"], "a2:RUPTURE": ["alerte-2", "CRITIQUE"]}
+    diff = diff_alert_states(etat, [], perimetre={"a1"})
+
+    assert diff["a_resoudre"] == ["alerte-1"]
+    assert diff["etat"] == {"a2:RUPTURE": ["alerte-2", "CRITIQUE"]}
@@ -0,0 +1,54 @@
+"""
+Tests de l'activité dénormalisée des articles (effet d'un lot de mouvements)
+"""
+from datetime import datetime, timedelta, timezone
+from app.utils.article_activity import activity_deltas
+
+MAINTENANT = datetime(2024, 6, 30, 12, 0, tzinfo=timezone.utc)
+
+
+def _mouvement(article_id, type_mouvement, quantite, jours):
+    return {"article_id": article_id, "type": type_mouvement, "quantite": quantite,
+            "date_mouvement": MAINTENANT - timedelta(days=jours)}
+
+
+def test_fenetres_glissantes_et_dernieres_dates():
+    """Sorties comptées par fenêtre, dates = mouvement le plus récent de chaque sens"""
+    activite = activity_deltas([
+        _mouvement("a1", "sortie", 3, 1),
+        _mouvement("a1", "SORTIE", 5, 10),
+        _mouvement("a1", "SORTIE", 7, 40),
+        _mouvement("a1", "entree", 20, 15),
+    ], MAINTENANT)
+
+    assert activite["a1"] == {
+        "last_entree_at": MAINTENANT - timedelta(days=15),
+        "last_sortie_at": MAINTENANT - timedelta(days=1),
+        "sold_7d": 3,
+        "sold_28d": 8,
+    }
+
+
+def test_types_ignores():
+    """Ajustements, retours et transferts ne touchent pas l'activité"""
+    mouvements = [_mouvement("a1", t, 4, 0) for t in ("AJUSTEMENT", "retour", "TRANSFERT")]
+    assert activity_deltas(mouvements, MAINTENANT) == {}
+
+
+def test_dates_normalisees_en_utc():
+    """Dates avec fuseau ramenées en UTC, dates naïves lues comme UTC"""
+    tunis = timezone(timedelta(hours=1))
+    mouvements = [
+        # 6 jours et 23 h avant MAINTENANT une fois en UTC: dans la fenêtre de 7 jours
+        {"article_id": "a1", "type": "SORTIE", "quantite": 2,
+         "date_mouvement": datetime(2024, 6, 23, 14, 0, tzinfo=tunis)},
+        {"article_id": "a2", "type": "SORTIE", "quantite": 3,
+         "date_mouvement": datetime(2024, 6, 23, 11, 0)},
+    ]
+    activite = activity_deltas(mouvements, MAINTENANT.replace(tzinfo=None))
+
+    assert activite["a1"]["sold_7d"] == 2
+    assert activite["a1"]["last_sortie_at"] == datetime(2024, 6, 23, 13, 0, tzinfo=timezone.utc)
+    assert activite["a1"]["last_sortie_at"].utcoffset() == timedelta(0)
+    assert activite["a2"]["sold_7d"] == 0
+    assert activite["a2"]["sold_28d"] == 3
@@ -0,0 +1,34 @@
+import numpy as np
+from app.utils.backtest import AUTO, backtest_models, rolling_origins, synthetic_demand
+
+
+def test_rolling_origins():
+    """Test des origines: uniquement des horizons complets"""
+    assert rolling_origins(56, 7, 28, 7) == [28, 35, 42, 49]
+    assert rolling_origins(30, 7, 28, 7) == []
+
+
+def test_synthetic_demand_reproductible():
+    """Test des données synthétiques: même graine, même historique"""
+    a = synthetic_demand(30, 56, seed=3)
+    assert a.shape == (30, 56)
+    np.testing.assert_array_equal(a, synthetic_demand(30, 56, seed=3))
+
+
+def test_backtest_serie_constante():
+    """Test du backtest: une demande constante est prévue sans erreur par la moyenne pondérée"""
+    quantites = np.full((4, 56), 5.0)
+    rapport = backtest_models(quantites, modeles=["weighted_moving_average", AUTO])
+
+    assert rapport["weighted_moving_average"]["mape"] == 0.0
+    assert rapport["weighted_moving_average"]["wmape"] == 0.0
+    assert rapport["weighted_moving_average"]["nb_origines"] == 4
+    assert rapport[AUTO]["nb_series"] == 4
+
+
+def test_backtest_tous_les_modeles():
+    """Test du rapport par défaut: chaque modèle enregistré + sélection automatique"""
+    rapport = backtest_models(synthetic_demand(60, 84))
+
+    assert set(rapport) == {"weighted_moving_average", "holt_winters", "croston", AUTO}
+    assert all(r["wmape"] > 0 and r["duree_ms"] >= 0 for r in rapport.values())
@@ -0,0 +1,64 @@
+"""
+Tests des endpoints de réapprovisionnement (entreprise résolue depuis le token)
+
+Nécessite un client Prisma généré (import des services); la base est remplacée
+par un double et les services par des fonctions qui enregistrent leurs appels.
+"""
+from types import SimpleNamespace
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+try:
+    from app.api.v1.endpoints import bons_commande
+except RuntimeError:
+    pytest.skip("client Prisma non généré (prisma generate)", allow_module_level=True)
+
+from app.core.database import get_db
+from app.core.security import create_access_token
+
+
+class _Users:
+    async def find_unique(self, where):
+        if where["id"] == "u1":
+            return SimpleNamespace(id="u1", entreprise_id="e1")
+        return None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    appels = []
+
+    async def plan(entreprise_id, magasin_id=None):
+        appels.append(("plan", entreprise_id, magasin_id))
+        return {"total_articles": 0, "fournisseurs": []}
+
+    async def create_draft_orders(entreprise_id, magasin_id=None):
+        appels.append(("brouillons", entreprise_id, magasin_id))
+        return []
+
+    monkeypatch.setattr(bons_commande.ReorderService, "plan", plan)
+    monkeypatch.setattr(bons_commande.ReorderService, "create_draft_orders", create_draft_orders)
+    app = FastAPI()
+    app.include_router(bons_commande.router)
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(user=_Users())
+    return TestClient(app), appels
+
+
+def _headers(user_id):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id, 'role': 'patron'})}"}
+
+
+def test_suggestions_et_brouillons_de_l_entreprise_de_l_utilisateur(client):
+    """Test: l'entreprise vient de l'utilisateur du token, pas d'un attribut du payload"""
+    http, appels = client
+    assert http.get("/bons-commande/suggestions?magasin_id=m1", headers=_headers("u1")).status_code == 200
+    assert http.post("/bons-commande/suggestions/brouillons", headers=_headers("u1")).status_code == 201
+    assert appels == [("plan", "e1", "m1"), ("brouillons", "e1", None)]
+
+
+def test_utilisateur_inconnu(client):
+    """Test: token d'un utilisateur supprimé → 401"""
+    http, appels = client
+    assert http.get("/bons-commande/suggestions", headers=_headers("inconnu")).status_code == 401
+    assert appels == []
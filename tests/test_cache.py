@@ -0,0 +1,41 @@
+"""
+Tests du cache mémoire (verrou de lecture-modification-écriture, compteurs)
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+from app.core.cache import MemoryCache
+from app.utils.dashboard_snapshot import apply_stock_changes, build_snapshot
+
+
+async def test_incr():
+    """Test: incr part de 0 et conserve l'expiration de la clé"""
+    cache = MemoryCache()
+    await cache.set("k", "5", ttl=100)
+    assert await cache.incr("k", 3) == 8
+    assert await cache.incr("n") == 1
+    assert cache._data["k"][1] is not None
+
+
+async def test_mises_a_jour_entrelacees_du_snapshot():
+    """Test: deltas appliqués en parallèle sous le verrou, aucun n'est perdu"""
+    cache = MemoryCache()
+    resume = {"total_articles": 20, "valeur_achat": 400.0, "faibles": 0, "ruptures": 0}
+    await cache.set("dashboard:m1", json.dumps(build_snapshot(resume, [], datetime.now(timezone.utc))))
+
+    async def appliquer(i):
+        async with cache.lock("dashboard:verrou:m1", 30):
+            snapshot = json.loads(await cache.get("dashboard:m1"))
+            # Point d'entrelacement: sans verrou, les autres tâches liraient le même état
+            await asyncio.sleep(0)
+            apply_stock_changes(snapshot, [{
+                "id": f"a{i}", "code": f"C{i:03d}", "designation": f"Article {i}", "stock_min": 5,
+                "prix_achat": 2.0, "stock_avant": 10, "stock_apres": 0
+            }])
+            await cache.set("dashboard:m1", json.dumps(snapshot))
+
+    await asyncio.gather(*(appliquer(i) for i in range(20)))
+
+    snapshot = json.loads(await cache.get("dashboard:m1"))
+    assert snapshot["ruptures"] == snapshot["faibles"] == 20
+    assert snapshot["valeur"] == 0
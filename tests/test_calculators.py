@@ -0,0 +1,27 @@
+"""
+Tests des utilitaires de calcul (tranches d'ancienneté du stock dormant)
+"""
+from app.utils.calculators import ageing_buckets
+
+
+def _dormant(jours, valeur):
+    return {"jours_sans_sortie": jours, "valeur_immobilisee": valeur}
+
+
+def test_tranches_anciennete():
+    """Bornes basses incluses, dernière tranche ouverte, tranches vides conservées"""
+    tranches = ageing_buckets([_dormant(30, 10.0), _dormant(59, 5.5), _dormant(90, 1.0), _dormant(400, 2.25)])
+    assert [(t["tranche"], t["nombre_articles"], t["valeur_immobilisee"]) for t in tranches] == [
+        ("30-59", 2, 15.5),
+        ("60-89", 0, 0.0),
+        ("90-179", 1, 1.0),
+        ("180+", 1, 2.25),
+    ]
+
+
+def test_tranche_sous_le_premier_seuil():
+    """Période de détection courte: tranche 0-29 ajoutée seulement si elle est utilisée"""
+    assert ageing_buckets([])[0]["tranche"] == "30-59"
+    tranches = ageing_buckets([_dormant(7, 3.0)])
+    assert tranches[0] == {"tranche": "0-29", "jours_min": 0, "nombre_articles": 1, "valeur_immobilisee": 3.0}
+    assert len(tranches) == 5
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+import numpy as np
+from app.utils.calendrier import CalendrierImpact, deseasonalize, apply_impact
+
+
+def _calendrier():
+    return CalendrierImpact.from_entries([
+        {"date": datetime(2025, 3, 1), "date_fin": datetime(2025, 3, 29), "impact_estime": 1.3},
+        {"date": "2025-03-20", "date_fin": None, "impact_estime": 1.5},
+        {"date": date(2025, 3, 30), "impact_estime": 2.0},
+        {"date": date(2025, 5, 1), "impact_estime": 1.0},
+        {"date": date(2025, 5, 2), "impact_estime": None}
+    ])
+
+
+def test_index_periodes_et_cumul():
+    """Test de l'index: période Ramadan étendue jour par jour, chevauchements multipliés"""
+    calendrier = _calendrier()
+
+    assert calendrier.facteur(date(2025, 3, 15)) == 1.3
+    assert calendrier.facteur(datetime(2025, 3, 20, 10, 0)) == 1.3 * 1.5
+    assert calendrier.facteur(date(2025, 3, 30)) == 2.0
+    assert calendrier.facteur(date(2025, 5, 1)) == 1.0
+    assert len(calendrier) == 30
+
+
+def test_facteurs_et_serialisation():
+    """Test du vecteur de facteurs et de l'aller-retour JSON du cache"""
+    calendrier = CalendrierImpact.from_dict(_calendrier().to_dict())
+    np.testing.assert_allclose(calendrier.facteurs(date(2025, 2, 27), 4), [1.0, 1.0, 1.3, 1.3])
+
+
+def test_desaisonnalisation_et_horizon():
+    """Test: un pic de jour férié est neutralisé dans l'historique puis réappliqué sur l'horizon"""
+    facteurs = np.array([1.0, 2.0, 1.0])
+    quantites = np.array([[10.0, 20.0, 10.0]])
+
+    np.testing.assert_allclose(deseasonalize(quantites, facteurs), [[10, 10, 10]])
+    np.testing.assert_allclose(apply_impact(np.array([[10.0, 10.0, 10.0]]), facteurs), quantites)
@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+from app.crons.runner import run_for_tenants
+
+
+def _magasins(n):
+    return [SimpleNamespace(id=f"m{i}", code=f"MAG{i}") for i in range(n)]
+
+
+def test_parallelisme_borne():
+    """Test du sémaphore: jamais plus de `concurrency` tenants en même temps"""
+    en_cours = {"courant": 0, "max": 0}
+
+    async def worker(magasin):
+        en_cours["courant"] += 1
+        en_cours["max"] = max(en_cours["max"], en_cours["courant"])
+        await asyncio.sleep(0.01)
+        en_cours["courant"] -= 1
+        return magasin.code
+
+    resume = asyncio.run(run_for_tenants("test", _magasins(10), worker, concurrency=3, timeout=5))
+
+    assert resume["succes"] == 10
+    assert en_cours["max"] == 3
+    assert sorted(r["resultat"] for r in resume["tenants"]) == sorted(f"MAG{i}" for i in range(10))
+
+
+def test_echecs_et_timeouts_isoles():
+    """Test de l'isolation: une erreur ou un timeout n'arrête pas les autres tenants"""
+    async def worker(magasin):
+        if magasin.id == "m0":
+            raise RuntimeError("base indisponible")
+        if magasin.id == "m1":
+            await asyncio.sleep(1)
+        return "ok"
+
+    resume = asyncio.run(run_for_tenants(
+        "test", _magasins(4), worker, name=lambda m: m.code, concurrency=4, timeout=0.05
+    ))
+    statuts = {r["tenant"]: r["statut"] for r in resume["tenants"]}
+
+    assert statuts == {"MAG0": "erreur", "MAG1": "timeout", "MAG2": "ok", "MAG3": "ok"}
+    assert (resume["succes"], resume["erreurs"], resume["timeouts"]) == (2, 1, 1)
+    assert all("duree_ms" in r for r in resume["tenants"])
@@ -0,0 +1,91 @@
+"""
+Tests du snapshot du tableau de bord (mise à jour incrémentale)
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.utils.dashboard_snapshot import (
+    TAILLE_TAMPON, TOP_N, apply_stock_changes, build_snapshot, deja_compte, to_stats
+)
+
+CONSTRUIT_LE = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _article(i, stock, stock_min=5, prix=2.0):
+    return {"id": f"a{i}", "code": f"C{i:03d}", "designation": f"Article {i}",
+            "stock_actuel": stock, "stock_min": stock_min, "prix_achat": prix}
+
+
+def _changement(article, apres):
+    return {**article, "stock_avant": article["stock_actuel"], "stock_apres": apres}
+
+
+def _snapshot(articles):
+    """Snapshot tel que construit depuis la base"""
+    faibles = sorted(
+        (a for a in articles if a["stock_actuel"] <= a["stock_min"]),
+        key=lambda a: (a["stock_actuel"] - a["stock_min"], a["code"])
+    )
+    resume = {
+        "total_articles": len(articles),
+        "valeur_achat": sum(a["stock_actuel"] * a["prix_achat"] for a in articles),
+        "faibles": len(faibles),
+        "ruptures": sum(a["stock_actuel"] == 0 for a in articles),
+    }
+    return build_snapshot(resume, faibles[:TAILLE_TAMPON], CONSTRUIT_LE)
+
+
+def test_compteurs_et_valeur_par_difference():
+    """Passage en rupture puis réapprovisionnement: mêmes valeurs qu'une reconstruction"""
+    articles = [_article(1, 20), _article(2, 3), _article(3, 8)]
+    snapshot = _snapshot(articles)
+
+    assert not apply_stock_changes(snapshot, [_changement(articles[0], 0), _changement(articles[1], 12)])
+    articles[0]["stock_actuel"], articles[1]["stock_actuel"] = 0, 12
+
+    attendu = _snapshot(articles)
+    assert snapshot["valeur"] == pytest.approx(attendu["valeur"])
+    assert (snapshot["faibles"], snapshot["ruptures"]) == (attendu["faibles"], attendu["ruptures"]) == (1, 1)
+    assert snapshot["top"] == attendu["top"]
+
+
+def test_top_trie_et_borne():
+    """Le tableau de bord affiche les TOP_N articles les plus en déficit"""
+    articles = [_article(i, i % 5) for i in range(TAILLE_TAMPON + 5)]
+    stats = to_stats(_snapshot(articles))
+    assert len(stats["articles_faibles"]) == TOP_N
+    deficits = [a["stock_actuel"] - a["stock_min"] for a in stats["articles_faibles"]]
+    assert deficits == sorted(deficits)
+    assert stats["articles_faibles_count"] == len(articles)
+
+
+def test_tampon_incomplet_ignore_les_articles_au_dela_de_la_limite():
+    """Tampon tronqué: un article moins critique que le dernier n'y entre pas"""
+    articles = [_article(i, 0) for i in range(TAILLE_TAMPON + 1)] + [_article(99, 20)]
+    snapshot = _snapshot(articles)
+
+    apply_stock_changes(snapshot, [_changement(articles[-1], 4)])
+    assert "a99" not in {e[0] for e in snapshot["top"]}
+    assert snapshot["faibles"] == TAILLE_TAMPON + 2
+
+
+def test_rechargement_quand_le_tampon_se_vide():
+    """Tampon incomplet descendu sous TOP_N: rechargement demandé"""
+    articles = [_article(i, 0) for i in range(TAILLE_TAMPON + TOP_N)]
+    snapshot = _snapshot(articles)
+
+    sortis = [_changement(a, 50) for a in articles[:TAILLE_TAMPON - TOP_N + 1]]
+    assert apply_stock_changes(snapshot, sortis)
+    assert snapshot["faibles"] == 2 * TOP_N - 1
+
+
+def test_evenement_anterieur_a_la_reconstruction_ignore():
+    """Un événement publié avant la lecture de la base y est déjà compté"""
+    snapshot = _snapshot([_article(1, 3)])
+
+    assert deja_compte(snapshot, (CONSTRUIT_LE - timedelta(seconds=1)).isoformat())
+    assert not deja_compte(snapshot, (CONSTRUIT_LE + timedelta(seconds=1)).isoformat())
+    # Fuseau différent, même instant
+    assert deja_compte(snapshot, CONSTRUIT_LE.astimezone(timezone(timedelta(hours=1))).isoformat())
+    # Snapshot d'avant construit_le: rien n'est ignoré
+    del snapshot["construit_le"]
+    assert not deja_compte(snapshot, CONSTRUIT_LE.isoformat())
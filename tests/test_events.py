@@ -0,0 +1,26 @@
+import asyncio
+from app.core import events
+
+
+def test_publish_execute_les_handlers():
+    """Test de la publication d'un événement STOCK_CHANGED"""
+    recus = []
+
+    async def handler(payload):
+        recus.append(payload["article_ids"])
+
+    async def handler_en_erreur(payload):
+        raise ValueError("boom")
+
+    async def scenario():
+        events.subscribe(events.STOCK_CHANGED, handler)
+        events.subscribe(events.STOCK_CHANGED, handler_en_erreur)
+        try:
+            events.publish(events.STOCK_CHANGED, {"magasin_id": "m1", "article_ids": ["a1"]})
+            await events.drain()
+        finally:
+            events.unsubscribe(events.STOCK_CHANGED, handler)
+            events.unsubscribe(events.STOCK_CHANGED, handler_en_erreur)
+
+    asyncio.run(scenario())
+    assert recus == [["a1"]]
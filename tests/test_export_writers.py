@@ -0,0 +1,108 @@
+"""
+Tests de l'écriture d'exports en flux (XLSX write-only)
+"""
+import csv
+import gzip
+import io
+import os
+from datetime import datetime, timezone
+import pytest
+from openpyxl import load_workbook
+from app.utils.export_writers import (
+    COLONNES_MOUVEMENTS, XlsxStreamWriter, mouvement_values, iter_file, as_datetime, export_pages
+)
+
+
+def _row(i):
+    return {
+        "id": f"m{i}",
+        "date_mouvement": "2025-03-01T08:30:00.000Z" if i % 2 else datetime(2025, 3, 1, 8, 30),
+        "type": "ENTREE",
+        "designation": f"Article {i}",
+        "code": f"A{i:04d}",
+        "quantite": i,
+        "prix_unitaire": None,
+        "valeur_totale": 1.5 * i,
+        "motif": None,
+    }
+
+
+def test_mouvement_values_format_ancien_export():
+    """Les valeurs reprennent le format de l'export historique (date jj/mm/aaaa hh:mm, vides à 0/'')"""
+    assert mouvement_values(_row(1)) == ["01/03/2025 08:30", "ENTREE", "Article 1", "A0001", 1, 0, 1.5, ""]
+    assert as_datetime("2025-03-01T08:30:00+00:00").hour == 8
+
+
+def test_xlsx_stream_writer_pages():
+    """Les pages successives forment une seule feuille, relisible par openpyxl"""
+    writer = XlsxStreamWriter("Mouvements", [entete for entete, _ in COLONNES_MOUVEMENTS], largeurs=[18] * 8)
+    for debut in range(0, 2500, 1000):
+        writer.append_rows([mouvement_values(_row(i)) for i in range(debut, min(debut + 1000, 2500))])
+    path = writer.close()
+
+    contenu = b"".join(iter_file(path, taille_bloc=4096))
+    assert not os.path.exists(path)
+    assert contenu[:2] == b"PK"
+
+    with open(path, "wb") as f:
+        f.write(contenu)
+    try:
+        sheet = load_workbook(path, read_only=True)["Mouvements"]
+        lignes = list(sheet.iter_rows(values_only=True))
+    finally:
+        os.remove(path)
+
+    assert writer.lignes == 2500
+    assert len(lignes) == 2501
+    assert lignes[0][0] == "Date"
+    assert lignes[-1][3] == "A2499"
+
+
+def _pages(nombre, taille):
+    async def pages():
+        for debut in range(0, nombre, taille):
+            yield [mouvement_values(_row(i), brut=True) for i in range(debut, min(debut + taille, nombre))]
+    return pages()
+
+
+async def _corps(body):
+    return b"".join([bloc async for bloc in body])
+
+
+async def test_export_csv_gzip_identique_au_csv():
+    """Le CSV gzip se décompresse en exactement le même contenu que le CSV simple"""
+    body, media_type, extension = await export_pages("csv", "Mouvements", COLONNES_MOUVEMENTS, _pages(1200, 500))
+    brut = await _corps(body)
+    body_gz, media_type_gz, extension_gz = await export_pages(
+        "csv", "Mouvements", COLONNES_MOUVEMENTS, _pages(1200, 500), gzip=True
+    )
+    compresse = await _corps(body_gz)
+
+    assert (extension, extension_gz) == ("csv", "csv.gz")
+    assert media_type_gz == "application/gzip"
+    assert gzip.decompress(compresse) == brut
+
+    lignes = list(csv.reader(io.StringIO(brut.decode("utf-8-sig")), delimiter=";"))
+    assert len(lignes) == 1201
+    assert lignes[0][:2] == ["Date", "Type"]
+    assert lignes[1][0] == "2025-03-01 08:30:00"
+
+
+async def test_export_parquet():
+    """Parquet: une page par row group, colonnes typées, valeurs relues à l'identique"""
+    import pyarrow.parquet as pq
+    body, _, extension = await export_pages("parquet", "Mouvements", COLONNES_MOUVEMENTS, _pages(1200, 500))
+    contenu = b"".join(body)
+
+    fichier = pq.ParquetFile(io.BytesIO(contenu))
+    assert extension == "parquet"
+    assert fichier.metadata.num_rows == 1200
+    assert fichier.metadata.num_row_groups == 3
+
+    table = fichier.read()
+    assert table.column_names == [nom for nom, _ in COLONNES_MOUVEMENTS]
+    lignes = [list(ligne.values()) for ligne in table.to_pylist()]
+    date_utc = datetime(2025, 3, 1, 8, 30, tzinfo=timezone.utc)
+    assert lignes[0] == [date_utc, "ENTREE", "Article 0", "A0000", 0, 0.0, 0.0, ""]
+    assert lignes[1199] == [date_utc, "ENTREE", "Article 1199", "A1199", 1199, 0.0, 1798.5, ""]
+    assert all(ligne[0] == date_utc for ligne in lignes)
@@ -0,0 +1,64 @@
+import asyncio
+import numpy as np
+from app.utils.forecast_engine import MODELES, select_models, forecast_series, get_model
+from app.services.ai_service import AIService
+
+
+def _series():
+    rng = np.random.default_rng(7)
+    jours = 56
+    lisse = rng.poisson(10, size=jours).astype(float)
+    profil = np.array([2, 2, 2, 2, 2, 20, 20], dtype=float)
+    saisonnier = np.tile(profil, jours // 7)
+    intermittent = np.zeros(jours)
+    intermittent[::9] = 6
+    return np.vstack([lisse, saisonnier, intermittent])
+
+
+def test_registre_des_modeles():
+    """Test des modèles enregistrés"""
+    assert set(MODELES) == {"weighted_moving_average", "holt_winters", "croston"}
+
+
+def test_selection_automatique():
+    """Test de la règle de sélection: lisse → WMA, hebdomadaire → Holt-Winters, intermittent → Croston"""
+    assert select_models(_series()) == ["weighted_moving_average", "holt_winters", "croston"]
+
+
+def test_holt_winters_suit_le_profil_hebdomadaire():
+    """Test de la saisonnalité: les jours forts de l'historique restent forts dans la prévision"""
+    quantites = _series()[1:2]
+    prevision = get_model("holt_winters").forecast(quantites, 7)[0]
+
+    # L'historique (56 jours) se termine sur un jour fort: les 5 jours suivants sont faibles
+    np.testing.assert_allclose(prevision, [2, 2, 2, 2, 2, 20, 20], atol=1.0)
+
+
+def test_croston_demande_intermittente():
+    """Test de Croston (SBA): 6 unités tous les 9 jours ≈ 0.67 unité/jour × 0.95"""
+    quantites = _series()[2:3]
+    prevision = get_model("croston").forecast(quantites, 3)[0]
+    np.testing.assert_allclose(prevision, 6 / 9 * 0.95, rtol=0.1)
+
+
+def test_forecast_series_algorithmes_et_versions():
+    """Test du résultat batch: une ligne par série, algorithme et version par série"""
+    resultat = forecast_series(_series(), 7)
+
+    assert resultat["previsions"].shape == (3, 7)
+    assert (resultat["previsions"] >= 0).all()
+    assert resultat["algorithmes"][2] == "croston"
+    assert resultat["versions"] == [MODELES[a].version for a in resultat["algorithmes"]]
+
+    force = forecast_series(_series(), 7, algorithme="weighted_moving_average")
+    assert force["algorithmes"] == ["weighted_moving_average"] * 3
+
+
+def test_calculate_prevision_simple_delegue_au_moteur():
+    """Test de AIService: même moteur, algorithme renseigné"""
+    historique = [{"quantite": q} for q in [10, 12, 11, 13]]
+    resultat = asyncio.run(AIService.calculate_prevision_simple("a1", historique))
+
+    assert resultat["algorithme"] == "weighted_moving_average"
+    assert 10 < resultat["quantite_prevue"] < 13
+    assert resultat["metriques"]["nb_points"] == 4
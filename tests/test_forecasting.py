@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+import numpy as np
+from app.utils.forecasting import (
+    build_demand_matrix, weighted_moving_average, forecast_confidence, forecast_window, history_start
+)
+from app.utils.forecast_metrics import mape, wmape, compute_metrics, metrics_as_dicts
+
+
+def test_build_demand_matrix():
+    """Test de la construction de la matrice articles × jours"""
+    rows = [
+        {"article_id": "b", "jour": "2025-01-02", "quantite": 4, "tickets": 2},
+        {"article_id": "a", "jour": date(2025, 1, 1), "quantite": 3, "tickets": 1},
+        {"article_id": "a", "jour": datetime(2025, 1, 3, 0, 0), "quantite": 5, "tickets": 3},
+        {"article_id": "a", "jour": "2024-12-01", "quantite": 99, "tickets": 1}
+    ]
+    article_ids, quantites, tickets = build_demand_matrix(rows, date(2025, 1, 1), 3)
+
+    assert article_ids == ["a", "b"]
+    np.testing.assert_array_equal(quantites, [[3, 0, 5], [0, 4, 0]])
+    np.testing.assert_array_equal(tickets.sum(axis=1), [4, 2])
+
+
+def test_weighted_moving_average_equivalente_a_numpy():
+    """Test de la moyenne pondérée vectorisée contre np.average ligne par ligne"""
+    quantites = np.random.default_rng(42).poisson(5, size=(20, 14)).astype(float)
+    weights = np.linspace(0.5, 1.0, 14)
+
+    attendu = [np.average(ligne, weights=weights) for ligne in quantites]
+    np.testing.assert_allclose(weighted_moving_average(quantites), attendu)
+
+
+def test_forecast_confidence_bornee():
+    """Test des bornes de confiance"""
+    quantites = np.array([[5, 5, 5, 5], [0, 100, 0, 100]], dtype=float)
+    np.testing.assert_allclose(forecast_confidence(quantites), [0.95, 0.3])
+
+
+def test_metriques_vectorisees():
+    """Test MAPE / WMAPE sur plusieurs séries, jours sans vente ignorés par le MAPE"""
+    historiques = np.array([[10, 20, 0], [0, 0, 0]], dtype=float)
+    previsions = np.array([15.0, 1.0])
+
+    np.testing.assert_allclose(mape(historiques, previsions), [37.5, 0.0])
+    np.testing.assert_allclose(wmape(historiques, previsions), [(5 + 5 + 15) / 30 * 100, 0.0])
+
+
+def test_compute_metrics_toutes_series():
+    """Test du biais, de la couverture et du RMSE calculés en une fois"""
+    historiques = np.array([[10, 20, 30], [4, 4, 4]], dtype=float)
+    metriques = compute_metrics(historiques, np.array([20.0, 5.0]))
+
+    np.testing.assert_allclose(metriques["bias"], [0.0, 25.0])
+    np.testing.assert_allclose(metriques["coverage"], [200 / 3, 100.0])
+    np.testing.assert_allclose(metriques["rmse"], [np.sqrt(200 / 3), 1.0])
+    np.testing.assert_array_equal(metriques["nb_points"], [3, 3])
+
+    dicts = metrics_as_dicts(metriques)
+    assert dicts[1] == {"mape": 25.0, "wmape": 25.0, "bias": 25.0, "coverage": 100.0, "rmse": 1.0, "nb_points": 3}
+
+
+def test_historique_finit_hier():
+    """La dernière colonne de l'historique est hier; le jour en cours, partiel, est exclu"""
+    aujourd_hui = date(2025, 3, 10)
+    date_debut = history_start(56, aujourd_hui)
+    rows = [
+        {"article_id": "a", "jour": aujourd_hui - timedelta(days=1), "quantite": 7, "tickets": 2},
+        {"article_id": "a", "jour": aujourd_hui, "quantite": 1, "tickets": 1},
+        {"article_id": "a", "jour": aujourd_hui - timedelta(days=56), "quantite": 3, "tickets": 1}
+    ]
+    _, quantites, _ = build_demand_matrix(rows, date_debut, 56)
+
+    assert quantites.shape == (1, 56)
+    assert date_debut + timedelta(days=55) == aujourd_hui - timedelta(days=1)
+    assert quantites[0, -1] == 7
+    assert quantites[0, 0] == 3
+    assert quantites.sum() == 10
+
+
+def test_forecast_window():
+    """Test de la période prévue (demain minuit + horizon)"""
+    debut, fin = forecast_window(7, now=datetime(2025, 3, 10, 15, 30))
+    assert debut == datetime(2025, 3, 11)
+    assert fin == datetime(2025, 3, 18)
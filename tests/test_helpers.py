@@ -0,0 +1,19 @@
+from datetime import date, datetime, timedelta, timezone
+from app.utils.helpers import as_utc, get_month_ranges
+
+
+def test_get_month_ranges():
+    """Test du découpage en mois (début en cours de mois, passage d'année)"""
+    assert get_month_ranges(date(2024, 11, 15), date(2025, 1, 3)) == [
+        (date(2024, 11, 15), date(2024, 12, 1)),
+        (date(2024, 12, 1), date(2025, 1, 1)),
+        (date(2025, 1, 1), date(2025, 2, 1)),
+    ]
+    assert get_month_ranges(date(2025, 2, 1), date(2025, 1, 31)) == []
+
+
+def test_jour_de_vente_en_utc():
+    """Test: le jour d'une vente est son jour UTC (vente à 00:30 à Tunis = veille en UTC)"""
+    vente = datetime(2025, 3, 10, 0, 30, tzinfo=timezone(timedelta(hours=1)))
+    assert as_utc(vente).date() == date(2025, 3, 9)
+    assert as_utc(datetime(2025, 3, 10, 0, 30)).date() == date(2025, 3, 10)
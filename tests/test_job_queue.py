@@ -0,0 +1,82 @@
+"""
+Tests de la file d'export en arrière-plan (backend mémoire)
+"""
+import os
+import pytest
+from app.core import job_queue
+from app.core.config import settings
+from app.utils.export_writers import parse_byte_range, iter_file_range
+
+
+@job_queue.register_job("test_export")
+async def _export_test(params):
+    if params.get("echec"):
+        raise RuntimeError("boom")
+    return [b"a;b\n", b"1;2\n" * params["lignes"]], "text/csv; charset=utf-8", "csv"
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+async def test_enqueue_puis_worker_produit_le_fichier():
+    """La tâche est rendue en_attente, puis le worker écrit le fichier et la marque terminée"""
+    job = await job_queue.enqueue("test_export", {"lignes": 3}, user_id="u1")
+    assert job["statut"] == job_queue.EN_ATTENTE
+
+    job_id = await job_queue.get_queue().pop(timeout=1)
+    assert job_id == job["id"]
+    termine = await job_queue.run_job(job_id)
+
+    assert termine["statut"] == job_queue.TERMINE
+    assert termine["taille"] == 4 + 12
+    with open(termine["fichier"], "rb") as f:
+        assert f.read() == b"a;b\n" + b"1;2\n" * 3
+    assert (await job_queue.get_job(job_id))["statut"] == job_queue.TERMINE
+
+
+async def test_echec_du_handler():
+    """Une exception du handler passe la tâche en erreur sans fichier"""
+    job = await job_queue.enqueue("test_export", {"echec": True})
+    await job_queue.get_queue().pop(timeout=1)
+    resultat = await job_queue.run_job(job["id"])
+    assert resultat["statut"] == job_queue.ERREUR
+    assert resultat["erreur"] == "boom"
+    assert resultat["fichier"] is None
+
+
+async def test_type_inconnu():
+    with pytest.raises(ValueError):
+        await job_queue.enqueue("inconnu", {})
+
+
+def test_purge_des_fichiers_expires(export_dir):
+    vieux = export_dir / "vieux.csv"
+    vieux.write_bytes(b"x")
+    os.utime(vieux, (0, 0))
+    (export_dir / "recent.csv").write_bytes(b"y")
+
+    assert job_queue.purge_expired(ttl=3600) == 1
+    assert sorted(os.listdir(export_dir)) == ["recent.csv"]
+
+
+def test_parse_byte_range():
+    """Plages simples, suffixe, fin implicite et plages non satisfaisables"""
+    assert parse_byte_range(None, 100) is None
+    assert parse_byte_range("bytes=0-9", 100) == (0, 9)
+    assert parse_byte_range("bytes=90-", 100) == (90, 99)
+    assert parse_byte_range("bytes=-10", 100) == (90, 99)
+    assert parse_byte_range("bytes=50-500", 100) == (50, 99)
+    assert parse_byte_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_byte_range("bytes=100-", 100)
+    with pytest.raises(ValueError):
+        parse_byte_range("bytes=abc", 100)
+
+
+def test_iter_file_range(tmp_path):
+    path = tmp_path / "f.bin"
+    path.write_bytes(bytes(range(200)))
+    assert b"".join(iter_file_range(str(path), 10, 149, taille_bloc=16)) == bytes(range(10, 150))
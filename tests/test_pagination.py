@@ -0,0 +1,61 @@
+"""
+Tests de la pagination par curseur (keyset)
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from app.core.exceptions import InvalidCursorException
+from app.utils.pagination import after_cursor, decode_cursor, encode_cursor, keyset_page
+
+
+class _Actions:
+    """Client de modèle factice: enregistre les arguments de find_many"""
+
+    def __init__(self, lignes):
+        self.lignes = lignes
+        self.appels = []
+
+    async def find_many(self, **kwargs):
+        self.appels.append(kwargs)
+        return self.lignes[:kwargs["take"]]
+
+
+def test_curseur_aller_retour():
+    """Dates (avec fuseau) et valeurs simples retrouvées à l'identique"""
+    date = datetime(2024, 5, 1, 8, 30, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(date, "m1")) == (date, "m1")
+    assert decode_cursor(encode_cursor("Café", "a1")) == ("Café", "a1")
+    assert "=" not in encode_cursor("x", "a1")
+
+
+@pytest.mark.parametrize("cursor", ["", "pas-un-curseur", encode_cursor("x", "a1")[:-3], "WyJ6IiwxLCJhIl0"])
+def test_curseur_invalide(cursor):
+    """Curseur tronqué, illisible ou de type inconnu: erreur 400"""
+    with pytest.raises(InvalidCursorException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_filtre_apres_curseur():
+    """Ordre décroissant: clé plus petite, ou même clé et id plus petit"""
+    assert after_cursor("created_at", "desc", 5, "b") == {"OR": [
+        {"created_at": {"lt": 5}},
+        {"created_at": 5, "id": {"lt": "b"}},
+    ]}
+    assert after_cursor("nom", "asc", "N", "b")["OR"][0] == {"nom": {"gt": "N"}}
+
+
+async def test_page_et_curseur_suivant():
+    """Une ligne de plus est lue; le curseur pointe sur la dernière ligne renvoyée"""
+    lignes = [SimpleNamespace(id=f"a{i}", nom=f"N{i}") for i in range(3)]
+    actions = _Actions(lignes)
+
+    page, suivant = await keyset_page(actions, {"entreprise_id": "e1"}, "nom", "asc", limit=2)
+    assert [l.id for l in page] == ["a0", "a1"]
+    assert decode_cursor(suivant) == ("N1", "a1")
+    assert actions.appels[0]["take"] == 3
+    assert actions.appels[0]["order"] == [{"nom": "asc"}, {"id": "asc"}]
+
+    page, suivant = await keyset_page(actions, {"entreprise_id": "e1"}, "nom", "asc", limit=5, cursor=suivant)
+    assert suivant is None
+    assert actions.appels[1]["where"] == {"AND": [{"entreprise_id": "e1"}, after_cursor("nom", "asc", "N1", "a1")]}
@@ -0,0 +1,40 @@
+"""
+Tests du générateur de PDF tabulaire
+"""
+import re
+import zlib
+from datetime import date
+from app.utils.pdf_table import PdfTableDocument, format_cell, render_table_pdf
+
+
+def _flux(pdf: bytes):
+    return [zlib.decompress(s).decode("cp1252") for s in re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S)]
+
+
+def test_structure_et_table_xref():
+    """Chaque entrée de la table xref pointe sur l'objet correspondant"""
+    pdf = render_table_pdf("Valorisation", ["Code", "Valeur (DT)"], [["A1", 12.5], ["B2", 3.0]])
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+
+    xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    assert pdf[xref:xref + 4] == b"xref"
+    for numero, position in enumerate(re.findall(rb"(\d{10}) 00000 n", pdf[xref:]), start=1):
+        assert pdf[int(position):].startswith(b"%d 0 obj" % numero)
+
+
+def test_pagination_alignement_et_echappement():
+    """Les lignes se répartissent sur plusieurs pages; nombres alignés à droite, parenthèses échappées"""
+    document = PdfTableDocument("Rapport des marges", "Du 01/01/2025 au 31/01/2025")
+    document.add_table("Par catégorie", ["Catégorie (TVA)", "Quantité"], [["Épicerie", i] for i in range(100)])
+    flux = _flux(document.to_bytes())
+
+    assert len(flux) == 3
+    assert "Page 1/3" in flux[0]
+    assert "Catégorie \\(TVA\\)  Quantité" in flux[0]
+    assert "(Épicerie               99) Tj" in flux[-1]
+
+
+def test_format_cell():
+    assert format_cell(1234.5) == "1 234.500"
+    assert format_cell(None) == ""
+    assert format_cell(date(2025, 3, 1)) == "01/03/2025"
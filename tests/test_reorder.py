@@ -0,0 +1,57 @@
+import numpy as np
+from app.utils.calculators import calculate_economic_order_quantity, economic_order_quantities
+from app.utils.reorder import plan_reorders, group_by_fournisseur
+
+
+def _article(article_id, **kwargs):
+    article = {
+        "article_id": article_id, "stock_actuel": 10, "stock_min": 5, "stock_max": 500,
+        "stock_securite": 5, "prix_achat": 2.0, "demande_jour": 4.0, "delai_livraison": 3,
+        "fournisseur_id": "f1", "fournisseur": "Grossiste"
+    }
+    article.update(kwargs)
+    return article
+
+
+def test_eoq_vectorisee_identique_au_scalaire():
+    """Test de l'EOQ vectorisée contre calculate_economic_order_quantity"""
+    demandes = np.array([1460.0, 0.0, 365.0])
+    couts = np.array([0.5, 0.5, 0.0])
+    attendu = [calculate_economic_order_quantity(d, 20.0, c) for d, c in zip(demandes, couts)]
+    np.testing.assert_array_equal(economic_order_quantities(demandes, 20.0, couts), attendu)
+
+
+def test_point_de_commande_et_quantite():
+    """Test: ROP = d × L + SS, quantité = EOQ relevée au besoin, plafonnée au stock max"""
+    suggestions = plan_reorders([
+        _article("a"),                                          # ROP 17 > stock 10 → EOQ
+        _article("b", stock_actuel=40),                         # au-dessus du ROP
+        _article("c", delai_livraison=None, stock_max=30),      # délai défaut 7 → ROP 33, plafond 20
+        _article("d", demande_jour=None, stock_actuel=2)        # pas de prévision: remonter au SS
+    ])
+    par_id = {s["article_id"]: s for s in suggestions}
+
+    assert set(par_id) == {"a", "c", "d"}
+    assert par_id["a"]["point_commande"] == 17
+    assert par_id["a"]["quantite_a_commander"] == calculate_economic_order_quantity(4.0 * 365, 20.0, 0.5)
+    assert par_id["c"]["point_commande"] == 33
+    assert par_id["c"]["quantite_a_commander"] == 20
+    assert par_id["c"]["rop_superieur_stock_max"] is True
+    assert par_id["a"]["rop_superieur_stock_max"] is False
+    assert par_id["d"]["quantite_a_commander"] == 3
+    assert par_id["d"]["priorite"] == "HAUTE"
+    assert suggestions[0]["priorite"] == "HAUTE"
+
+
+def test_regroupement_par_fournisseur():
+    """Test du regroupement et du montant par fournisseur"""
+    suggestions = plan_reorders([
+        _article("a", stock_max=20),
+        _article("b", stock_max=20, fournisseur_id="f2"),
+        _article("c", stock_max=20, fournisseur_id=None)
+    ])
+    groupes = group_by_fournisseur(suggestions)
+
+    assert set(groupes) == {"f1", "f2", None}
+    assert groupes["f1"]["montant_total"] == 10 * 2.0
+    assert [l["article_id"] for l in groupes["f2"]["lignes"]] == ["b"]
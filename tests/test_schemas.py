@@ -2,6 +2,7 @@ import pytest
 from pydantic import ValidationError
 from app.schemas.article import ArticleCreate, ArticleUpdate
 from app.schemas.mouvement import MouvementStockCreate
+from app.schemas.transfert import TransfertCreate
 
 def test_article_create_valid():
     """Test de création d'un article valide"""
@@ -61,3 +62,28 @@ def test_mouvement_stock_invalid_quantite():
             article_id="article-123",
             magasin_id="magasin-123"
         )
+
+def test_transfert_multi_lignes():
+    """Test d'un transfert multi-lignes et de la forme mono-article historique"""
+    transfert = TransfertCreate(
+        magasin_origine_id="m1",
+        magasin_destination_id="m2",
+        lignes=[{"article_id": f"a{i}", "quantite": 2} for i in range(300)]
+    )
+    assert len(transfert.lignes) == 300
+
+    mono = TransfertCreate(magasin_origine_id="m1", magasin_destination_id="m2", article_id="a1", quantite=5)
+    assert [(l.article_id, l.quantite) for l in mono.lignes] == [("a1", 5)]
+
+def test_transfert_invalide():
+    """Test de validation: au moins une ligne, articles distincts, magasins différents"""
+    with pytest.raises(ValidationError):
+        TransfertCreate(magasin_origine_id="m1", magasin_destination_id="m2")
+    with pytest.raises(ValidationError):
+        TransfertCreate(
+            magasin_origine_id="m1",
+            magasin_destination_id="m2",
+            lignes=[{"article_id": "a1", "quantite": 1}, {"article_id": "a1", "quantite": 2}]
+        )
+    with pytest.raises(ValidationError):
+        TransfertCreate(magasin_origine_id="m1", magasin_destination_id="m1", article_id="a1", quantite=1)
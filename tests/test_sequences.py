@@ -0,0 +1,42 @@
+import asyncio
+import os
+import pytest
+from app.utils.helpers import format_reference
+
+requires_db = pytest.mark.skipif(
+    os.environ.get("STOCKFLOW_TEST_DATABASE") != "1",
+    reason="STOCKFLOW_TEST_DATABASE=1 requis (base PostgreSQL de test)"
+)
+
+
+def test_format_reference():
+    """Test du format des références (numéro sur 4 chiffres minimum)"""
+    assert format_reference("BON_COMMANDE", 2025, 42) == "BC-2025-0042"
+    assert format_reference("TRANSFERT", 2025, 12345) == "TRF-2025-12345"
+
+
+@requires_db
+async def test_references_uniques_sous_charge():
+    """Test: 300 réservations concurrentes (unitaires et par bloc), aucune référence dupliquée ni sautée"""
+    from uuid import uuid4
+    from app.core.database import prisma, connect_db, disconnect_db
+    from app.services.sequence_service import SequenceService
+
+    await connect_db()
+    entreprise = await prisma.entreprise.create(data={"nom": f"Test séquences {uuid4().hex[:8]}"})
+    try:
+        async def reserver(i):
+            if i % 10 == 0:
+                return await SequenceService.allocate(entreprise.id, "BON_COMMANDE", 5)
+            async with prisma.tx() as tx:
+                return [await SequenceService.next_reference(entreprise.id, "BON_COMMANDE", client=tx)]
+
+        lots = await asyncio.gather(*(reserver(i) for i in range(300)))
+        references = [r for lot in lots for r in lot]
+        numeros = sorted(int(r.rsplit("-", 1)[1]) for r in references)
+
+        assert len(set(references)) == len(references) == 270 + 30 * 5
+        assert numeros == list(range(1, len(references) + 1))
+    finally:
+        await prisma.entreprise.delete(where={"id": entreprise.id})
+        await disconnect_db()
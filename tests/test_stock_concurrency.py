@@ -0,0 +1,86 @@
+"""
+Test de concurrence sur une vraie base PostgreSQL
+
+Nécessite un client Prisma généré et STOCKFLOW_TEST_DATABASE=1 (la base de
+DATABASE_URL reçoit des données de test, supprimées en fin de test).
+"""
+import asyncio
+import os
+from uuid import uuid4
+import pytest
+
+if os.environ.get("STOCKFLOW_TEST_DATABASE") != "1":
+    pytest.skip("STOCKFLOW_TEST_DATABASE=1 requis (base PostgreSQL de test)", allow_module_level=True)
+
+from app.core.database import prisma, connect_db, disconnect_db
+from app.schemas.mouvement import MouvementStockCreate
+from app.services.mouvement_service import MouvementService
+from app.services.stock_service import StockService, StockInsuffisantError
+
+STOCK_INITIAL = 1000
+# Fan-out borné par le pool de connexions: chaque mouvement tient une transaction
+# (max_wait TX_MAX_WAIT_SECONDS) pendant que les autres attendent le verrou de la ligne
+NB_ENTREES = 20
+NB_SORTIES = 30
+
+
+async def _article():
+    suffixe = uuid4().hex[:8]
+    entreprise = await prisma.entreprise.create(data={"nom": f"Test concurrence {suffixe}"})
+    magasin = await prisma.magasin.create(
+        data={"nom": "Magasin test", "code": f"TST-{suffixe}", "entreprise_id": entreprise.id}
+    )
+    article = await prisma.article.create(
+        data={"code": "A1", "designation": "Article test", "stock_actuel": STOCK_INITIAL, "magasin_id": magasin.id}
+    )
+    return entreprise, magasin, article
+
+
+async def test_mouvements_paralleles_sans_perte():
+    """Test: 50 mouvements concurrents sur un article, aucun ne doit être perdu"""
+    await connect_db()
+    entreprise, magasin, article = await _article()
+    try:
+        mouvements = [
+            MouvementStockCreate(type="entree", quantite=2, article_id=article.id, magasin_id=magasin.id)
+            for _ in range(NB_ENTREES)
+        ] + [
+            MouvementStockCreate(type="sortie", quantite=3, article_id=article.id, magasin_id=magasin.id)
+            for _ in range(NB_SORTIES)
+        ]
+        await asyncio.gather(*(MouvementService.create_mouvement(m) for m in mouvements))
+
+        final = await prisma.article.find_unique(where={"id": article.id})
+        assert final.stock_actuel == STOCK_INITIAL + NB_ENTREES * 2 - NB_SORTIES * 3
+        assert await prisma.mouvementstock.count(where={"article_id": article.id}) == NB_ENTREES + NB_SORTIES
+        assert await prisma.vente.count(where={"article_id": article.id}) == NB_SORTIES
+
+        with pytest.raises(StockInsuffisantError):
+            await StockService.apply_delta(article.id, -final.stock_actuel - 1, strict=True)
+    finally:
+        await prisma.entreprise.delete(where={"id": entreprise.id})
+        await disconnect_db()
+
+
+async def test_lots_concurrents_et_resultats_par_mouvement():
+    """Test: lots parallèles (delta net par article) et erreurs isolées par mouvement"""
+    await connect_db()
+    entreprise, magasin, article = await _article()
+    try:
+        lot = [{"type": "sortie", "quantite": 1, "article_id": article.id, "magasin_id": magasin.id}] * 100
+        invalides = [
+            {"type": "sortie", "quantite": 0, "article_id": article.id, "magasin_id": magasin.id},
+            {"type": "sortie", "quantite": 1, "article_id": "inconnu", "magasin_id": magasin.id}
+        ]
+        resultats = await asyncio.gather(
+            *(MouvementService.create_mouvements_batch(lot + invalides) for _ in range(5))
+        )
+
+        assert all(r["crees"] == 100 and r["erreurs"] == 2 for r in resultats)
+        assert [r["statut"] for r in resultats[0]["resultats"][-2:]] == ["erreur", "erreur"]
+        final = await prisma.article.find_unique(where={"id": article.id})
+        assert final.stock_actuel == STOCK_INITIAL - 500
+        assert await prisma.mouvementstock.count(where={"article_id": article.id}) == 500
+    finally:
+        await prisma.entreprise.delete(where={"id": entreprise.id})
+        await disconnect_db()
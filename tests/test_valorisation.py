@@ -0,0 +1,56 @@
+"""
+Tests de la valorisation du stock (totaux et sous-totaux vectorisés)
+"""
+from types import SimpleNamespace
+import pytest
+from app.utils.valorisation import build_valorisation, column_widths, valorisation_frame
+
+
+def _articles():
+    return [
+        SimpleNamespace(code="B1", designation="Eau", categorie="Boissons", stock_actuel=10, prix_achat=0.5, tva_taux=0.07),
+        SimpleNamespace(code="A1", designation="Riz", categorie=None, stock_actuel=3, prix_achat=2.1234, tva_taux=None),
+        {"code": "B2", "designation": "Jus", "categorie": "Boissons", "stock_actuel": 4, "prix_achat": 1.2, "tva_taux": 0.19},
+    ]
+
+
+def test_montants_ht_tva_ttc():
+    """TVA par défaut 19%, TTC = HT + TVA"""
+    df = valorisation_frame(_articles())
+    assert df["tva_taux"].tolist() == [0.07, 0.19, 0.19]
+    assert df["valeur_ht"].tolist() == pytest.approx([5.0, 6.3702, 4.8])
+    assert (df["valeur_ttc"] - df["valeur_ht"] - df["tva"]).abs().max() < 1e-12
+
+
+def test_total_sans_regroupement():
+    """Une ligne TOTAL calculée sur les montants non arrondis"""
+    df = build_valorisation(_articles())
+    total = df.iloc[-1]
+    assert total["Code Article"] == "TOTAL"
+    assert total["Quantité en Stock"] == 17
+    assert total["Valeur TTC (DT)"] == pytest.approx(round(5.35 + 6.3702 * 1.19 + 4.8 * 1.19, 3))
+    assert total["Taux TVA"] == "" and total["Prix Achat HT (DT)"] == ""
+
+
+def test_sous_totaux_par_taux():
+    """Chaque taux de TVA est suivi de son sous-total; le total reste la somme du détail"""
+    df = build_valorisation(_articles(), ["tva_taux"])
+    assert df["Code Article"].tolist() == ["B1", "Sous-total", "A1", "B2", "Sous-total", "TOTAL"]
+    assert df.iloc[1]["Désignation"] == "TVA 7.0%"
+    assert df.iloc[4]["Valeur Stock HT (DT)"] == pytest.approx(round(6.3702 + 4.8, 3))
+
+    par_categorie = build_valorisation(_articles(), ["categorie", "tva_taux"])
+    assert (par_categorie["Code Article"] == "Sous-total").sum() == 3
+
+
+def test_regroupement_inconnu():
+    with pytest.raises(ValueError):
+        build_valorisation(_articles(), ["fournisseur"])
+
+
+def test_largeurs_colonnes():
+    """Largeur = plus longue valeur ou en-tête, plus la marge"""
+    df = build_valorisation(_articles())
+    largeurs = column_widths(df)
+    assert largeurs[0] == len("Code Article") + 2
+    assert largeurs[2] == len("Sans catégorie") + 2